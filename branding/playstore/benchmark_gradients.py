@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Gradient Benchmark
+Times create_gradient_background against the per-pixel loops it replaced, for the sizes
+generate_assets.py renders, and checks that every pixel matches within ±1.
+
+    python benchmark_gradients.py
+    python benchmark_gradients.py --repeat 5
+"""
+
+import sys
+import math
+import time
+import argparse
+from typing import Tuple
+
+import numpy as np
+from PIL import Image
+
+from generate_assets import (
+    AI_TEAL,
+    DARK_CHARCOAL,
+    DEEP_INDIGO,
+    ELECTRIC_BLUE,
+    MAGENTA_PULSE,
+    create_gradient_background,
+)
+
+# Largest per-channel difference allowed against the reference loops
+MAX_CHANNEL_DIFF = 1
+
+# (label, size, color1, color2, direction) as rendered by generate_all_assets
+CASES = (
+    ("feature graphic", (1024, 500), ELECTRIC_BLUE, AI_TEAL, "horizontal"),
+    ("app icon", (512, 512), DEEP_INDIGO, ELECTRIC_BLUE, "diagonal"),
+    ("screenshot", (1080, 1920), DEEP_INDIGO, ELECTRIC_BLUE, "vertical"),
+    ("screenshot screen", (820, 1504), DARK_CHARCOAL, (40, 45, 60), "horizontal"),
+)
+
+
+def reference_gradient_background(
+    size: Tuple[int, int],
+    color1: Tuple[int, int, int],
+    color2: Tuple[int, int, int],
+    direction: str = "horizontal"
+) -> Image.Image:
+    """The original pixel-by-pixel create_gradient_background, kept as the reference."""
+    width, height = size
+    img = Image.new('RGB', size)
+    pixels = img.load()
+
+    if direction == "horizontal":
+        for x in range(width):
+            ratio = x / width
+            r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
+            g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
+            b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
+            for y in range(height):
+                pixels[x, y] = (r, g, b)
+    elif direction == "vertical":
+        for y in range(height):
+            ratio = y / height
+            r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
+            g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
+            b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
+            for x in range(width):
+                pixels[x, y] = (r, g, b)
+    else:  # diagonal
+        max_dist = math.sqrt(width**2 + height**2)
+        for x in range(width):
+            for y in range(height):
+                dist = math.sqrt(x**2 + y**2) / max_dist
+                ratio = min(dist, 1.0)
+                r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
+                g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
+                b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
+                pixels[x, y] = (r, g, b)
+
+    return img
+
+
+def best_time(render, repeat: int) -> Tuple[float, Image.Image]:
+    """Fastest of `repeat` calls, and the image the last call returned."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        img = render()
+        best = min(best, time.perf_counter() - start)
+    return best, img
+
+
+def max_channel_diff(a: Image.Image, b: Image.Image) -> int:
+    return int(np.abs(np.asarray(a, dtype=np.int16) - np.asarray(b, dtype=np.int16)).max())
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the vectorized gradient engine.")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Runs per case, best is reported (default: 3)")
+    args = arg_parser.parse_args()
+
+    print(f"⏱️  Gradient benchmark (best of {args.repeat})")
+    print(f"   {'case':<18} {'size':>10} {'direction':<11} {'loops':>9} {'vectorized':>11} {'speedup':>8}  max diff")
+    failed = False
+    for label, size, color1, color2, direction in CASES:
+        reference_s, reference = best_time(
+            lambda: reference_gradient_background(size, color1, color2, direction), args.repeat)
+        vectorized_s, vectorized = best_time(
+            lambda: create_gradient_background(size, color1, color2, direction), args.repeat)
+        diff = max_channel_diff(reference, vectorized)
+        failed |= diff > MAX_CHANNEL_DIFF
+        print(f"{'❌' if diff > MAX_CHANNEL_DIFF else '  '} {label:<18} {size[0]:>4}×{size[1]:<5} {direction:<11} "
+              f"{reference_s * 1000:>7.1f}ms {vectorized_s * 1000:>9.1f}ms {reference_s / vectorized_s:>7.0f}x  {diff}")
+
+    # New modes have no reference; time them at screenshot size
+    for label, direction, stops in (
+        ("radial", "radial", None),
+        ("multi-stop", "vertical", ((0.0, DEEP_INDIGO), (0.6, ELECTRIC_BLUE), (1.0, MAGENTA_PULSE))),
+    ):
+        vectorized_s, _ = best_time(
+            lambda: create_gradient_background((1080, 1920), DEEP_INDIGO, ELECTRIC_BLUE, direction, stops),
+            args.repeat)
+        print(f"   {label:<18} {1080:>4}×{1920:<5} {direction:<11} {'-':>9} {vectorized_s * 1000:>9.1f}ms")
+
+    if failed:
+        print(f"\n❌ Output differs from the reference loops by more than {MAX_CHANNEL_DIFF}")
+        sys.exit(1)
+    print(f"\n✅ Output matches the reference loops within ±{MAX_CHANNEL_DIFF}")
+
+
+if __name__ == "__main__":
+    main()
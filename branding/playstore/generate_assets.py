@@ -5,11 +5,21 @@ Generates all visual assets: screenshots, feature graphics, icons, and layouts.
 """
 
 import os
+import re
 import sys
+import json
+import time
+import hashlib
+import argparse
+import functools
+import concurrent.futures
+from collections import Counter, deque
 from pathlib import Path
-from typing import Tuple, List
+from typing import Callable, Dict, Tuple, List, NamedTuple, Optional, Sequence
+import PIL
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import math
+import numpy as np
 
 # Brand Colors (from style guide)
 ELECTRIC_BLUE = (58, 123, 255)      # #3A7BFF
@@ -24,6 +34,10 @@ DARK_CHARCOAL = (29, 29, 31)        # #1D1D1F
 
 OUTPUT_DIR = Path(__file__).parent / "output"
 OUTPUT_DIR.mkdir(exist_ok=True)
+# Input and output hashes of the last build, used to skip unchanged assets
+MANIFEST_PATH = OUTPUT_DIR / "asset-manifest.json"
+# Bump whenever drawing code changes, so every asset is rebuilt once
+GENERATOR_VERSION = "1"
 
 
 def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
@@ -32,83 +46,159 @@ def hex_to_rgb(hex_color: str) -> Tuple[int, int, int]:
     return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
 
 
+# A gradient is a list of (position, color) stops; positions run from 0.0 to 1.0
+GradientStops = Sequence[Tuple[float, Tuple[int, int, int]]]
+GRADIENT_DIRECTIONS = ("horizontal", "vertical", "diagonal", "radial")
+
+
+def gradient_ratio(size: Tuple[int, int], direction: str = "horizontal") -> np.ndarray:
+    """Position of each pixel along the gradient, from 0.0 to 1.0.
+
+    Horizontal and vertical ratios are returned as a single row or column that broadcasts
+    over the image, so only diagonal and radial gradients compute a full-size field.
+    """
+    width, height = size
+    xs = np.arange(width, dtype=np.float64)[np.newaxis, :]
+    ys = np.arange(height, dtype=np.float64)[:, np.newaxis]
+    if direction == "horizontal":
+        return xs / width
+    if direction == "vertical":
+        return ys / height
+    if direction == "diagonal":
+        # Distance from top-left
+        max_dist = math.sqrt(width**2 + height**2)
+        return np.minimum(np.sqrt(xs**2 + ys**2) / max_dist, 1.0)
+    if direction == "radial":
+        # Distance from the center, reaching 1.0 in the corners
+        center_x, center_y = (width - 1) / 2, (height - 1) / 2
+        max_dist = math.sqrt(center_x**2 + center_y**2) or 1.0
+        return np.minimum(np.sqrt((xs - center_x)**2 + (ys - center_y)**2) / max_dist, 1.0)
+    raise ValueError(f"Unknown gradient direction {direction!r}, expected one of {GRADIENT_DIRECTIONS}")
+
+
+def interpolate_stops(ratio: np.ndarray, stops: GradientStops) -> np.ndarray:
+    """Map gradient ratios to uint8 RGB through the color stops, truncating like int()."""
+    if len(stops) < 2:
+        raise ValueError("A gradient needs at least two color stops")
+    positions = np.array([position for position, _ in stops], dtype=np.float64)
+    if np.any(np.diff(positions) < 0):
+        raise ValueError("Gradient stop positions must be in ascending order")
+    colors = np.array([color for _, color in stops], dtype=np.float64)
+
+    ratio = np.clip(ratio, positions[0], positions[-1])
+    if len(stops) == 2:
+        # Plain two-color blend: the end colors are scalars, so nothing is gathered per pixel
+        span = positions[1] - positions[0]
+        t = (ratio - positions[0]) / span if span > 0 else np.ones_like(ratio)
+        low, high = colors[0], colors[1]
+    else:
+        segment = np.clip(np.searchsorted(positions, ratio, side="right") - 1, 0, len(stops) - 2)
+        start = positions[segment]
+        span = positions[segment + 1] - start
+        # Stops at the same position make a hard edge; the later color wins from there on
+        t = np.divide(ratio - start, span, out=np.ones_like(ratio), where=span > 0)
+        low, high = np.moveaxis(colors[segment], -1, 0), np.moveaxis(colors[segment + 1], -1, 0)
+
+    rgb = np.empty(ratio.shape + (3,), dtype=np.uint8)
+    inverse = 1 - t
+    for channel in range(3):
+        rgb[..., channel] = low[channel] * inverse + high[channel] * t
+    return rgb
+
+
 def create_gradient_background(
     size: Tuple[int, int],
     color1: Tuple[int, int, int],
     color2: Tuple[int, int, int],
-    direction: str = "horizontal"
+    direction: str = "horizontal",
+    stops: Optional[GradientStops] = None
 ) -> Image.Image:
-    """Create a gradient background."""
-    width, height = size
-    img = Image.new('RGB', size)
-    pixels = img.load()
-    
-    if direction == "horizontal":
-        for x in range(width):
-            ratio = x / width
-            r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-            g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-            b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-            for y in range(height):
-                pixels[x, y] = (r, g, b)
-    elif direction == "vertical":
-        for y in range(height):
-            ratio = y / height
-            r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-            g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-            b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-            for x in range(width):
-                pixels[x, y] = (r, g, b)
-    else:  # diagonal
-        max_dist = math.sqrt(width**2 + height**2)
-        for x in range(width):
-            for y in range(height):
-                # Distance from top-left
-                dist = math.sqrt(x**2 + y**2) / max_dist
-                ratio = min(dist, 1.0)
-                r = int(color1[0] * (1 - ratio) + color2[0] * ratio)
-                g = int(color1[1] * (1 - ratio) + color2[1] * ratio)
-                b = int(color1[2] * (1 - ratio) + color2[2] * ratio)
-                pixels[x, y] = (r, g, b)
-    
+    """Create a gradient background.
+
+    Blends color1 into color2, or through `stops` when given (color1 and color2 are then
+    ignored). Direction is horizontal, vertical, diagonal (from the top-left corner) or
+    radial (from the center).
+    """
+    if stops is None:
+        stops = ((0.0, color1), (1.0, color2))
+    img = Image.fromarray(interpolate_stops(gradient_ratio(size, direction), stops))
+    if img.size != size:
+        # A single row or column: nearest-neighbour scaling repeats it without blending
+        img = img.resize(size, Image.Resampling.NEAREST)
     return img
 
 
+# Font files to look for, in preference order: (family, weight, path)
+FONT_CANDIDATES = (
+    ("Inter", "bold", str(Path(__file__).parent / "fonts" / "Inter-Bold.ttf")),
+    ("Inter", "semibold", str(Path(__file__).parent / "fonts" / "Inter-SemiBold.ttf")),
+    ("Inter", "regular", str(Path(__file__).parent / "fonts" / "Inter-Regular.ttf")),
+    ("Inter", "bold", "/usr/share/fonts/truetype/inter/Inter-Bold.ttf"),
+    ("Inter", "semibold", "/usr/share/fonts/truetype/inter/Inter-SemiBold.ttf"),
+    ("Helvetica", "regular", "/System/Library/Fonts/Helvetica.ttc"),
+    ("Arial", "bold", "C:/Windows/Fonts/arialbd.ttf"),
+    ("Arial", "regular", "C:/Windows/Fonts/arial.ttf"),
+)
+# Weights tried first when a bold font is requested
+BOLD_WEIGHTS = ("bold", "semibold")
+# Distinct (font file, size) pairs kept loaded; the asset pack uses about a dozen
+FONT_CACHE_SIZE = 64
+# Size resolved_fonts() loads to learn which file get_font() ends up using
+FONT_PROBE_SIZE = 12
+
+
+class FontIndex:
+    """Installed fonts from FONT_CANDIDATES, found with one filesystem scan on first use."""
+
+    def __init__(self, candidates=FONT_CANDIDATES):
+        self.candidates = candidates
+        self._available = None
+
+    @property
+    def available(self) -> List[Tuple[str, str, str]]:
+        """(family, weight, path) of every candidate that exists, in preference order."""
+        if self._available is None:
+            self._available = [entry for entry in self.candidates if os.path.exists(entry[2])]
+        return self._available
+
+    def paths(self, bold: bool = False) -> List[str]:
+        """Installed font paths to try, bold weights first when bold is requested."""
+        paths = [path for _, _, path in self.available]
+        if bold:
+            bold_paths = [path for _, weight, path in self.available if weight in BOLD_WEIGHTS]
+            paths = bold_paths + [path for path in paths if path not in bold_paths]
+        return paths
+
+    def discard(self, path: str) -> None:
+        """Stop offering a font file that failed to load."""
+        self._available = [entry for entry in self.available if entry[2] != path]
+
+
+FONT_INDEX = FontIndex()
+# (path, size) of every face this process loaded from disk, in order; render_asset
+# reports the slice each asset added so font_cache_stats() can sum them over workers
+_font_loads = []
+
+
+@functools.lru_cache(maxsize=FONT_CACHE_SIZE)
+def load_font(path: Optional[str], size: int) -> ImageFont.FreeTypeFont:
+    """Load a font file once per size; path None loads Pillow's default font."""
+    _font_loads.append((path, size))
+    if path is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(path, size)
+
+
 def get_font(size: int, bold: bool = False) -> ImageFont.FreeTypeFont:
     """Get font, falling back to default if Inter not available."""
-    script_dir = Path(__file__).parent
-    font_paths = [
-        str(script_dir / "fonts" / "Inter-Bold.ttf"),
-        str(script_dir / "fonts" / "Inter-SemiBold.ttf"),
-        str(script_dir / "fonts" / "Inter-Regular.ttf"),
-        "/usr/share/fonts/truetype/inter/Inter-Bold.ttf",
-        "/usr/share/fonts/truetype/inter/Inter-SemiBold.ttf",
-        "/System/Library/Fonts/Helvetica.ttc",
-        "C:/Windows/Fonts/arialbd.ttf",
-        "C:/Windows/Fonts/arial.ttf",
-    ]
-    
-    if bold:
-        # Try bold fonts first
-        bold_fonts = [fp for fp in font_paths if "Bold" in fp or "bd" in fp.lower()]
-        font_paths = bold_fonts + [fp for fp in font_paths if fp not in bold_fonts]
-    
-    for font_path in font_paths:
-        if os.path.exists(font_path):
-            try:
-                return ImageFont.truetype(font_path, size)
-            except:
-                continue
-    
+    for font_path in FONT_INDEX.paths(bold):
+        try:
+            return load_font(font_path, size)
+        except OSError:
+            FONT_INDEX.discard(font_path)
+
     # Fallback to default font
-    try:
-        if sys.platform == "win32":
-            fallback = "arialbd.ttf" if bold else "arial.ttf"
-            return ImageFont.truetype(f"C:/Windows/Fonts/{fallback}", size)
-        else:
-            return ImageFont.load_default()
-    except:
-        return ImageFont.load_default()
+    return load_font(None, size)
 
 
 def draw_text_with_shadow(
@@ -156,13 +246,15 @@ def draw_keyboard_mockup(
     y: int,
     width: int,
     height: int,
-    key_color: Tuple[int, int, int] = (200, 200, 200)
+    key_color: Tuple[int, int, int] = (200, 200, 200),
+    scale: float = 1.0
 ) -> None:
     """Draw a simple keyboard mockup."""
     key_width = width // 10
     key_height = height // 4
-    key_spacing = 5
-    corner_radius = 8
+    key_spacing = round(5 * scale)
+    corner_radius = round(8 * scale)
+    font = get_font(round(16 * scale), bold=True)
     
     # Top row (QWERTY)
     for i, letter in enumerate("QWERTYUIOP"):
@@ -179,7 +271,6 @@ def draw_keyboard_mockup(
         )
         
         # Draw letter
-        font = get_font(16, bold=True)
         bbox = draw.textbbox((0, 0), letter, font=font)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
@@ -313,183 +404,662 @@ def draw_device_frame(
     )
 
 
-def generate_screenshot(
-    title: str,
-    subtitle: str,
-    screenshot_number: int,
-    accent_color: Tuple[int, int, int] = AI_TEAL
-) -> Image.Image:
-    """Generate a screenshot template (1080 × 1920)."""
-    width, height = 1080, 1920
-    img = create_gradient_background((width, height), DEEP_INDIGO, ELECTRIC_BLUE, "vertical")
-    draw = ImageDraw.Draw(img)
-    
-    # Device frame area (centered)
-    device_width = width - 200
-    device_height = int(device_width * 16 / 9)  # 16:9 aspect ratio
+# Design size of the screenshot layout; other sizes scale it to fit
+SCREENSHOT_SIZE = (1080, 1920)
+# Headline text is shrunk until it fits the width, but never below this share of its size
+MIN_TEXT_SCALE = 0.6
+# Declarative list of screenshots, locales and target sizes
+SCREENSHOT_SPEC_PATH = Path(__file__).parent / "screenshots.json"
+
+
+def screenshot_scale(size: Tuple[int, int]) -> float:
+    """How much larger than the 1080 × 1920 design a screenshot size is."""
+    return min(size[0] / SCREENSHOT_SIZE[0], size[1] / SCREENSHOT_SIZE[1])
+
+
+def screenshot_screen_box(size: Tuple[int, int]) -> Tuple[int, int, int, int, int, int, int, int]:
+    """Device frame and inner screen of a screenshot: (device x, y, width, height, screen x, y, width, height).
+
+    At 1080 × 1920 this is the original phone layout. Wider sizes keep the margins and
+    cap the frame's height, which gives tablet proportions.
+    """
+    width, height = size
+    scale = screenshot_scale(size)
+    device_width = width - round(200 * scale)
     device_x = (width - device_width) // 2
-    device_y = 300
-    
-    # Draw device frame
-    draw_device_frame(draw, device_x, device_y, device_width, device_height, (40, 40, 40))
-    
-    # Inner screen area (with gradient background)
-    screen_margin = 30
+    device_y = round(300 * scale)
+    device_height = min(int(device_width * 16 / 9), height - device_y - round(56 * scale))
+
+    screen_margin = round(30 * scale)
     screen_x = device_x + screen_margin
     screen_y = device_y + screen_margin
     screen_width = device_width - 2 * screen_margin
     screen_height = device_height - 2 * screen_margin
-    
+    return device_x, device_y, device_width, device_height, screen_x, screen_y, screen_width, screen_height
+
+
+def screenshot_background(size: Tuple[int, int]) -> Image.Image:
+    """Gradient, device frame and screen shared by every screenshot of one size."""
+    width, height = size
+    img = create_gradient_background((width, height), DEEP_INDIGO, ELECTRIC_BLUE, "vertical")
+    draw = ImageDraw.Draw(img)
+    device_x, device_y, device_width, device_height, screen_x, screen_y, screen_width, screen_height = (
+        screenshot_screen_box(size)
+    )
+
+    # Draw device frame
+    draw_device_frame(draw, device_x, device_y, device_width, device_height, (40, 40, 40))
+
+    # Inner screen area (with gradient background)
     screen_bg = create_gradient_background(
         (screen_width, screen_height),
         DARK_CHARCOAL,
         (40, 45, 60)
     )
     img.paste(screen_bg, (screen_x, screen_y))
-    
-    # Draw simple UI elements based on screenshot number
+    return img
+
+
+def draw_screen_mockup(draw: ImageDraw.Draw, size: Tuple[int, int], screenshot_number: int) -> None:
+    """Draw the UI mockup of one screenshot on its device screen."""
+    scale = screenshot_scale(size)
+    _, _, _, _, screen_x, screen_y, screen_width, _ = screenshot_screen_box(size)
+
+    def px(value: int) -> int:
+        return round(value * scale)
+
     if screenshot_number == 1:
         # Model selection mockup
-        draw_keyboard_mockup(draw, screen_x + 100, screen_y + 200, 300, 100, (60, 60, 70))
+        draw_keyboard_mockup(draw, screen_x + px(100), screen_y + px(200), px(300), px(100), (60, 60, 70), scale)
     elif screenshot_number == 2:
         # Waveform display
-        draw_waveform(draw, screen_x + 100, screen_y + 400, 700, 200, 1.0, AI_TEAL)
+        draw_waveform(draw, screen_x + px(100), screen_y + px(400), px(700), px(200), 1.0, AI_TEAL)
         draw.ellipse(
-            [screen_x + 400, screen_y + 800, screen_x + 500, screen_y + 900],
+            [screen_x + px(400), screen_y + px(800), screen_x + px(500), screen_y + px(900)],
             fill=MAGENTA_PULSE,
             outline=PURE_WHITE,
-            width=5
+            width=px(5)
         )
     elif screenshot_number == 3:
         # Model cards mockup
-        card_y = screen_y + 200
+        card_y = screen_y + px(200)
         for i in range(2):
             draw.rounded_rectangle(
-                [screen_x + 50, card_y + i * 200, screen_x + screen_width - 50, card_y + 150 + i * 200],
-                radius=12,
+                [screen_x + px(50), card_y + px(i * 200), screen_x + screen_width - px(50), card_y + px(150 + i * 200)],
+                radius=px(12),
                 fill=(60, 60, 70),
                 outline=AI_TEAL if i == 0 else (100, 100, 100),
-                width=3
+                width=px(3)
             )
     elif screenshot_number == 4:
         # Theme selector mockup
         draw.rounded_rectangle(
-            [screen_x + 200, screen_y + 300, screen_x + 600, screen_y + 800],
-            radius=20,
+            [screen_x + px(200), screen_y + px(300), screen_x + px(600), screen_y + px(800)],
+            radius=px(20),
             fill=(60, 60, 70),
             outline=ELECTRIC_BLUE,
-            width=4
+            width=px(4)
         )
     elif screenshot_number == 5:
         # Keyboard with swipe trail
-        draw_keyboard_mockup(draw, screen_x + 100, screen_y + 500, 600, 200, (60, 60, 70))
+        draw_keyboard_mockup(draw, screen_x + px(100), screen_y + px(500), px(600), px(200), (60, 60, 70), scale)
         # Draw swipe trail curve
         trail_points = [(200, 600), (300, 550), (400, 580), (500, 560), (600, 590)]
-        adjusted_points = [(screen_x + p[0], screen_y + p[1]) for p in trail_points]
-        draw.line(adjusted_points, fill=AI_TEAL, width=6)
+        adjusted_points = [(screen_x + px(p[0]), screen_y + px(p[1])) for p in trail_points]
+        draw.line(adjusted_points, fill=AI_TEAL, width=px(6))
     elif screenshot_number == 6:
         # Clipboard and emoji mockup
         draw.rounded_rectangle(
-            [screen_x + 100, screen_y + 300, screen_x + screen_width - 100, screen_y + 500],
-            radius=12,
+            [screen_x + px(100), screen_y + px(300), screen_x + screen_width - px(100), screen_y + px(500)],
+            radius=px(12),
             fill=(60, 60, 70),
             outline=SKY_MINT,
-            width=2
+            width=px(2)
         )
-        draw_keyboard_mockup(draw, screen_x + 100, screen_y + 600, 600, 150, (60, 60, 70))
+        draw_keyboard_mockup(draw, screen_x + px(100), screen_y + px(600), px(600), px(150), (60, 60, 70), scale)
     elif screenshot_number == 7:
         # Support/coffee mockup
         draw.ellipse(
-            [screen_x + 300, screen_y + 400, screen_x + 600, screen_y + 700],
+            [screen_x + px(300), screen_y + px(400), screen_x + px(600), screen_y + px(700)],
             fill=AI_GOLD,
             outline=PURE_WHITE,
-            width=5
+            width=px(5)
         )
-        font = get_font(80, bold=True)
+        font = get_font(px(80), bold=True)
         # Calculate text dimensions for centering
         emoji_bbox = draw.textbbox((0, 0), "☕", font=font)
         emoji_width = emoji_bbox[2] - emoji_bbox[0]
         emoji_height = emoji_bbox[3] - emoji_bbox[1]
-        emoji_x = (screen_x + 450) - emoji_width // 2
-        emoji_y = (screen_y + 550) - emoji_height // 2
+        emoji_x = (screen_x + px(450)) - emoji_width // 2
+        emoji_y = (screen_y + px(550)) - emoji_height // 2
         draw.text((emoji_x, emoji_y), "☕", font=font, fill=PURE_WHITE)
-    
+
+
+def screenshot_scene(background: Image.Image, screenshot_number: int) -> Image.Image:
+    """Background plus one screenshot's mockup: everything except the localized text."""
+    img = background.copy()
+    draw_screen_mockup(ImageDraw.Draw(img), img.size, screenshot_number)
+    return img
+
+
+def fit_font(draw: ImageDraw.Draw, text: str, size: int, bold: bool, max_width: int) -> ImageFont.FreeTypeFont:
+    """The font at `size`, shrunk in 5% steps until the text fits within max_width."""
+    font = get_font(size, bold)
+    for step in range(1, round((1 - MIN_TEXT_SCALE) / 0.05) + 1):
+        bbox = draw.textbbox((0, 0), text, font=font)
+        if bbox[2] - bbox[0] <= max_width:
+            break
+        font = get_font(round(size * (1 - step * 0.05)), bold)
+    return font
+
+
+def generate_screenshot(
+    scene: Image.Image,
+    title: str,
+    subtitle: str,
+    accent_color: Tuple[int, int, int] = AI_TEAL
+) -> Image.Image:
+    """Generate a screenshot at the size of its scene (see screenshot_scene).
+
+    Only the title and subtitle are drawn here, so each locale costs one text pass
+    over a scene rendered once per size and mockup.
+    """
+    size = scene.size
+    width, height = size
+    scale = screenshot_scale(size)
+    img = scene.copy()
+    draw = ImageDraw.Draw(img)
+    max_text_width = width - round(80 * scale)
+
     # Title text (top overlay)
-    title_font = get_font(64, bold=True)
+    title_font = fit_font(draw, title, round(64 * scale), True, max_text_width)
     title_bbox = draw.textbbox((0, 0), title, font=title_font)
     title_width = title_bbox[2] - title_bbox[0]
     title_x = (width - title_width) // 2
-    title_y = 80
-    draw_text_with_shadow(draw, title, (title_x, title_y), title_font, PURE_WHITE, shadow_offset=4)
+    title_y = round(80 * scale)
+    draw_text_with_shadow(draw, title, (title_x, title_y), title_font, PURE_WHITE, shadow_offset=round(4 * scale))
     
     # Subtitle text
-    subtitle_font = get_font(36, bold=False)
+    subtitle_font = fit_font(draw, subtitle, round(36 * scale), False, max_text_width)
     subtitle_bbox = draw.textbbox((0, 0), subtitle, font=subtitle_font)
     subtitle_width = subtitle_bbox[2] - subtitle_bbox[0]
     subtitle_x = (width - subtitle_width) // 2
-    subtitle_y = title_y + 80
-    draw_text_with_shadow(draw, subtitle, (subtitle_x, subtitle_y), subtitle_font, accent_color, shadow_offset=3)
+    subtitle_y = title_y + round(80 * scale)
+    draw_text_with_shadow(draw, subtitle, (subtitle_x, subtitle_y), subtitle_font, accent_color,
+                          shadow_offset=round(3 * scale))
     
     return img
 
 
-def generate_all_assets():
-    """Generate all Play Store assets."""
-    print("🎨 Generating Play Store assets...")
-    
-    # 1. Feature Graphic
-    print("  📐 Generating feature graphic (1024×500)...")
-    feature_graphic = generate_feature_graphic()
-    feature_graphic.save(OUTPUT_DIR / "feature-graphic.png", "PNG")
-    print(f"     ✅ Saved: {OUTPUT_DIR / 'feature-graphic.png'}")
-    
-    # 2. App Icon
-    print("  🎯 Generating app icon (512×512)...")
-    app_icon = generate_app_icon()
-    app_icon.save(OUTPUT_DIR / "app-icon-512.png", "PNG")
-    print(f"     ✅ Saved: {OUTPUT_DIR / 'app-icon-512.png'}")
-    
+def resize_icon(icon: Image.Image, size: int) -> Image.Image:
+    """Downscale the 512 × 512 app icon to one adaptive icon density."""
+    return icon.resize((size, size), Image.Resampling.LANCZOS)
+
+
+class AssetTask(NamedTuple):
+    """One output PNG: how to render it and which asset's image it is derived from."""
+    filename: str
+    size: Tuple[int, int]
+    render: Callable[..., Image.Image]
+    args: tuple = ()
+    # Filename of the asset whose image is passed to render before args
+    depends_on: Optional[str] = None
+    # Progress line printed before this asset's "Saved" line
+    heading: Optional[str] = None
+    # An intermediate image for its dependents: kept in memory, never saved or recorded
+    layer: bool = False
+
+
+class RenderResult(NamedTuple):
+    image: Optional[Image.Image]
+    seconds: float
+    # (path, size) of each font face this asset loaded from disk
+    font_loads: Tuple[Tuple[Optional[str], int], ...]
+    font_hits: int
+    # None for a layer, which is never saved
+    output_hash: Optional[str]
+    # False when the asset was up to date and left as it was
+    rebuilt: bool = True
+    # Process that rendered the asset; each worker has its own font cache
+    worker: int = 0
+
+
+class InlineExecutor(concurrent.futures.Executor):
+    """Runs each submitted call immediately, so --jobs 1 uses the same scheduling as a pool."""
+
+    def submit(self, fn, *args, **kwargs):
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def load_screenshot_spec(path: Path = SCREENSHOT_SPEC_PATH) -> dict:
+    """Read and check the screenshot spec: sizes, screenshots and their text per locale."""
+    with open(path, encoding='utf-8') as f:
+        spec = json.load(f)
+
+    def fail(message: str):
+        raise ValueError(f"{path}: {message}")
+
+    for key in ('default_locale', 'sizes', 'screenshots', 'locales'):
+        if key not in spec:
+            fail(f"missing '{key}'")
+    for name, size in spec['sizes'].items():
+        if (not isinstance(size, list) or len(size) != 2
+                or not all(isinstance(v, int) and v > 0 for v in size)):
+            fail(f"size '{name}' must be [width, height], got {size!r}")
+    ids = [shot.get('id') for shot in spec['screenshots']]
+    for shot in spec['screenshots']:
+        if shot.get('mockup') not in range(1, 8):
+            fail(f"screenshot '{shot.get('id')}' needs a mockup number from 1 to 7")
+        if not re.fullmatch(r'#[0-9A-Fa-f]{6}', str(shot.get('accent'))):
+            fail(f"screenshot '{shot.get('id')}' needs an accent color like \"#00C7B7\"")
+    if len(set(ids)) != len(ids) or None in ids:
+        fail("every screenshot needs a unique 'id'")
+    default_text = spec['locales'].get(spec['default_locale'])
+    if default_text is None:
+        fail(f"no text for the default locale '{spec['default_locale']}'")
+    for shot_id in ids:
+        if not {'title', 'subtitle'} <= set(default_text.get(shot_id, {})):
+            fail(f"default locale '{spec['default_locale']}' needs a title and subtitle for '{shot_id}'")
+    return spec
+
+
+def screenshot_tasks(
+    spec: dict,
+    locales: Optional[List[str]] = None,
+    sizes: Optional[List[str]] = None
+) -> List[AssetTask]:
+    """One task per screenshot, locale and size in the spec, ordered size → screenshot → locale.
+
+    Each size also gets a background layer task, and each of its mockups a scene layer
+    derived from that background. Every locale's screenshot is derived from its scene,
+    the way the icon densities are derived from app-icon-512, so each layer is
+    rendered once per run however many workers draw the text. The default locale at
+    the first size keeps the original file names in output/; every other combination
+    goes to output/<locale>/<size name>/.
+    """
+    default_locale = spec['default_locale']
+    locales = locales or list(spec['locales'])
+    sizes = sizes or list(spec['sizes'])
+    for locale in locales:
+        if locale not in spec['locales']:
+            raise ValueError(f"Locale '{locale}' is not in the screenshot spec")
+    for size_name in sizes:
+        if size_name not in spec['sizes']:
+            raise ValueError(f"Size '{size_name}' is not in the screenshot spec")
+    primary_size = next(iter(spec['sizes']))
+    for locale in locales:
+        missing = [shot['id'] for shot in spec['screenshots'] if shot['id'] not in spec['locales'][locale]]
+        if missing:
+            print(f"⚠️  {locale}: no text for {', '.join(missing)}; using {default_locale}")
+
+    tasks = []
+    for size_name in sizes:
+        size = tuple(spec['sizes'][size_name])
+        heading = f"  📱 Generating screenshots ({size[0]}×{size[1]})..."
+        if size_name != primary_size or locales != [default_locale]:
+            heading = f"  📱 Generating {size_name} screenshots ({size[0]}×{size[1]}, {len(locales)} locale(s))..."
+        background = f"layers/{size_name}/background"
+        tasks.append(AssetTask(background, size, screenshot_background, (size,), layer=True))
+        scenes = set()
+        for i, shot in enumerate(spec['screenshots'], 1):
+            scene = f"layers/{size_name}/mockup-{shot['mockup']}"
+            if scene not in scenes:
+                scenes.add(scene)
+                tasks.append(AssetTask(scene, size, screenshot_scene, (shot['mockup'],),
+                                       depends_on=background, layer=True))
+            default_text = spec['locales'][default_locale][shot['id']]
+            filename = f"screenshot-{i:02d}-{default_text['title'].lower().replace(' ', '-')}.png"
+            for locale in locales:
+                text = spec['locales'][locale].get(shot['id'], default_text)
+                path = filename
+                if locale != default_locale or size_name != primary_size:
+                    path = f"{locale}/{size_name}/{filename}"
+                tasks.append(AssetTask(
+                    path, size, generate_screenshot,
+                    (text['title'], text['subtitle'], hex_to_rgb(shot['accent'])),
+                    depends_on=scene, heading=heading
+                ))
+                heading = None
+    return tasks
+
+
+def build_asset_tasks(
+    spec_path: Path = SCREENSHOT_SPEC_PATH,
+    locales: Optional[List[str]] = None,
+    sizes: Optional[List[str]] = None
+) -> List[AssetTask]:
+    """All Play Store assets, in the order their progress is printed."""
+    tasks = [
+        AssetTask("feature-graphic.png", (1024, 500), generate_feature_graphic,
+                  heading="  📐 Generating feature graphic (1024×500)..."),
+        AssetTask("app-icon-512.png", (512, 512), generate_app_icon,
+                  heading="  🎯 Generating app icon (512×512)..."),
+    ]
+
     # Generate adaptive icon sizes
-    sizes = [
+    icon_sizes = [
         (48, "mdpi"),
         (72, "hdpi"),
         (96, "xhdpi"),
         (144, "xxhdpi"),
         (192, "xxxhdpi"),
     ]
-    
-    for size, density in sizes:
-        icon_resized = app_icon.resize((size, size), Image.Resampling.LANCZOS)
-        icon_resized.save(OUTPUT_DIR / f"app-icon-{density}-{size}x{size}.png", "PNG")
-        print(f"     ✅ Saved: {OUTPUT_DIR / f'app-icon-{density}-{size}x{size}.png'}")
-    
-    # 3. Screenshots
-    screenshots = [
-        ("Offline AI Voice Typing", "Choose your own AI model", 1, AI_TEAL),
-        ("Real-time Transcription", "Fast, accurate, private", 2, AI_TEAL),
-        ("Install Any ONNX Model", "Parakeet, Distil-Whisper, Vosk & more", 3, SKY_MINT),
-        ("Beautiful Themes", "Customize colors, shapes, and layout", 4, ELECTRIC_BLUE),
-        ("Smart Typing", "AI-powered predictions and swipe typing", 5, AI_TEAL),
-        ("Clipboard & Emoji", "Everything you need in one keyboard", 6, SKY_MINT),
-        ("Support the Project", "Buy me a coffee ❤️", 7, AI_GOLD),
-    ]
-    
-    print("  📱 Generating screenshots (1080×1920)...")
-    for i, (title, subtitle, num, accent) in enumerate(screenshots, 1):
-        screenshot = generate_screenshot(title, subtitle, num, accent)
-        screenshot.save(OUTPUT_DIR / f"screenshot-{i:02d}-{title.lower().replace(' ', '-')}.png", "PNG")
-        print(f"     ✅ Saved: {OUTPUT_DIR / f'screenshot-{i:02d}-{title.lower().replace(' ', '-')}.png'}")
-    
+    for size, density in icon_sizes:
+        tasks.append(AssetTask(f"app-icon-{density}-{size}x{size}.png", (size, size), resize_icon, (size,),
+                               depends_on="app-icon-512.png"))
+
+    tasks.extend(screenshot_tasks(load_screenshot_spec(spec_path), locales, sizes))
+    return tasks
+
+
+def file_sha256(path: Path) -> Optional[str]:
+    """SHA-256 of a file's contents, or None if it does not exist."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def resolved_fonts() -> dict:
+    """The regular and bold font files get_font() loads, with their content hashes.
+
+    Fonts are loaded rather than looked up, so a candidate that fails to
+    open is skipped here exactly as get_font() skips it.
+    """
+    fonts = {}
+    for weight, bold in (("regular", False), ("bold", True)):
+        path = get_font(FONT_PROBE_SIZE, bold).path
+        # A non-str path is Pillow's built-in default font, loaded from memory
+        fonts[weight] = {'path': path, 'sha256': file_sha256(Path(path))} if isinstance(path, str) else None
+    return fonts
+
+
+def asset_inputs(task: AssetTask, fonts: dict, source_hash: Optional[str]) -> dict:
+    """Everything an asset's pixels depend on: renderer, arguments, size, fonts and versions."""
+    return {
+        'generator_version': GENERATOR_VERSION,
+        'pillow_version': PIL.__version__,
+        'render': task.render.__name__,
+        'args': task.args,
+        'size': task.size,
+        'fonts': fonts,
+        'source_input_hash': source_hash,
+    }
+
+
+def hash_inputs(inputs: dict) -> str:
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+
+
+def load_manifest() -> dict:
+    """Assets recorded by the last build, keyed by filename; empty if there is no usable manifest."""
+    try:
+        with open(MANIFEST_PATH, encoding='utf-8') as f:
+            return json.load(f).get('assets', {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def write_manifest(assets: dict) -> None:
+    """Replace the manifest atomically, so an interrupted run never leaves half a file."""
+    manifest = {'generator_version': GENERATOR_VERSION, 'assets': assets}
+    tmp_path = MANIFEST_PATH.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def render_asset(
+    render: Callable[..., Image.Image],
+    args: tuple,
+    size: Tuple[int, int],
+    path: Optional[str],
+    keep_image: bool
+) -> RenderResult:
+    """Render and save one asset; runs in a worker process when --jobs > 1.
+
+    A layer (path None) is only rendered and handed back, never saved.
+    """
+    fonts_before = load_font.cache_info()
+    loads_before = len(_font_loads)
+    start = time.perf_counter()
+    img = render(*args)
+    if img.size != tuple(size):
+        raise ValueError(f"{path}: rendered {img.size[0]}×{img.size[1]}, expected {size[0]}×{size[1]}")
+    if path is not None:
+        img.save(path, "PNG")
+    seconds = time.perf_counter() - start
+    fonts_after = load_font.cache_info()
+    return RenderResult(
+        img if keep_image else None,
+        seconds,
+        tuple(_font_loads[loads_before:]),
+        fonts_after.hits - fonts_before.hits,
+        file_sha256(Path(path)) if path is not None else None,
+        worker=os.getpid()
+    )
+
+
+def font_cache_stats(results: Sequence[RenderResult]) -> dict:
+    """Font disk loads and cache hits summed over a run's workers.
+
+    'reloaded' lists faces one worker loaded more than once, i.e. evicted
+    from its cache; each worker loading a face once is expected.
+    """
+    loads = Counter((result.worker, face) for result in results for face in result.font_loads)
+    return {
+        'loads': sum(loads.values()),
+        'faces': len({face for _, face in loads}),
+        'workers': len({worker for worker, _ in loads}),
+        'hits': sum(result.font_hits for result in results),
+        'reloaded': sorted({face for (_, face), count in loads.items() if count > 1}, key=str),
+    }
+
+
+def run_asset_tasks(
+    tasks: List[AssetTask],
+    jobs: int = 1,
+    unchanged: Optional[Dict[str, Optional[str]]] = None
+) -> Dict[str, RenderResult]:
+    """Render tasks on `jobs` processes, starting each derived asset once its source is done.
+
+    Assets in `unchanged` (filename -> output hash) are kept as they are on disk; an asset
+    derived from one of them reads its source back from the saved PNG. A source image is
+    dropped once its last dependent has been handed out.
+
+    Progress is printed in task order as soon as every earlier asset has finished, so the
+    output reads the same whatever order the workers complete in.
+    """
+    unchanged = unchanged or {}
+    dependents = {}
+    for task in tasks:
+        if task.depends_on is not None:
+            dependents.setdefault(task.depends_on, []).append(task)
+    ready = deque(task for task in tasks if task.depends_on is None)
+    waiting = {source: len(derived) for source, derived in dependents.items()}
+    results = {}
+    printed = 0
+
+    if jobs == 1:
+        executor = InlineExecutor()
+    else:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers=jobs)
+    with executor:
+        pending = {}
+        while ready or pending:
+            # Only hand out as many tasks as there are workers, so derived assets queued
+            # at the front of `ready` start before the remaining independent ones
+            while ready and len(pending) < jobs:
+                task = ready.popleft()
+                if task.filename in unchanged:
+                    results[task.filename] = RenderResult(None, 0.0, (), 0, unchanged[task.filename], rebuilt=False)
+                    ready.extendleft(reversed(dependents.get(task.filename, [])))
+                    continue
+                path = None
+                if not task.layer:
+                    path = str(OUTPUT_DIR / task.filename)
+                    (OUTPUT_DIR / task.filename).parent.mkdir(parents=True, exist_ok=True)
+                args = task.args
+                if task.depends_on is not None:
+                    source = results[task.depends_on].image
+                    if source is None:
+                        source = Image.open(OUTPUT_DIR / task.depends_on)
+                        source.load()
+                    args = (source,) + args
+                    waiting[task.depends_on] -= 1
+                    if not waiting[task.depends_on]:
+                        results[task.depends_on] = results[task.depends_on]._replace(image=None)
+                future = executor.submit(render_asset, task.render, args, task.size,
+                                         path, task.filename in dependents)
+                pending[future] = task
+            if not pending:
+                done = ()
+            else:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                task = pending.pop(future)
+                results[task.filename] = future.result()
+                ready.extendleft(reversed(dependents.get(task.filename, [])))
+
+            while printed < len(tasks) and tasks[printed].filename in results:
+                if tasks[printed].heading:
+                    print(tasks[printed].heading)
+                # Layers are never saved, so they have no line of their own
+                if not tasks[printed].layer:
+                    if results[tasks[printed].filename].rebuilt:
+                        print(f"     ✅ Saved: {OUTPUT_DIR / tasks[printed].filename}")
+                    else:
+                        print(f"     ⏭️  Unchanged: {OUTPUT_DIR / tasks[printed].filename}")
+                printed += 1
+    return results
+
+
+def print_render_times(results: Dict[str, RenderResult], jobs: int, wall_s: float) -> None:
+    """Per-asset render and encode times of the rebuilt assets, slowest first."""
+    rebuilt = {filename: result for filename, result in results.items() if result.rebuilt}
+    total_s = sum(result.seconds for result in rebuilt.values())
+    print(f"\n⏱️  Render times ({jobs} job(s)): {wall_s:.2f}s wall, {total_s:.2f}s summed over assets")
+    for filename, result in sorted(rebuilt.items(), key=lambda item: item[1].seconds, reverse=True):
+        print(f"   {result.seconds:6.2f}s  {filename}")
+
+
+def plan_asset_build(
+    tasks: List[AssetTask], previous: dict, force: bool = False
+) -> Tuple[dict, Dict[str, Optional[str]]]:
+    """Manifest entries for this build, and the assets that are already up to date.
+
+    An asset is up to date when its input hash matches the manifest and the file on disk
+    still has the recorded output hash. A layer has no entry; it counts as up to date when
+    every task derived from it is. Returns (entries, unchanged filename -> output hash).
+    """
+    fonts = resolved_fonts()
+    input_hashes = {}
+    dependents = {}
+    entries = {}
+    unchanged = {}
+    for task in tasks:
+        source_hash = input_hashes[task.depends_on] if task.depends_on else None
+        inputs = asset_inputs(task, fonts, source_hash)
+        input_hashes[task.filename] = hash_inputs(inputs)
+        if task.depends_on:
+            dependents.setdefault(task.depends_on, []).append(task.filename)
+        if task.layer:
+            continue
+        entry = {'inputs': inputs, 'input_hash': input_hashes[task.filename]}
+        entries[task.filename] = entry
+        recorded = previous.get(task.filename, {})
+        if force or recorded.get('input_hash') != entry['input_hash']:
+            continue
+        output_hash = file_sha256(OUTPUT_DIR / task.filename)
+        if output_hash is not None and output_hash == recorded.get('output_hash'):
+            unchanged[task.filename] = output_hash
+    # A layer's tasks all come after it, so walking backwards settles them first
+    for task in reversed(tasks):
+        if task.layer and all(filename in unchanged for filename in dependents.get(task.filename, ())):
+            unchanged[task.filename] = None
+    return entries, unchanged
+
+
+def generate_all_assets(
+    jobs: int = 1,
+    force: bool = False,
+    spec_path: Path = SCREENSHOT_SPEC_PATH,
+    locales: Optional[List[str]] = None,
+    sizes: Optional[List[str]] = None
+):
+    """Generate all Play Store assets, re-rendering only those whose inputs changed."""
+    jobs = jobs or os.cpu_count() or 1
+    print("🎨 Generating Play Store assets...")
+
+    tasks = build_asset_tasks(spec_path, locales, sizes)
+    previous = load_manifest()
+    entries, unchanged = plan_asset_build(tasks, previous, force)
+    start = time.perf_counter()
+    results = run_asset_tasks(tasks, jobs, unchanged)
+    wall_s = time.perf_counter() - start
+    for filename, entry in entries.items():
+        entry['output_hash'] = results[filename].output_hash
+    # Keep entries of locales and sizes not built this time
+    write_manifest({**previous, **entries})
+
+    fonts = font_cache_stats(list(results.values()))
+    workers = f" in {fonts['workers']} workers" if fonts['workers'] > 1 else ""
+    print(f"  🔤 Fonts: {fonts['loads']} face/size loads of {fonts['faces']} distinct{workers}, "
+          f"{fonts['hits']} cache hits")
+    if fonts['reloaded']:
+        print(f"  ⚠️  Fonts reloaded after cache eviction: {fonts['reloaded']}")
+    layers = [task.filename for task in tasks if task.layer]
+    layer_renders = sum(results[filename].rebuilt for filename in layers)
+    screenshots = sum(results[task.filename].rebuilt for task in tasks if task.render is generate_screenshot)
+    print(f"  🧱 Screenshot layers: {layer_renders} rendered for {screenshots} screenshot(s)")
+    print_render_times(results, jobs, wall_s)
+    rebuilt = sum(results[filename].rebuilt for filename in entries)
+    print(f"\n🔁 Rebuilt {rebuilt} asset(s), skipped {len(entries) - rebuilt} unchanged"
+          + (" (use --force to rebuild all)" if unchanged else ""))
+
     print(f"\n✨ All assets generated successfully in: {OUTPUT_DIR}")
-    print(f"   Total files: {len(list(OUTPUT_DIR.glob('*.png')))}")
+    print(f"   Total files: {len(list(OUTPUT_DIR.rglob('*.png')))}")
 
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Generate the AI Keyboard Play Store assets.")
+    arg_parser.add_argument("--jobs", "-j", type=int, default=1,
+                            help="Render assets with N worker processes (0 = one per CPU, default: 1)")
+    arg_parser.add_argument("--force", action="store_true",
+                            help=f"Re-render every asset, even those unchanged since the last build ({MANIFEST_PATH.name})")
+    arg_parser.add_argument("--spec", type=Path, default=SCREENSHOT_SPEC_PATH,
+                            help=f"Screenshot spec with sizes, screenshots and localized text (default: {SCREENSHOT_SPEC_PATH.name})")
+    arg_parser.add_argument("--locale", action="append", dest="locales", metavar="LOCALE",
+                            help="Only render screenshots for this locale; repeat for several (default: all in the spec)")
+    arg_parser.add_argument("--size", action="append", dest="sizes", metavar="NAME",
+                            help="Only render screenshots at this spec size, e.g. phone; repeat for several "
+                                 "(default: every size in the spec, phone and both tablets in screenshots.json)")
+    args = arg_parser.parse_args()
+    if args.jobs < 0:
+        arg_parser.error("--jobs must be 0 or more")
     try:
-        generate_all_assets()
+        spec = load_screenshot_spec(args.spec)
+    except (OSError, ValueError) as e:
+        arg_parser.error(f"cannot load --spec: {e}")
+    for option, names, known in (("--locale", args.locales, spec['locales']), ("--size", args.sizes, spec['sizes'])):
+        unknown = [name for name in names or () if name not in known]
+        if unknown:
+            arg_parser.error(f"{option} {', '.join(unknown)} not in {args.spec.name}; choose from {', '.join(known)}")
+
+    try:
+        generate_all_assets(args.jobs, args.force, args.spec, args.locales, args.sizes)
     except Exception as e:
         print(f"❌ Error generating assets: {e}", file=sys.stderr)
         import traceback
         traceback.print_exc()
         sys.exit(1)
-
@@ -0,0 +1,867 @@
+#!/usr/bin/env python3
+"""
+Firebase Test Lab Parser Benchmark
+Generates deterministic synthetic Test Lab result trees and measures how fast
+parse_firebase_results.py analyses them, so changes can be compared across commits.
+
+    python3 scripts/benchmark_firebase_parser.py generate /tmp/corpus --devices 8 --log-mb 16
+    python3 scripts/benchmark_firebase_parser.py run /tmp/corpus --repeat 5 --output before.json
+    python3 scripts/benchmark_firebase_parser.py compare before.json after.json
+    python3 scripts/benchmark_firebase_parser.py fetch /tmp/corpus
+    python3 scripts/benchmark_firebase_parser.py check-json
+"""
+
+import os
+import sys
+import json
+import argparse
+import gc
+import hashlib
+import io
+import platform
+import random
+import statistics
+import subprocess
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from parse_firebase_results import (  # noqa: E402
+    APP_PACKAGE,
+    BUCKET_CRASH_LOG,
+    BUCKET_MEDIA,
+    GCS_EMULATOR_ENV,
+    PARSER_VERSION,
+    REPORT_FILENAME,
+    FirebaseResultParser,
+    JsonEventStream,
+    classify_result_file,
+)
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is not reported
+    resource = None
+
+# Bump whenever generated content changes, so results from different corpora are not compared
+GENERATOR_VERSION = "2"
+# Bump whenever the result JSON layout changes
+BENCHMARK_VERSION = "1"
+# Written next to the generated tree; the name is not classified as a result file
+CORPUS_PARAMS_FILENAME = "benchmark_corpus.txt"
+# Parser attributes measured for retained memory: report name -> attributes freed together
+RECORD_STORES = {
+    'crash': ('crashes',),
+    'testcase': ('testcase_timings', 'test_outcomes'),
+    'test_result': ('test_results',),
+    'screenshot': ('screenshots',),
+    'perf_sample': ('perf_samples',),
+}
+
+DEVICE_MODELS = (("Pixel6", 33), ("Pixel4", 30), ("GalaxyS21", 31), ("Nexus5X", 26), ("Pixel8", 34))
+DEVICE_LOCALES = ("en", "de", "ja", "es")
+DEVICE_ORIENTATIONS = ("portrait", "landscape")
+
+# Background logcat chatter: (tag, level, message template)
+NOISE_LINES = (
+    ("ActivityManager", "I", "Start proc {n}:com.android.vending/u0a{m} for service"),
+    ("InputMethodManagerService", "D", "onBindInputMethod: {n}"),
+    ("chatty", "I", "uid={m}({n}) identical {m} lines"),
+    ("AIKeyboardService", "D", "Key pressed: code={m}"),
+    ("SuggestionEngine", "V", "Computed {m} suggestions in {n}ms"),
+    ("GC", "I", "Explicit concurrent copying GC freed {n}(+{m}KB) AllocSpace objects"),
+    ("WindowManager", "W", "Window {n} not found, ignoring relayout"),
+    ("ONNXVoiceEngine", "D", "Decoded frame {n} ({m} tokens)"),
+)
+# Exceptions injected into Java crash traces; a small pool so signatures repeat across devices
+CRASH_EXCEPTIONS = (
+    ("java.lang.IllegalStateException", "ime.AIKeyboardService.onStartInputView"),
+    ("java.lang.NullPointerException", "ui.SuggestionStripView.bind"),
+    ("java.lang.OutOfMemoryError", "voiceinput.engine.onnx.ONNXVoiceEngine.loadModel"),
+    ("java.lang.IndexOutOfBoundsException", "prediction.NGramModel.next"),
+)
+NATIVE_LIBRARIES = ("libonnxruntime.so", "libsentencepiece.so", "libc.so")
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+MP4_HEADER = b"\x00\x00\x00\x18ftypmp42"
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus
+# ---------------------------------------------------------------------------
+
+def device_names(count: int) -> List[str]:
+    """Test Lab style "Model-API-locale-orientation" directory names."""
+    combos = [
+        (model, api, locale, orientation)
+        for orientation in DEVICE_ORIENTATIONS
+        for locale in DEVICE_LOCALES
+        for model, api in DEVICE_MODELS
+    ]
+    names = []
+    for i in range(count):
+        model, api, locale, orientation = combos[i % len(combos)]
+        if i >= len(combos):
+            model = f"{model}v{i // len(combos)}"
+        names.append(f"{model}-{api}-{locale}-{orientation}")
+    return names
+
+
+class LogcatWriter:
+    """Writes `adb logcat -v threadtime` lines with monotonically increasing timestamps."""
+
+    def __init__(self, f, rng: random.Random):
+        self.f = f
+        self.rng = rng
+        self.ms = rng.randrange(3600 * 1000)
+        self.bytes = 0
+
+    def line(self, pid: int, tid: int, level: str, tag: str, message: str):
+        self.ms += self.rng.randrange(1, 40)
+        seconds, ms = divmod(self.ms, 1000)
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        text = (
+            f"10-18 {hours % 24:02d}:{minutes:02d}:{seconds:02d}.{ms:03d} "
+            f"{pid:5d} {tid:5d} {level} {tag}: {message}\n"
+        )
+        self.f.write(text)
+        self.bytes += len(text)
+
+    def noise(self):
+        tag, level, template = self.rng.choice(NOISE_LINES)
+        pid = self.rng.randrange(300, 9000)
+        self.line(pid, pid, level, tag, template.format(n=self.rng.randrange(100000), m=self.rng.randrange(1000)))
+
+    def keyboard_startup(self, pid: int):
+        self.line(pid, pid, "D", "AIKeyboardService", "AI Keyboard Service onCreate")
+        self.ms += self.rng.randrange(120, 320)
+        self.line(pid, pid, "D", "AIKeyboardService", "AI Keyboard Service onStartInputView - restarting: false")
+
+    def model_load(self, pid: int):
+        self.line(pid, pid, "I", "ONNXVoiceEngine", "loadModel: whisper-tiny.onnx")
+        self.ms += self.rng.randrange(900, 2600)
+        self.line(pid, pid, "I", "ONNXVoiceEngine", "Model loaded in background")
+
+    def java_crash(self, pid: int):
+        exception, frame = self.rng.choice(CRASH_EXCEPTIONS)
+        self.line(pid, pid, "E", "AndroidRuntime", "FATAL EXCEPTION: main")
+        self.line(pid, pid, "E", "AndroidRuntime", f"Process: {APP_PACKAGE}, PID: {pid}")
+        self.line(pid, pid, "E", "AndroidRuntime", f"{exception}: synthetic failure {self.rng.randrange(1000)}")
+        self.line(pid, pid, "E", "AndroidRuntime", f"\tat {APP_PACKAGE}.{frame}(Source.kt:{self.rng.randrange(20, 400)})")
+        for depth in range(self.rng.randrange(3, 12)):
+            self.line(pid, pid, "E", "AndroidRuntime", f"\tat android.os.Handler.dispatchMessage(Handler.java:{100 + depth})")
+
+    def native_crash(self, pid: int):
+        tid = pid + self.rng.randrange(1, 50)
+        signal = self.rng.choice(((11, "SIGSEGV"), (6, "SIGABRT")))
+        self.line(pid, tid, "F", "libc", f"Fatal signal {signal[0]} ({signal[1]}), code 1, fault addr 0x0 "
+                                         f"in tid {tid} (DefaultDispatch), pid {pid} ({APP_PACKAGE})")
+        debuggerd = self.rng.randrange(9000, 12000)
+        self.line(debuggerd, debuggerd, "F", "DEBUG", "*** *** *** *** *** *** *** *** *** *** *** *** *** *** *** ***")
+        self.line(debuggerd, debuggerd, "F", "DEBUG", f"pid: {pid}, tid: {tid}, name: DefaultDispatch  >>> {APP_PACKAGE} <<<")
+        self.line(debuggerd, debuggerd, "F", "DEBUG", f"signal {signal[0]} ({signal[1]}), code 1, fault addr 0x0")
+        for frame, library in enumerate(self.rng.sample(NATIVE_LIBRARIES, 2)):
+            self.line(debuggerd, debuggerd, "F", "DEBUG",
+                      f"      #{frame:02d} pc {self.rng.randrange(1 << 32):016x}  /data/app/lib/arm64/{library} (Run+{frame * 64})")
+
+    def anr(self):
+        self.line(500, 520, "E", "ActivityManager", f"ANR in {APP_PACKAGE} ({APP_PACKAGE}/.ime.AIKeyboardService)")
+        self.line(500, 520, "E", "ActivityManager", f"PID: {self.rng.randrange(3000, 9000)}")
+        self.line(500, 520, "E", "ActivityManager", "Reason: Input dispatching timed out")
+
+
+def write_logcat(path: Path, rng: random.Random, target_bytes: int, crashes: int):
+    """Write one logcat of ~target_bytes with `crashes` crash blocks spread evenly through it."""
+    next_crash = target_bytes // (crashes + 1) if crashes else None
+    injected = 0
+    with open(path, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
+        log = LogcatWriter(f, rng)
+        while log.bytes < target_bytes:
+            roll = rng.random()
+            if roll < 0.002:
+                log.keyboard_startup(rng.randrange(3000, 9000))
+            elif roll < 0.0025:
+                log.model_load(rng.randrange(3000, 9000))
+            else:
+                log.noise()
+            if next_crash is not None and injected < crashes and log.bytes >= next_crash * (injected + 1):
+                kind = injected % 5
+                pid = rng.randrange(3000, 9000)
+                if kind == 4:
+                    log.anr()
+                elif kind == 2:
+                    log.native_crash(pid)
+                else:
+                    log.java_crash(pid)
+                # No blank line: as in real threadtime output, the next prefixed line ends the block
+                injected += 1
+
+
+def write_junit(path: Path, rng: random.Random, testcases: int, device_index: int):
+    """Write a JUnit XML with the same test names on every device; a few fail or skip per device."""
+    lines = []
+    failures = skipped = 0
+    for i in range(testcases):
+        suite = f"{APP_PACKAGE}.suite{i % 7}.Feature{i % 13}Test"
+        roll = rng.random()
+        body = ""
+        if roll < 0.04:
+            failures += 1
+            body = f'<failure message="expected:&lt;{i}&gt; but was:&lt;{i + 1}&gt;">java.lang.AssertionError at {suite}.test{i}</failure>'
+        elif roll < 0.06:
+            skipped += 1
+            body = "<skipped/>"
+        lines.append(
+            f'    <testcase classname="{suite}" name="test{i}" time="{rng.uniform(0.01, 3.0 + device_index):.3f}">'
+            f'{body}</testcase>'
+        )
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<testsuites>\n')
+        f.write(f'  <testsuite name="instrumentation" tests="{testcases}" failures="{failures}" skipped="{skipped}">\n')
+        f.write('\n'.join(lines))
+        f.write('\n  </testsuite>\n</testsuites>\n')
+
+
+def write_matrix(path: Path, devices: List[str], rng: random.Random):
+    executions = []
+    for i, device in enumerate(devices):
+        model, api, locale, orientation = device.split('-')
+        executions.append({
+            "id": str(i),
+            "state": "FINISHED" if rng.random() > 0.1 else "ERROR",
+            "environment": {"androidDevice": {
+                "androidModelId": model, "androidVersionId": api,
+                "locale": locale, "orientation": orientation,
+            }},
+        })
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "testMatrixId": f"matrix-{rng.randrange(1 << 32):08x}",
+            "state": "FINISHED",
+            "outcomeSummary": "FAILURE",
+            "timestamp": "2026-10-18T12:00:00Z",
+            "testExecutions": executions,
+        }, f)
+
+
+def write_perf_samples(path: Path, rng: random.Random, samples: int):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"perfSamples": [')
+        f.write(','.join(
+            f'{{"sampleTime": {{"seconds": "{i}", "nanos": 0}}, "value": {rng.uniform(0, 100):.2f}}}'
+            for i in range(samples)
+        ))
+        f.write(']}')
+
+
+def write_media(path: Path, rng: random.Random, header: bytes, size: int):
+    with open(path, 'wb') as f:
+        f.write(header + rng.randbytes(max(size - len(header), 0)))
+
+
+def generate_corpus(out: Path, params: Dict) -> Dict:
+    """Write a synthetic results tree; the same params always produce the same bytes."""
+    out.mkdir(parents=True, exist_ok=True)
+    devices = device_names(params['devices'])
+    seed = params['seed']
+
+    write_matrix(out / "matrix.json", devices, random.Random(f"{seed}:matrix"))
+    for index, device in enumerate(devices):
+        # One generator per device and file, so each file is independent of generation order
+        device_dir = out / device
+        (device_dir / "artifacts").mkdir(parents=True, exist_ok=True)
+        for k in range(params['logs']):
+            name = "logcat" if k == 0 else f"logcat_{k}"
+            write_logcat(
+                device_dir / name, random.Random(f"{seed}:{device}:{name}"),
+                int(params['log_mb'] * 1024 * 1024), params['crashes']
+            )
+        for k in range(params['xml']):
+            write_junit(
+                device_dir / f"test_result_{k}.xml", random.Random(f"{seed}:{device}:xml{k}"),
+                params['testcases'], index
+            )
+        if params['json_samples']:
+            write_perf_samples(
+                device_dir / "perf_samples_cpu.json", random.Random(f"{seed}:{device}:perf"),
+                params['json_samples']
+            )
+        media_rng = random.Random(f"{seed}:{device}:media")
+        for k in range(params['screenshots']):
+            write_media(device_dir / "artifacts" / f"screenshot_{k}.png", media_rng, PNG_SIGNATURE,
+                        params['media_kb'] * 1024)
+        if params['videos']:
+            for k in range(params['videos']):
+                write_media(device_dir / f"video_{k}.mp4", media_rng, MP4_HEADER, params['media_kb'] * 1024 * 4)
+
+    with open(out / CORPUS_PARAMS_FILENAME, 'w', encoding='utf-8') as f:
+        json.dump(dict(params, generator_version=GENERATOR_VERSION), f, indent=2, sort_keys=True)
+    return corpus_stats(out)
+
+
+def iter_corpus_files(root: Path) -> Iterator[Path]:
+    for current, dirs, files in os.walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            if name != REPORT_FILENAME and classify_result_file(name) is not None:
+                yield Path(current, name)
+
+
+def corpus_stats(root: Path) -> Dict:
+    """File and byte counts of the tree as the parser classifies it, plus a layout digest."""
+    files = parsed_files = total = parsed = 0
+    digest = hashlib.sha256()
+    for path in iter_corpus_files(root):
+        size = path.stat().st_size
+        digest.update(f"{path.relative_to(root).as_posix()}\0{size}\n".encode())
+        files += 1
+        total += size
+        if classify_result_file(path.name) != BUCKET_MEDIA:
+            parsed_files += 1
+            parsed += size
+
+    params = None
+    params_path = root / CORPUS_PARAMS_FILENAME
+    if params_path.is_file():
+        with open(params_path, encoding='utf-8') as f:
+            params = json.load(f)
+    return {
+        'files': files,
+        'parsed_files': parsed_files,
+        'bytes': total,
+        'parsed_bytes': parsed,
+        'digest': digest.hexdigest()[:16],
+        'params': params,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Benchmark runs
+# ---------------------------------------------------------------------------
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process and its finished workers, in MB."""
+    if resource is None:
+        return None
+    scale = 1 if sys.platform == 'darwin' else 1024  # ru_maxrss is bytes on macOS, KB elsewhere
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    return round(peak * scale / (1024 * 1024), 1)
+
+
+def run_once(corpus: Path, jobs: int, executor: str) -> Dict[str, float]:
+    """Time one uncached FirebaseResultParser.parse_all() in phases, plus the JSON report write."""
+    parser = FirebaseResultParser(str(corpus), jobs=jobs, executor=executor)
+    start = time.perf_counter()
+    error = parser.parse_records()
+    if error:
+        raise RuntimeError(error)
+    parsed = time.perf_counter()
+    report = parser._generate_report()
+    reported = time.perf_counter()
+    with open(os.devnull, 'w') as f:
+        json.dump(report, f, indent=2)
+    written = time.perf_counter()
+    return {
+        'parse_records_s': parsed - start,
+        'generate_report_s': reported - parsed,
+        'parse_all_s': reported - start,
+        'write_report_s': written - reported,
+    }
+
+
+def retained_record_memory(corpus: Path) -> Dict:
+    """Bytes each record store holds after an in-process parse, measured with tracemalloc.
+
+    Each store is measured by what freeing it releases, so strings interned and shared
+    with other stores are not counted against it.
+    """
+    tracemalloc.start()
+    try:
+        parser = FirebaseResultParser(str(corpus))
+        gc.collect()
+        baseline = tracemalloc.get_traced_memory()[0]
+        error = parser.parse_records()
+        if error:
+            raise RuntimeError(error)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+        stores = {}
+        for name, attrs in RECORD_STORES.items():
+            count = len(getattr(parser, attrs[0]))
+            before = tracemalloc.get_traced_memory()[0]
+            for attr in attrs:
+                setattr(parser, attr, type(getattr(parser, attr))())
+            gc.collect()
+            freed = before - tracemalloc.get_traced_memory()[0]
+            stores[name] = {'records': count, 'bytes': freed}
+    finally:
+        tracemalloc.stop()
+    memory = {'retained_mb': round(retained / (1024 * 1024), 1)}
+    for name, store in stores.items():
+        memory[f'bytes_per_{name}'] = round(store['bytes'] / store['records']) if store['records'] else None
+    return memory
+
+
+def git_revision() -> Dict:
+    here = Path(__file__).resolve().parent
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=here, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'],
+            cwd=here, capture_output=True, text=True, check=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+    return {'commit': commit, 'dirty': dirty}
+
+
+def run_benchmark(corpus: Path, repeat: int, warmup: int, jobs: int, executor: str) -> Dict:
+    stats = corpus_stats(corpus)
+    rss_before = peak_rss_mb()
+    for _ in range(warmup):
+        run_once(corpus, jobs, executor)
+    runs = []
+    for i in range(repeat):
+        runs.append(run_once(corpus, jobs, executor))
+        print(f"  run {i + 1}/{repeat}: parse_all {runs[-1]['parse_all_s']:.3f}s")
+    # Measured after the timed runs and their peak RSS, so tracemalloc overhead skews neither
+    peak_rss = peak_rss_mb()
+    retained = retained_record_memory(corpus)
+
+    phases = {}
+    for phase in runs[0]:
+        values = [run[phase] for run in runs]
+        phases[phase] = {
+            'median': round(statistics.median(values), 4),
+            'min': round(min(values), 4),
+            'max': round(max(values), 4),
+        }
+    parse_all = phases['parse_all_s']['median']
+    return {
+        'benchmark_version': BENCHMARK_VERSION,
+        'parser_version': PARSER_VERSION,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': {'jobs': jobs, 'executor': executor, 'repeat': repeat, 'warmup': warmup},
+        'corpus': stats,
+        'phases': phases,
+        'throughput': {
+            'files_per_s': round(stats['files'] / parse_all, 1) if parse_all else None,
+            'parsed_mb_per_s': round(stats['parsed_bytes'] / (1024 * 1024) / parse_all, 1) if parse_all else None,
+        },
+        'memory': {'baseline_rss_mb': rss_before, 'peak_rss_mb': peak_rss, **retained},
+        'runs': [{phase: round(value, 4) for phase, value in run.items()} for run in runs],
+    }
+
+
+def print_benchmark(result: Dict):
+    corpus = result['corpus']
+    print(f"\n⏱️  Parser benchmark ({result['config']['jobs']} job(s), {result['config']['executor']} executor)")
+    print(f"   Corpus: {corpus['files']} files, {corpus['bytes'] / (1024 * 1024):.1f} MB "
+          f"({corpus['parsed_files']} parsed files, {corpus['parsed_bytes'] / (1024 * 1024):.1f} MB)")
+    for phase, values in result['phases'].items():
+        print(f"   {phase:<20} median {values['median']:.3f}s  min {values['min']:.3f}s  max {values['max']:.3f}s")
+    throughput = result['throughput']
+    print(f"   Throughput: {throughput['files_per_s']} files/s, {throughput['parsed_mb_per_s']} MB/s")
+    memory = result['memory']
+    if memory['peak_rss_mb'] is not None:
+        print(f"   Peak RSS: {memory['peak_rss_mb']} MB (interpreter baseline {memory['baseline_rss_mb']} MB)")
+    per_record = ', '.join(
+        f"{memory[f'bytes_per_{name}']} B/{name}" for name in RECORD_STORES
+        if memory.get(f'bytes_per_{name}') is not None
+    )
+    print(f"   Retained records: {memory['retained_mb']} MB ({per_record})")
+
+
+# ---------------------------------------------------------------------------
+# GCS stand-in
+# ---------------------------------------------------------------------------
+
+class GcsStandIn(ThreadingHTTPServer):
+    """Serves a results tree as one bucket over the GCS JSON API calls the fetcher makes.
+
+    Listings are paged and downloads honour `Range: bytes=N-`. Faults are injected
+    deterministically by object index: the first request for every `fail_every`-th
+    object (and listing page) answers 503, and the first download of every
+    `truncate_every`-th object is cut off halfway, so retries and resumes both run.
+    Objects in `lost` stay listed but answer 404, as if deleted after the listing.
+    """
+    daemon_threads = True
+
+    def __init__(self, root: Path, bucket: str, prefix: str, page_size: int, fail_every: int, truncate_every: int):
+        super().__init__(('127.0.0.1', 0), GcsStandInHandler)
+        self.root = root
+        self.bucket = bucket
+        self.page_size = page_size
+        self.fail_every = fail_every
+        self.truncate_every = truncate_every
+        self.objects = {
+            f"{prefix}/{path.relative_to(root).as_posix()}": path for path in iter_corpus_files(root)
+        }
+        self.names = sorted(self.objects)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.lost = set()
+        self.stats = dict.fromkeys(('requests', 'listings', 'downloads', 'ranged', 'failed', 'truncated'), 0)
+        self._seen = set()
+        self._lock = threading.Lock()
+
+    def count(self, stat: str):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def first_time(self, key) -> bool:
+        """True only the first time `key` is requested."""
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            return True
+
+
+class GcsStandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        server.count('requests')
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        objects_path = f"/storage/v1/b/{server.bucket}/o"
+        if url.path == objects_path:
+            self.list_objects(query)
+        elif url.path.startswith(objects_path + '/') and query.get('alt') == ['media']:
+            self.download(unquote(url.path[len(objects_path) + 1:]))
+        else:
+            self.reply(404, b'not found')
+
+    def reply(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def inject_failure(self, kind: str, index: int) -> bool:
+        server = self.server
+        if server.fail_every and index % server.fail_every == 0 and server.first_time((kind, index)):
+            server.count('failed')
+            self.reply(503, b'injected failure')
+            return True
+        return False
+
+    def list_objects(self, query: Dict[str, List[str]]):
+        server = self.server
+        server.count('listings')
+        offset = int(query.get('pageToken', ['0'])[0])
+        if self.inject_failure('list', offset // server.page_size):
+            return
+        prefix = query.get('prefix', [''])[0]
+        names = [name for name in server.names if name.startswith(prefix)]
+        page = {}
+        items = names[offset:offset + server.page_size]
+        if items:
+            page['items'] = [{'name': name, 'size': str(server.objects[name].stat().st_size)} for name in items]
+        if offset + server.page_size < len(names):
+            page['nextPageToken'] = str(offset + server.page_size)
+        self.reply(200, json.dumps(page).encode(), {'Content-Type': 'application/json'})
+
+    def download(self, name: str):
+        server = self.server
+        if name not in server.objects or name in server.lost:
+            self.reply(404, b'no such object')
+            return
+        index = server.index[name]
+        if self.inject_failure('get', index):
+            return
+        server.count('downloads')
+        data = server.objects[name].read_bytes()
+        requested = self.headers.get('Range', '')
+        if requested.startswith('bytes='):
+            server.count('ranged')
+            start = int(requested[len('bytes='):].partition('-')[0])
+            self.reply(206, data[start:], {'Content-Range': f"bytes {start}-{len(data) - 1}/{len(data)}"})
+            return
+        if (
+            server.truncate_every and len(data) > 1 and (index + 1) % server.truncate_every == 0
+            and server.first_time(('truncate', index))
+        ):
+            server.count('truncated')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data[:len(data) // 2])
+            self.close_connection = True
+            return
+        self.reply(200, data)
+
+
+# Numbers in every JSON form, so each can be cut by the read window after any character
+JSON_SPLIT_DOCUMENTS = (
+    '{"cpu": [12.5, -3e-2, 1E+10, 0, 7, -0.25, 123456.789e-3], "ok": true, "name": "x"}',
+    '[[1.5, 2], {"ms": -10.125}, 3.0e5, null, 42]',
+    '-1234.5678e+9',
+)
+
+
+def json_events(value, depth: int, path: tuple = ()) -> Iterator[tuple]:
+    """The (path, value) pairs JsonEventStream.events() should yield for a decoded document."""
+    if depth <= 0 or not isinstance(value, (dict, list)):
+        yield path, value
+        return
+    for key, item in (value.items() if isinstance(value, dict) else enumerate(value)):
+        yield from json_events(item, depth - 1, path + (key,))
+
+
+def check_json_splits(depth: int = 2) -> bool:
+    """Stream each document with every first read-window size and compare with json.loads."""
+    ok = True
+    for document in JSON_SPLIT_DOCUMENTS:
+        expected = list(json_events(json.loads(document), depth))
+        failed = []
+        for window in range(1, len(document) + 1):
+            stream = JsonEventStream(io.StringIO(document), chunk_chars=window)
+            try:
+                events = list(stream.events(depth))
+            except ValueError as e:
+                failed.append(f"{window}: {e}")
+                continue
+            if events != expected:
+                failed.append(f"{window}: decoded {events!r}")
+        if failed:
+            print(f"❌ {document[:40]}: {len(failed)} of {len(document)} splits wrong, e.g. window {failed[0]}")
+            ok = False
+        else:
+            print(f"✅ {document[:40]}: all {len(document)} splits decode correctly")
+    return ok
+
+
+def comparable_report(report: Dict) -> Dict:
+    """The report without fields that differ between otherwise identical runs."""
+    summary = {key: value for key, value in report['summary'].items() if key not in ('scan_time', 'parse_cache')}
+    return dict(report, summary=summary)
+
+
+def run_fetch_check(corpus: Path, page_size: int, fail_every: int, truncate_every: int, concurrency: int) -> bool:
+    """Parse `corpus` through a faulty GCS stand-in and check the report equals a local parse."""
+    bucket, prefix = 'benchmark-results', corpus.resolve().name
+    server = GcsStandIn(corpus, bucket, prefix, page_size, fail_every, truncate_every)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    os.environ[GCS_EMULATOR_ENV] = f"127.0.0.1:{server.server_address[1]}"
+    print(f"🌐 GCS stand-in on {os.environ[GCS_EMULATOR_ENV]} serving {len(server.names)} objects")
+    try:
+        start = time.perf_counter()
+        fetched = FirebaseResultParser(f"gs://{bucket}/{prefix}", fetch_concurrency=concurrency).parse_all()
+        fetched_s = time.perf_counter() - start
+        missing = FirebaseResultParser(f"gs://{bucket}/{prefix}-missing").parse_all()
+        # One crash log that cannot be fetched must be reported, not silently dropped
+        lost = next(name for name in server.names if classify_result_file(name.rsplit('/', 1)[-1]) == BUCKET_CRASH_LOG)
+        server.lost.add(lost)
+        partial = FirebaseResultParser(f"gs://{bucket}/{prefix}").parse_all()
+    finally:
+        server.shutdown()
+        server.server_close()
+    start = time.perf_counter()
+    local = FirebaseResultParser(str(corpus)).parse_all()
+    local_s = time.perf_counter() - start
+
+    stats = server.stats
+    print(f"   Requests: {stats['requests']} ({stats['listings']} listing pages, {stats['downloads']} downloads, "
+          f"{stats['ranged']} ranged)")
+    print(f"   Injected: {stats['failed']} HTTP 503, {stats['truncated']} truncated bodies")
+    print(f"   Bucket parse {fetched_s:.3f}s, local parse {local_s:.3f}s")
+
+    ok = True
+    if 'error' in fetched:
+        print(f"❌ Bucket parse failed: {fetched['error']}")
+        ok = False
+    elif comparable_report(fetched) != comparable_report(local):
+        differing = sorted(key for key in local if fetched.get(key) != local[key])
+        print(f"❌ Bucket report differs from the local parse in: {', '.join(differing)}")
+        ok = False
+    else:
+        print("✅ Bucket report matches the local parse")
+    if stats['ranged'] < stats['truncated']:
+        print(f"❌ {stats['truncated']} truncated bodies but only {stats['ranged']} ranged resumes")
+        ok = False
+    if 'error' in missing:
+        print(f"✅ Empty prefix rejected: {missing['error']}")
+    else:
+        print("❌ An empty prefix was parsed as a clean run")
+        ok = False
+    failures = partial.get('summary', {}).get('fetch_failures', [])
+    if failures == [f"gs://{bucket}/{lost}"]:
+        print(f"✅ Unfetchable object reported in fetch_failures: {lost}")
+    else:
+        print(f"❌ Unfetchable object {lost} not reported; fetch_failures: {failures}")
+        ok = False
+    return ok
+
+
+# ---------------------------------------------------------------------------
+# Comparing results
+# ---------------------------------------------------------------------------
+
+def compare_results(base: Dict, new: Dict, threshold: float) -> List[Dict]:
+    """Rows of (metric, base, new, change); time and memory regress upwards, throughput downwards."""
+    metrics = [(f"phases.{phase}.median", True) for phase in base['phases'] if phase in new['phases']]
+    metrics += [("throughput.files_per_s", False), ("throughput.parsed_mb_per_s", False),
+                ("memory.peak_rss_mb", True)]
+    metrics += [(f"memory.bytes_per_{name}", True) for name in RECORD_STORES]
+    rows = []
+    for name, lower_is_better in metrics:
+        before, after = base, new
+        for key in name.split('.'):
+            before = before.get(key) if isinstance(before, dict) else None
+            after = after.get(key) if isinstance(after, dict) else None
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        worse = change > threshold if lower_is_better else change < -threshold
+        better = change < -threshold if lower_is_better else change > threshold
+        rows.append({
+            'metric': name,
+            'base': before,
+            'new': after,
+            'change': round(change, 4),
+            'status': 'regression' if worse else 'improvement' if better else 'ok',
+        })
+    return rows
+
+
+def print_comparison(base: Dict, new: Dict, rows: List[Dict]):
+    def label(result):
+        commit = result['revision']['commit']
+        text = commit[:10] if commit else 'unknown'
+        return text + ('+dirty' if result['revision']['dirty'] else '')
+
+    print(f"\n📊 Benchmark comparison: {label(base)} → {label(new)}")
+    if base['corpus']['digest'] != new['corpus']['digest']:
+        print("⚠️  Results were measured on different corpora; the comparison may not be meaningful")
+    if base['config'] != new['config']:
+        print(f"⚠️  Configurations differ: {base['config']} vs {new['config']}")
+    icons = {'regression': '❌', 'improvement': '✅', 'ok': '  '}
+    for row in rows:
+        print(f"{icons[row['status']]} {row['metric']:<32} {row['base']:>10} → {row['new']:>10}  ({row['change']:+.1%})")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(
+        description="Generate synthetic Test Lab results and benchmark parse_firebase_results.py."
+    )
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="Write a deterministic synthetic results tree")
+    generate.add_argument("output", help="Directory to create")
+    generate.add_argument("--devices", type=int, default=4, help="Device directories (default: 4)")
+    generate.add_argument("--logs", type=int, default=1, help="Logcat files per device (default: 1)")
+    generate.add_argument("--log-mb", type=float, default=8, help="Size of each logcat in MB (default: 8)")
+    generate.add_argument("--crashes", type=int, default=5, help="Crash blocks injected per logcat (default: 5)")
+    generate.add_argument("--xml", type=int, default=1, help="JUnit XML files per device (default: 1)")
+    generate.add_argument("--testcases", type=int, default=500, help="Testcases per JUnit XML (default: 500)")
+    generate.add_argument("--json-samples", type=int, default=2000,
+                          help="Samples in each device's perf JSON, 0 for none (default: 2000)")
+    generate.add_argument("--screenshots", type=int, default=10, help="Screenshots per device (default: 10)")
+    generate.add_argument("--videos", type=int, default=1, help="Videos per device (default: 1)")
+    generate.add_argument("--media-kb", type=int, default=64, help="Screenshot size in KB; videos are 4x (default: 64)")
+    generate.add_argument("--seed", type=int, default=1, help="Random seed (default: 1)")
+
+    run = commands.add_parser("run", help="Benchmark the parser on a results tree")
+    run.add_argument("corpus", help="Results directory, e.g. one written by 'generate'")
+    run.add_argument("--repeat", type=int, default=5, help="Measured runs (default: 5)")
+    run.add_argument("--warmup", type=int, default=1, help="Unmeasured runs first, to warm the page cache (default: 1)")
+    run.add_argument("--jobs", "-j", type=int, default=1, help="Parser --jobs value (default: 1)")
+    run.add_argument("--executor", choices=("process", "thread"), default="process",
+                     help="Parser --executor value (default: process)")
+    run.add_argument("--output", "-o", metavar="PATH", help="Write the machine-readable result JSON here")
+
+    compare = commands.add_parser("compare", help="Compare two result JSON files")
+    compare.add_argument("base", help="Result JSON of the reference commit")
+    compare.add_argument("new", help="Result JSON of the candidate commit")
+    compare.add_argument("--threshold", type=float, default=0.10,
+                         help="Relative change that counts as a regression (default: 0.10)")
+
+    fetch = commands.add_parser(
+        "fetch", help="Parse a results tree through a local GCS stand-in with injected faults"
+    )
+    fetch.add_argument("corpus", help="Results directory, e.g. one written by 'generate'")
+    fetch.add_argument("--page-size", type=int, default=50, help="Objects per listing page (default: 50)")
+    fetch.add_argument("--fail-every", type=int, default=5,
+                       help="Answer the first request for every Nth object with HTTP 503, 0 for none (default: 5)")
+    fetch.add_argument("--truncate-every", type=int, default=3,
+                       help="Cut off the first download of every Nth object halfway, 0 for none (default: 3)")
+    fetch.add_argument("--concurrency", type=int, default=16, help="Parser --fetch-concurrency value (default: 16)")
+
+    commands.add_parser(
+        "check-json", help="Check that JSON values split at every read-window offset decode correctly"
+    )
+    args = arg_parser.parse_args()
+
+    if args.command == "generate":
+        params = {key: getattr(args, key) for key in (
+            'devices', 'logs', 'log_mb', 'crashes', 'xml', 'testcases',
+            'json_samples', 'screenshots', 'videos', 'media_kb', 'seed'
+        )}
+        print(f"🏗️  Generating synthetic corpus in {args.output}")
+        stats = generate_corpus(Path(args.output), params)
+        print(f"✅ {stats['files']} files, {stats['bytes'] / (1024 * 1024):.1f} MB (digest {stats['digest']})")
+
+    elif args.command == "run":
+        corpus = Path(args.corpus)
+        if not corpus.is_dir():
+            print(f"❌ Error: {corpus} is not a directory")
+            sys.exit(1)
+        print(f"⏱️  Benchmarking {corpus}: {args.warmup} warmup + {args.repeat} measured runs")
+        result = run_benchmark(corpus, args.repeat, args.warmup, args.jobs, args.executor)
+        print_benchmark(result)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2)
+            print(f"💾 Result saved to: {args.output}")
+
+    elif args.command == "check-json":
+        if not check_json_splits():
+            sys.exit(1)
+
+    elif args.command == "fetch":
+        corpus = Path(args.corpus)
+        if not corpus.is_dir():
+            print(f"❌ Error: {corpus} is not a directory")
+            sys.exit(1)
+        if not run_fetch_check(corpus, max(1, args.page_size), args.fail_every, args.truncate_every,
+                               args.concurrency):
+            sys.exit(1)
+
+    else:
+        with open(args.base, encoding='utf-8') as f:
+            base = json.load(f)
+        with open(args.new, encoding='utf-8') as f:
+            new = json.load(f)
+        rows = compare_results(base, new, args.threshold)
+        print_comparison(base, new, rows)
+        regressed = [row['metric'] for row in rows if row['status'] == 'regression']
+        if regressed:
+            print(f"\n❌ Regressed by more than {args.threshold:.0%}: {', '.join(regressed)}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,274 +7,3168 @@ Extracts and summarizes crash logs, test failures, and performance metrics from
 import os
 import sys
 import json
+import argparse
+import asyncio
+import hashlib
+import heapq
+import io
+import http.client
+import math
+import queue
+import random
+import shutil
+import sqlite3
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
 import xml.etree.ElementTree as ET
 import re
+from collections import deque
+from fnmatch import translate
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from array import array
+from typing import AsyncIterator, Callable, Dict, IO, Iterator, List, NamedTuple, Tuple, Optional
+from urllib.parse import quote, urlencode, urlsplit
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Optional: only --dedup-screenshots decodes images (Pillow) and NumPy
+# vectorizes the hash comparisons; both are skipped when not installed
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+REPORT_FILENAME = "firebase_analysis_report.json"
+CACHE_FILENAME = ".firebase_parse_cache.sqlite"
+
+# Bump whenever per-file parse output changes so cached records are discarded
+PARSER_VERSION = "11"
+
+BUCKET_CRASH_LOG = "crash_log"
+BUCKET_TEST_RESULT = "test_result"
+BUCKET_PERF = "perf"
+BUCKET_MEDIA = "media"
+
+LOG_PATTERNS = ("*.log", "logcat*", "*test*log*")
+RESULT_SUFFIXES = ('.xml', '.json')
+PERF_PATTERNS = ("*perf*", "*performance*", "metrics*")
+IMAGE_SUFFIXES = ('.png', '.jpg', '.jpeg')
+VIDEO_SUFFIXES = ('.mp4', '.avi', '.mov')
+
+# Downloaded Test Lab artifacts that can be parsed without extracting them
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz')
+
+# One compiled alternation per bucket, so classifying a name is a single match
+_LOG_NAME_RE = re.compile("|".join(translate(p) for p in LOG_PATTERNS))
+_PERF_NAME_RE = re.compile("|".join(translate(p) for p in PERF_PATTERNS))
+
+# Crash signatures: top frames kept, and which frames count as "ours"
+SIGNATURE_FRAMES = 5
+APP_PACKAGE = 'com.aikeyboard'
+APP_FRAME_PREFIXES = (APP_PACKAGE + '.',)
+
+# Optional "MM-DD HH:MM:SS.mmm PID TID L Tag:" or "L/Tag(PID):" prefix on a trace line
+_LOGCAT_PREFIX_RE = re.compile(
+    r'^(?:\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+\s+\d+\s+\d+\s+[VDIWEFS]\s+[^:]*?\s*:\s?'
+    r'|[VDIWEFS]/[^(:]*\(\s*\d+\):\s?)'
+)
+_EXCEPTION_LINE_RE = re.compile(r'^(?:Caused by:\s*)?((?:[\w$]+\.)+[\w$]*(?:Exception|Error|Throwable)[\w$]*)(?::|$)')
+_FRAME_LOCATION_RE = re.compile(r'\([^)]*\)$')
+_HEX_RE = re.compile(r'0x[0-9a-fA-F]+')
+_SYNTHETIC_SUFFIX_RE = re.compile(r'\$(?:lambda\$)?\d+')
+_NUMBER_RE = re.compile(r'\d+')
+_NATIVE_SIGNAL_RE = re.compile(r'signal \d+ \((SIG\w+)\)')
+_NATIVE_FRAME_RE = re.compile(r'^#\d+\s+pc\s+[0-9a-fA-F]+\s+(\S+)(?:\s+\((.+?)(?:\+\d+)?\))?')
+_DEVICE_DIR_RE = re.compile(r'^[\w.]+-\d+-[\w]+-\w+$')
+
+# Latency metrics from PERFORMANCE_TESTING_GUIDE.md. Each is measured per
+# process as the time from a start event to the next matching end event;
+# tags are matched in full, messages with re.search. 'keywords' are
+# literals (the tag names), at least one of which appears in every start
+# or end line.
+PERF_METRICS = (
+    {
+        # IME service creation -> keyboard shown for input (first key render)
+        'name': 'keyboard_startup_ms',
+        'budget_ms': 200,
+        'start_tag': r'AIKeyboardService',
+        'start': r'^AI Keyboard Service onCreate$',
+        'end_tag': r'AIKeyboardService',
+        'end': r'onStartInputView|^Keyboard window shown',
+        'keywords': ('AIKeyboardService',),
+    },
+    {
+        # VoiceEngine.loadModel() -> engine reports the model ready
+        'name': 'model_load_ms',
+        'budget_ms': 2000,
+        'start_tag': r'\w*VoiceEngine|ModelManager|VoiceInputService',
+        'start': r'^(?:loadModel|Loading model)',
+        'end_tag': r'\w*VoiceEngine|ModelManager|VoiceInputService',
+        'end': r'[Mm]odel loaded',
+        'keywords': ('VoiceEngine', 'ModelManager', 'VoiceInputService'),
+    },
+    {
+        # Captured audio -> first partial transcription delivered
+        'name': 'partial_transcription_ms',
+        'budget_ms': 500,
+        'start_tag': r'\w*VoiceEngine|VoiceInputService',
+        'start': r'^(?:startCapture|[Ss]peech end|[Aa]udio chunk)',
+        'end_tag': r'\w*VoiceEngine|VoiceInputService|\w*ViewModel',
+        'end': r'partialTranscription|TranscriptionResult|[Pp]artial (?:result|transcription)',
+        'keywords': ('VoiceEngine', 'VoiceInputService', 'ViewModel'),
+    },
+)
+PERF_PERCENTILES = (50, 90, 99)
+# Percentile compared against each metric's budget for --fail-on-budget
+BUDGET_PERCENTILE = 90
+
+# Baseline regression gate: relative median slowdown and significance needed to fail
+REGRESSION_THRESHOLD = 0.10
+REGRESSION_ALPHA = 0.05
+MIN_REGRESSION_SAMPLES = 5
+# Samples kept per metric/device when --update-baseline appends a run
+BASELINE_HISTORY_LIMIT = 200
+
+# Number of slowest testcases listed in the report
+SLOWEST_TESTS_LIMIT = 10
+# Slowest files kept per stage in the --profile section
+PROFILE_SLOWEST_FILES = 5
+
+# --dedup-screenshots: 64-bit difference hash of a 9x8 grayscale thumbnail.
+# Screenshots within DHASH_DUPLICATE_BITS of each other are one cluster; one
+# further than DHASH_DIFF_BITS from the consensus of the same step on other
+# devices is flagged as a visual difference
+DHASH_SIZE = 8
+DHASH_DUPLICATE_BITS = 4
+DHASH_DIFF_BITS = 12
+# Cells of the pairwise distance matrix computed at once (8 bytes each)
+DHASH_BLOCK_CELLS = 4 * 1024 * 1024
+
+# Bounds that keep crash scanning memory constant regardless of log size
+LOG_CHUNK_CHARS = 1024 * 1024
+MAX_CRASH_LINES = 256
+MAX_CRASH_CHARS = 64 * 1024
+# Consecutive lines from other processes tolerated inside a threadtime crash block
+MAX_FOREIGN_LINES = 64
+
+# Report output formats; ndjson streams one record per line, then a summary line
+REPORT_FORMATS = ('json', 'compact', 'ndjson')
+COMPACT_SEPARATORS = (',', ':')
+COMPACT_BATCH = 1024
+# Report sections written as individual records in ndjson output
+STREAMED_SECTIONS = ('crashes', 'test_results', 'media_files', 'performance_files', 'performance_samples')
+
+# JSON results are decoded incrementally: containers down to this depth are
+# streamed, deeper values (one execution, one perf sample) are decoded whole
+JSON_STREAM_DEPTH = 2
+JSON_CHUNK_CHARS = 64 * 1024
+# Unknown JSON files are summarized by their first keys and a text preview
+JSON_KEYS_LIMIT = 50
+JSON_PREVIEW_CHARS = 2048
+_JSON_WS_RE = re.compile(r'[ \t\n\r]*')
+# Characters that can continue a JSON number
+_JSON_NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+# Live --follow mode: a crash block is reported once it has stopped growing
+# for FOLLOW_SETTLE_S, or FOLLOW_JOIN_SETTLE_S for FOLLOW_LATE_JOIN_TYPES
+# (debuggerd writes a native crash's tombstone well after "Fatal signal");
+# a followed file is polled every FOLLOW_POLL_S
+FOLLOW_SETTLE_S = 0.1
+FOLLOW_JOIN_SETTLE_S = 1.0
+FOLLOW_LATE_JOIN_TYPES = ('Native crash',)
+FOLLOW_POLL_S = 0.05
+FOLLOW_READ_BYTES = 64 * 1024
+# Chunks the stdin reader thread may queue ahead of the scanner
+FOLLOW_QUEUE_CHUNKS = 16
+
+# Fetching results straight from a gs:// bucket over the GCS JSON API.
+# STORAGE_EMULATOR_HOST points the fetcher at a local stand-in server.
+GCS_ENDPOINT = "https://storage.googleapis.com"
+GCS_EMULATOR_ENV = "STORAGE_EMULATOR_HOST"
+GCS_TOKEN_ENV = "GCS_ACCESS_TOKEN"
+FETCH_CONCURRENCY = 16
+FETCH_RETRIES = 4
+FETCH_BACKOFF_S = 0.5
+FETCH_TIMEOUT_S = 60
+FETCH_RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+FETCH_SPOOL_BYTES = 8 * 1024 * 1024
+
+# "MM-DD HH:MM:SS.mmm  PID  TID L Tag:" prefix of `adb logcat -v threadtime`
+_THREADTIME_RE = re.compile(
+    r'^(?P<timestamp>\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+)\s+(?P<pid>\d+)\s+(?P<tid>\d+)\s+'
+    r'(?P<level>[VDIWEFS])\s+(?P<tag>.*?)\s*:'
+)
+# "MM-DD HH:MM:SS.mmm L/Tag( PID):" prefix of `adb logcat -v time`
+_TIME_FORMAT_RE = re.compile(
+    r'^(?P<timestamp>\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}\.\d+)\s+(?P<level>[VDIWEFS])/'
+    r'(?P<tag>[^(]*?)\(\s*(?P<pid>\d+)\):'
+)
+# Any other timestamp form, searched on the crash line itself
+_TIMESTAMP_RE = re.compile(
+    r'\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}|\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}|\w{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}'
+)
+
+
+# Crash kinds recognized by CrashScanner, in priority order. Every line
+# goes through one shared pass over the literal 'keywords'; a kind's
+# detailed 'pattern' only runs on lines that pass hits, so adding kinds
+# barely changes scan cost. 'joins' lists open block types a hit continues
+# instead of starting a new crash; 'single_line' kinds close immediately.
+# A kind with 'requires' is only reported when its block contains a match,
+# for markers that name the crashing process on a later line.
+CRASH_PATTERNS: List[Dict] = []
+_prefilters: Dict[str, 'KeywordPrefilter'] = {}
+
+
+def register_crash_pattern(
+    crash_type: str,
+    keywords: Tuple[str, ...],
+    pattern: str,
+    joins: Tuple[str, ...] = (),
+    single_line: bool = False,
+    requires: Optional[str] = None
+):
+    """Add a crash kind to the scanner registry."""
+    CRASH_PATTERNS.append({
+        'type': crash_type,
+        'keywords': keywords,
+        'pattern': re.compile(pattern),
+        'joins': joins,
+        'single_line': single_line,
+        'requires': re.compile(requires) if requires else None,
+    })
+    _prefilters.clear()
+
+
+class KeywordPrefilter:
+    """Literal keyword test shared by all crash kinds and perf events.
+    
+    Keywords already covered by a shorter keyword are dropped, and each
+    remaining one is a C-level substring search. On logcat text this
+    measured several times faster than an equivalent re alternation, whose
+    first-character set matches at most positions.
+    """
+    
+    __slots__ = ('keywords',)
+    
+    def __init__(self, keywords: Iterator[str]):
+        unique = sorted(set(keywords), key=len)
+        kept: List[str] = []
+        for keyword in unique:
+            if not any(shorter in keyword for shorter in kept):
+                kept.append(keyword)
+        self.keywords = tuple(kept)
+    
+    def search(self, text: str) -> bool:
+        for keyword in self.keywords:
+            if keyword in text:
+                return True
+        return False
+
+
+def _keyword_prefilter(name: str, keywords: Iterator[str]) -> KeywordPrefilter:
+    if name not in _prefilters:
+        _prefilters[name] = KeywordPrefilter(keywords)
+    return _prefilters[name]
+
+
+def crash_prefilter() -> KeywordPrefilter:
+    """Keyword search covering every registered crash kind."""
+    return _keyword_prefilter('crash', (k for entry in CRASH_PATTERNS for k in entry['keywords']))
+
+
+def perf_prefilter() -> KeywordPrefilter:
+    """Keyword search covering every PERF_METRICS start and end event."""
+    return _keyword_prefilter('perf', (k for metric in PERF_METRICS for k in metric['keywords']))
+
+
+def log_prefilter() -> KeywordPrefilter:
+    """Keyword search for anything the log pass cares about; used to skip whole chunks."""
+    return _keyword_prefilter('log', (
+        [k for entry in CRASH_PATTERNS for k in entry['keywords']]
+        + [k for metric in PERF_METRICS for k in metric['keywords']]
+    ))
+
+
+register_crash_pattern('AndroidRuntime', ('FATAL',), r'AndroidRuntime.*?FATAL')
+register_crash_pattern('FATAL EXCEPTION', ('FATAL EXCEPTION:',), r'FATAL EXCEPTION:')
+register_crash_pattern('ANR', ('ANR in ',), r'ANR in ' + re.escape(APP_PACKAGE))
+register_crash_pattern(
+    'Native crash', ('Fatal signal', '*** *** ***'), r'Fatal signal \d+|(?:\*\*\* ){5}\*\*\*',
+    # the debuggerd tombstone that follows "Fatal signal" belongs to the same crash
+    joins=('Native crash',),
+    # any process can die of a signal: keep only the app's, named by "pid N (pkg)"
+    # on the signal line or by the ">>> pkg <<<" tombstone header
+    requires=r'\bpid \d+ \(' + re.escape(APP_PACKAGE) + r'\)|>>> ' + re.escape(APP_PACKAGE) + r' <<<'
+)
+register_crash_pattern(
+    'OutOfMemoryError', ('OutOfMemoryError',), r'java\.lang\.OutOfMemoryError',
+    # an OOM inside a Java crash trace is that crash's cause, not a second crash
+    joins=('AndroidRuntime', 'FATAL EXCEPTION')
+)
+register_crash_pattern(
+    'Low memory kill', ('lowmemorykiller', 'lmkd'),
+    r"(?:lowmemorykiller|lmkd)\b.*?\bKill(?:ing)?\b.*?" + re.escape(APP_PACKAGE),
+    single_line=True
+)
+
+
+def classify_result_file(name: str) -> Optional[str]:
+    """Classify a result file name into exactly one bucket, or None.
+    
+    Buckets are checked in the order the report lists them: crash logs,
+    test results, performance files, then media.
+    """
+    if _LOG_NAME_RE.match(name):
+        return BUCKET_CRASH_LOG
+    suffix = os.path.splitext(name)[1]
+    if suffix in RESULT_SUFFIXES:
+        return BUCKET_TEST_RESULT
+    if _PERF_NAME_RE.match(name):
+        return BUCKET_PERF
+    if suffix in IMAGE_SUFFIXES or suffix in VIDEO_SUFFIXES:
+        return BUCKET_MEDIA
+    return None
+
+
+def archive_suffix(path: Path) -> Optional[str]:
+    """Return the archive suffix of a results file path, or None for anything else."""
+    name = path.name.lower()
+    for suffix in ARCHIVE_SUFFIXES:
+        if name.endswith(suffix):
+            return suffix
+    return None
+
+
+def classify_member(name: str) -> Optional[Tuple[str, str]]:
+    """Normalize an archive member or object name and classify it.
+    
+    Returns (rel_path, bucket), where rel_path is the path the file would
+    have once extracted, or None for names to skip.
+    """
+    parts = [part for part in name.replace('\\', '/').split('/') if part not in ('', '.')]
+    if not parts or '..' in parts or parts[-1] == REPORT_FILENAME:
+        return None
+    bucket = classify_result_file(parts[-1])
+    return ('/'.join(parts), bucket) if bucket is not None else None
+
+
+def iter_archive_members(archive: Path) -> Iterator[Tuple[str, str, int, Callable[[], IO[bytes]]]]:
+    """Yield (rel_path, bucket, size, open) for each classified file in a zip or tar archive.
+    
+    Sizes come from member headers, so media is inventoried without
+    reading it. Tar members are visited in archive order, seeking only
+    forward; a member's opener is only valid until the iterator advances.
+    """
+    if archive_suffix(archive) == '.zip':
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                classified = classify_member(info.filename)
+                if classified is not None:
+                    yield classified + (info.file_size, lambda info=info: zf.open(info))
+        return
+    
+    with tarfile.open(archive, mode='r:*') as tf:
+        for member in tf:
+            if not member.isfile():
+                continue
+            classified = classify_member(member.name)
+            if classified is not None:
+                yield classified + (member.size, lambda member=member: tf.extractfile(member))
+
+
+def iter_text_chunks(f, size: int = LOG_CHUNK_CHARS) -> Iterator[Tuple[str, bool]]:
+    """Yield (chunk, mid_line) for chunks of about `size` characters that end on a line boundary.
+    
+    A single line longer than `size` is yielded in pieces, so memory stays
+    bounded even for a runaway line. mid_line is True when the chunk starts
+    with the continuation of such a line, whose first piece was already
+    yielded; that continuation must not be counted as a line of its own.
+    """
+    carry = ''
+    mid_line = False
+    while True:
+        data = f.read(size)
+        if not data:
+            if carry:
+                yield carry, mid_line
+            return
+        data = carry + data
+        cut = data.rfind('\n') + 1
+        if cut == 0 and len(data) < size:
+            carry = data
+            continue
+        if cut == 0:
+            cut = len(data)
+        carry = data[cut:]
+        yield data[:cut], mid_line
+        mid_line = data[cut - 1] != '\n'
+
+
+def chunk_lines(chunk: str) -> List[str]:
+    """Split a chunk into lines on '\\n' only, as logcat writes them.
+
+    str.splitlines() also breaks on form feeds, \\x1c-\\x1e and U+2028, which would
+    make line numbers disagree with chunk_line_count() for skipped chunks.
+    """
+    lines = chunk.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return lines
+
+
+def chunk_line_count(chunk: str) -> int:
+    """Number of lines chunk_lines() would return, without building them."""
+    return chunk.count('\n') + (0 if chunk.endswith('\n') else 1) if chunk else 0
+
+
+class JsonEventStream:
+    """Incremental JSON reader over a text stream.
+    
+    events() walks containers down to a fixed depth and yields a
+    (path, value) pair for each value below it, decoding every value with
+    json's C scanner from a sliding window. Memory is bounded by the
+    largest such value, not by the file.
+    """
+    
+    _scan = json.JSONDecoder().scan_once
+    
+    def __init__(self, f, chunk_chars: int = JSON_CHUNK_CHARS):
+        self.f = f
+        self.chunk_chars = chunk_chars
+        self.buf = f.read(chunk_chars)
+        self.pos = 0
+        self.eof = not self.buf
+        self.head = self.buf[:JSON_PREVIEW_CHARS]
+    
+    def _more(self, size: int) -> bool:
+        data = self.f.read(size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+        return True
+    
+    def peek(self) -> str:
+        """Next non-whitespace character without consuming it ('' at end of input)."""
+        buf, pos = self.buf, self.pos
+        if pos < len(buf) and buf[pos] not in ' \t\n\r':
+            return buf[pos]
+        while True:
+            self.pos = _JSON_WS_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof or not self._more(self.chunk_chars):
+                return ''
+    
+    def _separator(self, closer: str) -> bool:
+        """Consume ',' (True: more items follow) or the container's closer (False)."""
+        found = self.peek()
+        self.pos += 1
+        if found == ',':
+            return True
+        if found == closer:
+            return False
+        raise ValueError(f"Expected ',' or {closer!r} but found {found[:1]!r}")
+    
+    def value(self):
+        """Decode the next complete JSON value."""
+        size = self.chunk_chars
+        while True:
+            self.peek()
+            try:
+                value, end = self._scan(self.buf, self.pos)
+                # A number cut by the window edge ("12." | "5") scans as a shorter number;
+                # it is complete only once a character that cannot continue it follows
+                if self.eof or (end < len(self.buf) and self.buf[end] not in _JSON_NUMBER_CHARS):
+                    self.pos = end
+                    return value
+            except (StopIteration, json.JSONDecodeError) as e:
+                # Possibly just cut off by the window; only an error once input is exhausted
+                if self.eof:
+                    raise ValueError(f"Invalid JSON value: {e}") from None
+            self._more(size)
+            # Grow reads so a large value is rescanned only a few times
+            size *= 2
+    
+    def _key(self) -> str:
+        key = self.value()
+        if self.peek() != ':':
+            raise ValueError(f"Expected ':' after key {key!r}")
+        self.pos += 1
+        return key
+    
+    def events(self, depth: int = JSON_STREAM_DEPTH, path: Tuple = ()) -> Iterator[Tuple[Tuple, object]]:
+        opener = self.peek()
+        if depth <= 0 or opener not in ('{', '['):
+            yield path, self.value()
+            return
+        
+        is_object = opener == '{'
+        closer = '}' if is_object else ']'
+        self.pos += 1
+        if self.peek() == closer:
+            self.pos += 1
+            return
+        index = 0
+        more = True
+        while more:
+            key = self._key() if is_object else index
+            index += 1
+            if depth == 1:
+                # Leaf level: decode inline rather than through another generator
+                yield path + (key,), self.value()
+            else:
+                yield from self.events(depth - 1, path + (key,))
+            more = self._separator(closer)
+
+
+def parse_logcat_prefix(line: str) -> Optional[Dict]:
+    """Split the fixed logcat prefix off a line.
+    
+    Recognizes `-v threadtime` ("MM-DD HH:MM:SS.mmm PID TID L Tag:") and
+    `-v time` ("MM-DD HH:MM:SS.mmm L/Tag(PID):"). For any other line only a
+    timestamp found on the line itself is returned, never one from a
+    neighbouring line.
+    """
+    match = _THREADTIME_RE.match(line) or _TIME_FORMAT_RE.match(line)
+    if match:
+        fields = match.groupdict()
+        fields['pid'] = int(fields['pid'])
+        if fields.get('tid') is not None:
+            fields['tid'] = int(fields['tid'])
+        return fields
+    
+    match = _TIMESTAMP_RE.search(line)
+    if match:
+        return {'timestamp': match.group()}
+    return None
+
+
+class CrashScanner:
+    """Incremental, line-oriented detector for the crash kinds in CRASH_PATTERNS.
+    
+    Lines are fed one at a time and each crash is returned as soon as its
+    block ends, so only the open block (capped at MAX_CRASH_LINES) and a
+    line counter are ever held in memory. A block starts on a line matching
+    a registered crash pattern (Java FATAL EXCEPTION / AndroidRuntime, ANR,
+    native signal or tombstone, OutOfMemoryError, low-memory kill) and ends
+    at a blank line, the next crash, or end of input. Blocks of a kind with
+    'requires' that never match it (e.g. another process's native crash) are
+    dropped when they end. When the block starts on a
+    threadtime logcat line, only lines from the same pid and tag are kept, so
+    interleaved output from other processes does not leak into the trace.
+    
+    Timestamp, pid, tid and tag come from the prefix of the exact line that
+    opened the block, along with its 1-based line number.
+    """
+    
+    def __init__(self):
+        self._block: Optional[Dict] = None
+        self._line_no = 0
+    
+    def feed(self, line: str) -> List[Dict]:
+        """Consume one line and return any crashes it completed."""
+        completed = []
+        line = line.rstrip('\r\n')
+        self._line_no += 1
+        
+        start = self._match_start(line) if crash_prefilter().search(line) else None
+        if start is not None:
+            entry, offset = start
+            if self._block is not None and self._block['type'] in entry['joins']:
+                self._join(line)
+            else:
+                if self._block is not None:
+                    completed.extend(self._close())
+                self._open(line, entry, offset)
+                if entry['single_line']:
+                    completed.extend(self._close())
+        elif self._block is not None:
+            if not line or not self._extend(line):
+                completed.extend(self._close())
+        
+        return completed
+    
+    @property
+    def idle(self) -> bool:
+        """True when no crash block is open, i.e. lines without a marker can be skipped."""
+        return self._block is None
+    
+    def skip_lines(self, count: int):
+        """Advance the line counter past lines that were prefiltered away."""
+        self._line_no += count
+    
+    @property
+    def open_lines(self) -> int:
+        """Lines kept by the open block (0 when idle); growth means its trace is still being written."""
+        return len(self._block['lines']) if self._block is not None else 0
+    
+    @property
+    def open_type(self) -> Optional[str]:
+        """Crash type of the open block, or None when idle."""
+        return self._block['type'] if self._block is not None else None
+    
+    def finish(self) -> List[Dict]:
+        """Flush the open block, at end of input or once a live stream has gone quiet."""
+        if self._block is None:
+            return []
+        return self._close()
+    
+    @staticmethod
+    def _match_start(line: str) -> Optional[Tuple[Dict, int]]:
+        """Return (registry entry, marker offset) for the first crash kind matching the line."""
+        for entry in CRASH_PATTERNS:
+            match = entry['pattern'].search(line)
+            if match:
+                return entry, match.start()
+        return None
+    
+    def _join(self, line: str):
+        """Continue the open block with a line from a related crash marker.
+        
+        The block follows the joining line's process from here on, e.g.
+        the crash_dump/DEBUG process that writes a native tombstone.
+        """
+        block = self._block
+        prefix = parse_logcat_prefix(line) or {}
+        if 'pid' in prefix:
+            block['key'] = (prefix['pid'], prefix['tag'])
+        block['foreign_run'] = 0
+        if len(block['lines']) < MAX_CRASH_LINES and block['chars'] < MAX_CRASH_CHARS:
+            block['lines'].append(line)
+            block['chars'] += len(line)
+        else:
+            block['truncated'] = True
+    
+    def _open(self, line: str, entry: Dict, offset: int):
+        prefix = parse_logcat_prefix(line) or {}
+        self._block = {
+            'type': entry['type'],
+            'requires': entry['requires'],
+            'lines': [line[offset:]],
+            'chars': len(line) - offset,
+            'line': self._line_no,
+            'prefix': prefix,
+            'key': (prefix['pid'], prefix['tag']) if 'pid' in prefix else None,
+            'foreign_run': 0,
+            'truncated': False,
+        }
+    
+    def _extend(self, line: str) -> bool:
+        """Add a continuation line; returns False once the block has ended."""
+        block = self._block
+        if block['key'] is not None:
+            prefix = _THREADTIME_RE.match(line) or _TIME_FORMAT_RE.match(line)
+            if prefix and (int(prefix.group('pid')), prefix.group('tag')) != block['key']:
+                block['foreign_run'] += 1
+                return block['foreign_run'] <= MAX_FOREIGN_LINES
+            block['foreign_run'] = 0
+        
+        if len(block['lines']) >= MAX_CRASH_LINES or block['chars'] >= MAX_CRASH_CHARS:
+            block['truncated'] = True
+        else:
+            block['lines'].append(line)
+            block['chars'] += len(line)
+        return True
+    
+    def _close(self) -> List[Dict]:
+        """End the open block; returns its crash, or nothing when it lacks its required match."""
+        block, self._block = self._block, None
+        details = '\n'.join(block['lines']).strip()
+        if block['requires'] is not None and not block['requires'].search(details):
+            return []
+        if block['truncated']:
+            details += '\n... (truncated)'
+        crash = {
+            'type': block['type'],
+            'details': details,
+            'timestamp': block['prefix'].get('timestamp'),
+            'line': block['line'],
+        }
+        for field in ('pid', 'tid', 'tag'):
+            if block['prefix'].get(field) is not None:
+                crash[field] = block['prefix'][field]
+        return [crash]
+
+
+_PERF_RULES = [
+    {
+        'name': metric['name'],
+        'start_tag': re.compile(metric['start_tag']),
+        'start': re.compile(metric['start']),
+        'end_tag': re.compile(metric['end_tag']),
+        'end': re.compile(metric['end']),
+    }
+    for metric in PERF_METRICS
+]
+_EPOCH = datetime(2000, 1, 1)
+
+
+def logcat_time_ms(timestamp: str) -> float:
+    """Milliseconds for a "MM-DD HH:MM:SS.fff" logcat timestamp (year-less, leap-safe)."""
+    date_part, time_part = timestamp.split()
+    month, day = date_part.split('-')
+    clock, _, fraction = time_part.partition('.')
+    hour, minute, second = clock.split(':')
+    moment = datetime(2000, int(month), int(day), int(hour), int(minute), int(second))
+    millis = float('0.' + fraction) * 1000 if fraction else 0.0
+    return (moment - _EPOCH).total_seconds() * 1000 + millis
+
+
+class PerfEventPairer:
+    """Turns start/end logcat events into latency samples, paired per process.
+    
+    Only open starts are remembered (one per metric and pid), so memory
+    stays constant however long the log is.
+    """
+    
+    def __init__(self):
+        self._pending: Dict[Tuple[str, int], float] = {}
+    
+    def feed(self, line: str) -> List[Tuple[str, float]]:
+        """Consume one line and return any (metric, milliseconds) samples it closed."""
+        # Cheap first test: a perf event line contains one of its metric's tag keywords
+        if not perf_prefilter().search(line):
+            return []
+        prefix = _THREADTIME_RE.match(line) or _TIME_FORMAT_RE.match(line)
+        if not prefix:
+            return []
+        
+        tag = prefix.group('tag')
+        message = line[prefix.end():].strip()
+        pid = int(prefix.group('pid'))
+        at_ms = logcat_time_ms(prefix.group('timestamp'))
+        
+        samples = []
+        for rule in _PERF_RULES:
+            key = (rule['name'], pid)
+            if rule['end_tag'].fullmatch(tag) and rule['end'].search(message):
+                started = self._pending.pop(key, None)
+                if started is not None and at_ms >= started:
+                    samples.append((rule['name'], round(at_ms - started, 3)))
+            elif rule['start_tag'].fullmatch(tag) and rule['start'].search(message):
+                self._pending[key] = at_ms
+        return samples
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Linearly interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def _latency_stats(values: List[float]) -> Dict:
+    ordered = sorted(values)
+    stats = {'samples': len(ordered)}
+    for pct in PERF_PERCENTILES:
+        stats[f'p{pct}'] = round(percentile(ordered, pct), 1)
+    return stats
+
+
+def summarize_perf_samples(samples: List[Dict]) -> Dict:
+    """Per-metric, per-device percentiles and budget verdicts for the report summary."""
+    by_metric = group_perf_samples(samples)
+    
+    summary = {}
+    for metric in PERF_METRICS:
+        devices = by_metric.get(metric['name'])
+        if not devices:
+            continue
+        budget_key = f'p{BUDGET_PERCENTILE}'
+        device_stats = {device: _latency_stats(values) for device, values in sorted(devices.items())}
+        summary[metric['name']] = dict(
+            _latency_stats([v for values in devices.values() for v in values]),
+            budget_ms=metric['budget_ms'],
+            devices=device_stats,
+            over_budget=sorted(
+                device for device, stats in device_stats.items()
+                if stats[budget_key] > metric['budget_ms']
+            ),
+        )
+    return summary
+
+
+def group_perf_samples(samples: List[Dict]) -> Dict[str, Dict[str, List[float]]]:
+    """Group flat perf samples as {metric: {device: [ms, ...]}}."""
+    grouped: Dict[str, Dict[str, List[float]]] = {}
+    for sample in samples:
+        grouped.setdefault(sample['metric'], {}).setdefault(sample['device'], []).append(sample['ms'])
+    return grouped
+
+
+def mann_whitney_greater(current: List[float], baseline: List[float]) -> float:
+    """One-sided Mann-Whitney U p-value that `current` tends to be larger than `baseline`.
+    
+    Uses the normal approximation with tie and continuity corrections,
+    which is adequate for the handful-to-hundreds of samples a run yields.
+    """
+    n1, n2 = len(current), len(baseline)
+    combined = sorted([(value, 0) for value in current] + [(value, 1) for value in baseline])
+    n = n1 + n2
+    
+    rank_sum = 0.0
+    tie_term = 0.0
+    i = 0
+    while i < n:
+        j = i
+        while j + 1 < n and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        average_rank = (i + j) / 2.0 + 1
+        ties = j - i + 1
+        tie_term += ties ** 3 - ties
+        rank_sum += average_rank * sum(1 for k in range(i, j + 1) if combined[k][1] == 0)
+        i = j + 1
+    
+    u_current = rank_sum - n1 * (n1 + 1) / 2.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u_current - n1 * n2 / 2.0 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare_to_baseline(
+    current: Dict[str, Dict[str, List[float]]],
+    baseline: Dict[str, Dict[str, List[float]]],
+    threshold: float = REGRESSION_THRESHOLD,
+    alpha: float = REGRESSION_ALPHA
+) -> List[Dict]:
+    """Compare grouped latency samples against a baseline, per metric and device.
+    
+    A row is a regression only when the median got slower by more than
+    `threshold` (relative) and the Mann-Whitney test says the shift is
+    significant at `alpha`; rows with too few samples on either side are
+    reported but never fail the gate. Each metric also gets a pooled row
+    across all devices ("*").
+    """
+    rows = []
+    for metric in PERF_METRICS:
+        name = metric['name']
+        now_devices = current.get(name, {})
+        base_devices = baseline.get(name, {})
+        if not now_devices and not base_devices:
+            continue
+        
+        pairs = [(device, now_devices.get(device, []), base_devices.get(device, []))
+                 for device in sorted(set(now_devices) | set(base_devices))]
+        pairs.append((
+            '*',
+            [v for values in now_devices.values() for v in values],
+            [v for values in base_devices.values() for v in values],
+        ))
+        
+        for device, now, base in pairs:
+            row = {'metric': name, 'device': device, 'current_n': len(now), 'baseline_n': len(base)}
+            if now:
+                row['current_p50'] = round(percentile(sorted(now), 50), 1)
+            if base:
+                row['baseline_p50'] = round(percentile(sorted(base), 50), 1)
+            
+            if len(now) < MIN_REGRESSION_SAMPLES or len(base) < MIN_REGRESSION_SAMPLES:
+                row['status'] = 'insufficient data'
+            else:
+                p_value = mann_whitney_greater(now, base)
+                delta = (row['current_p50'] - row['baseline_p50']) / row['baseline_p50'] if row['baseline_p50'] else 0.0
+                row['delta_pct'] = round(delta * 100, 1)
+                row['p_value'] = round(p_value, 4)
+                row['status'] = 'regression' if delta > threshold and p_value < alpha else 'ok'
+            rows.append(row)
+    return rows
+
+
+def load_perf_baseline(path: Path) -> Dict[str, Dict[str, List[float]]]:
+    """Load {metric: {device: [ms, ...]}} samples from a baseline file.
+
+    Raises OSError if the file cannot be read and ValueError if it is not a baseline.
+    """
+    with open(path, 'r') as f:
+        baseline = json.load(f)
+    samples = baseline.get('samples') if isinstance(baseline, dict) else None
+    if not isinstance(samples, dict) or not all(isinstance(devices, dict) for devices in samples.values()):
+        raise ValueError("expected {\"samples\": {metric: {device: [ms, ...]}}}")
+    return samples
+
+
+def update_perf_baseline(path: Path, samples: List[Dict], keep: int = BASELINE_HISTORY_LIMIT):
+    """Append this run's samples to a baseline file, keeping the newest `keep` per metric/device."""
+    merged = load_perf_baseline(path) if path.exists() else {}
+    for metric, devices in group_perf_samples(samples).items():
+        for device, values in devices.items():
+            history = merged.setdefault(metric, {}).setdefault(device, [])
+            history.extend(values)
+            del history[:-keep]
+    
+    with open(path, 'w') as f:
+        json.dump(
+            {'parser_version': PARSER_VERSION, 'updated': datetime.now().isoformat(), 'samples': merged},
+            f, indent=2, sort_keys=True
+        )
+
+
+def device_from_path(rel_path: str) -> str:
+    """Best-effort device label for a result file.
+    
+    Test Lab stores each execution under a "<model>-<api>-<locale>-<orientation>"
+    directory; fall back to the file's parent directory otherwise.
+    """
+    parts = Path(rel_path).parts
+    for part in parts[:-1]:
+        if _DEVICE_DIR_RE.match(part):
+            return part
+    return str(Path(rel_path).parent) if len(parts) > 1 else '.'
+
+
+def screenshot_dhash(raw: IO[bytes]) -> str:
+    """Difference hash of an image as 16 hex digits.
+    
+    The image is decoded at reduced scale where the format allows it,
+    shrunk to a (DHASH_SIZE + 1) x DHASH_SIZE grayscale thumbnail, and
+    each bit records whether a pixel is brighter than its right-hand
+    neighbour, so the hash survives rescaling and recompression.
+    """
+    with Image.open(raw) as image:
+        image.draft('L', ((DHASH_SIZE + 1) * 8, DHASH_SIZE * 8))
+        thumb = image.convert('L').resize(
+            (DHASH_SIZE + 1, DHASH_SIZE), Image.Resampling.BOX, reducing_gap=2.0
+        )
+    pixels = thumb.tobytes()
+    if np is not None:
+        grid = np.frombuffer(pixels, dtype=np.uint8).reshape(DHASH_SIZE, DHASH_SIZE + 1)
+        return np.packbits(grid[:, :-1] > grid[:, 1:]).tobytes().hex()
+    value = 0
+    for row in range(0, len(pixels), DHASH_SIZE + 1):
+        for col in range(row, row + DHASH_SIZE):
+            value = value << 1 | (pixels[col] > pixels[col + 1])
+    return f"{value:0{DHASH_SIZE * DHASH_SIZE // 4}x}"
+
+
+_POPCOUNT_8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8) if np is not None else None
+
+
+def _hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def _near_duplicate_pairs(hashes: List[int], max_bits: int) -> Iterator[Tuple[int, int]]:
+    """Yield index pairs (i < j) of hashes at most max_bits apart.
+    
+    With NumPy the distance matrix is computed block by block as XOR plus
+    popcount over uint64 arrays; otherwise pairs are compared one by one.
+    """
+    if np is None:
+        for i, a in enumerate(hashes):
+            for j in range(i + 1, len(hashes)):
+                if _hamming(a, hashes[j]) <= max_bits:
+                    yield i, j
+        return
+    
+    values = np.array(hashes, dtype=np.uint64)
+    rows_per_block = max(1, DHASH_BLOCK_CELLS // max(len(values), 1))
+    for start in range(0, len(values), rows_per_block):
+        # Upper triangle only: row i is compared with hashes i.. onwards
+        block = values[start:start + rows_per_block, None] ^ values[None, start:]
+        if hasattr(np, 'bitwise_count'):  # NumPy >= 2.0
+            distances = np.bitwise_count(block)
+        else:
+            distances = _POPCOUNT_8[block.view(np.uint8)].reshape(block.shape + (8,)).sum(axis=-1)
+        rows, cols = np.nonzero(distances <= max_bits)
+        for i, j in zip((rows + start).tolist(), (cols + start).tolist()):
+            if i < j:
+                yield i, j
+
+
+def screenshot_step(rel_path: str) -> Optional[Tuple[str, str]]:
+    """(path below the device directory, orientation) for comparing a screenshot across devices.
+    
+    Returns None for screenshots outside a Test Lab device directory.
+    """
+    parts = Path(rel_path).parts
+    for index, part in enumerate(parts[:-1]):
+        if _DEVICE_DIR_RE.match(part):
+            return '/'.join(parts[index + 1:]), part.rsplit('-', 1)[-1]
+    return None
+
+
+def dedup_screenshots(screenshots: List[Dict]) -> Dict:
+    """Cluster near-duplicate screenshots and flag per-device visual differences.
+    
+    Clusters join screenshots within DHASH_DUPLICATE_BITS (single
+    linkage); the first path of each is its representative, so only
+    those need to be archived. Screenshots of the same step (path below
+    the device directory, per orientation) on several devices are
+    compared with the group's medoid hash, and outliers beyond
+    DHASH_DIFF_BITS are reported as visual differences.
+    """
+    hashed = sorted((shot for shot in screenshots if 'dhash' in shot), key=lambda shot: shot['path'])
+    
+    # Exact duplicates collapse first, so pairwise work is over distinct hashes
+    by_hash: Dict[int, List[Dict]] = {}
+    for shot in hashed:
+        by_hash.setdefault(int(shot['dhash'], 16), []).append(shot)
+    distinct = list(by_hash)
+    parent = list(range(len(distinct)))
+    
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    for i, j in _near_duplicate_pairs(distinct, DHASH_DUPLICATE_BITS):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+    
+    clusters: Dict[int, List[Dict]] = {}
+    for index, value in enumerate(distinct):
+        clusters.setdefault(find(index), []).extend(by_hash[value])
+    
+    groups = []
+    duplicates = []
+    duplicate_mb = 0.0
+    for members in clusters.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda shot: shot['path'])
+        representative = members[0]
+        base = int(representative['dhash'], 16)
+        groups.append({
+            'representative': representative['path'],
+            'members': [shot['path'] for shot in members],
+            'max_distance': max(_hamming(base, int(shot['dhash'], 16)) for shot in members),
+        })
+        duplicates.extend(shot['path'] for shot in members[1:])
+        duplicate_mb += sum(shot['size_mb'] for shot in members[1:])
+    groups.sort(key=lambda group: (-len(group['members']), group['representative']))
+    
+    return {
+        'hashed': len(hashed),
+        'clusters': len(clusters),
+        'duplicates': len(duplicates),
+        'duplicate_mb': round(duplicate_mb, 2),
+        'groups': groups,
+        'duplicate_paths': sorted(duplicates),
+        'visual_diffs': _screenshot_visual_diffs(hashed),
+    }
+
+
+def _screenshot_visual_diffs(hashed: List[Dict]) -> List[Dict]:
+    steps: Dict[Tuple[str, str], List[Dict]] = {}
+    for shot in hashed:
+        step = screenshot_step(shot['path'])
+        if step is not None:
+            steps.setdefault(step, []).append(shot)
+    
+    diffs = []
+    for (step, orientation), shots in sorted(steps.items()):
+        if len({device_from_path(shot['path']) for shot in shots}) < 2:
+            continue
+        values = [int(shot['dhash'], 16) for shot in shots]
+        # Medoid: the screenshot closest to all others stands in for "what this step looks like"
+        totals = [sum(_hamming(a, b) for b in values) for a in values]
+        medoid = totals.index(min(totals))
+        for shot, value in zip(shots, values):
+            distance = _hamming(value, values[medoid])
+            if distance > DHASH_DIFF_BITS:
+                diffs.append({
+                    'step': step,
+                    'orientation': orientation,
+                    'path': shot['path'],
+                    'device': device_from_path(shot['path']),
+                    'distance': distance,
+                    'consensus': shots[medoid]['path'],
+                    'devices': len(shots),
+                })
+    return diffs
+
+
+def device_model_api(device: str) -> str:
+    """Collapse a "<model>-<api>-<locale>-<orientation>" label to "<model>-<api>".
+    
+    Labels that don't follow the Test Lab layout are returned unchanged.
+    """
+    if _DEVICE_DIR_RE.match(device):
+        return '-'.join(device.split('-', 2)[:2])
+    return device
+
+
+def _normalize_frame(frame: str) -> str:
+    """Strip line numbers, addresses and synthetic suffixes from one stack frame."""
+    frame = _FRAME_LOCATION_RE.sub('', frame)
+    frame = _HEX_RE.sub('0x?', frame)
+    frame = _SYNTHETIC_SUFFIX_RE.sub('$', frame)
+    return frame.strip()
+
+
+def crash_signature(details: str, frame_limit: int = SIGNATURE_FRAMES) -> Dict:
+    """Reduce a crash trace to a stable signature.
+    
+    The signature is the root-cause exception class (or native signal name)
+    plus its top app frames (or top frames if none belong to the app), with logcat prefixes, line
+    numbers, addresses, PIDs and thread ids removed, hashed to a short id.
+    """
+    exception = None
+    frames: List[str] = []
+    for raw in details.split('\n'):
+        line = _LOGCAT_PREFIX_RE.sub('', raw).strip()
+        exc_match = _EXCEPTION_LINE_RE.match(line)
+        if exc_match:
+            # Later "Caused by:" blocks replace the wrapper: the root cause wins
+            exception = exc_match.group(1)
+            frames = []
+            continue
+        if line.startswith('at ') and exception is not None:
+            frames.append(_normalize_frame(line[3:]))
+            continue
+        
+        # Native crashes: signal name plus "#NN pc ADDR /path/lib.so (symbol+off)" frames
+        signal_match = _NATIVE_SIGNAL_RE.search(line)
+        if signal_match and exception is None:
+            exception = signal_match.group(1)
+            continue
+        frame_match = _NATIVE_FRAME_RE.match(line)
+        if frame_match and exception is not None:
+            library = os.path.basename(frame_match.group(1))
+            symbol = frame_match.group(2)
+            frames.append(f"{library} ({symbol})" if symbol else library)
+    
+    app_frames = [f for f in frames if f.startswith(APP_FRAME_PREFIXES)]
+    top_frames = (app_frames or frames)[:frame_limit]
+    
+    if exception is None:
+        # No Java trace: fall back to the first line with every number masked
+        first_line = _LOGCAT_PREFIX_RE.sub('', details.split('\n', 1)[0]).strip()
+        exception = _NUMBER_RE.sub('#', first_line)
+    
+    key = '\n'.join([exception] + top_frames)
+    return {
+        'signature': hashlib.sha1(key.encode('utf-8')).hexdigest()[:12],
+        'exception': exception,
+        'frames': top_frames,
+    }
+
+
+class CrashSignatureIndex:
+    """Crashes aggregated by signature: counts, where they hit and one sample trace."""
+    
+    def __init__(self):
+        self.entries: Dict[str, Dict] = {}
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def add(self, crash: Dict) -> str:
+        """Index one crash occurrence (with details) and return its signature."""
+        sig = crash_signature(crash.get('details', ''))
+        entry = self.entries.get(sig['signature'])
+        if entry is None:
+            entry = self.entries[sig['signature']] = {
+                'signature': sig['signature'],
+                'type': crash.get('type'),
+                'exception': sig['exception'],
+                'frames': sig['frames'],
+                'count': 0,
+                'files': {},
+                'devices': {},
+                'first_timestamp': crash.get('timestamp'),
+                'representative': crash.get('details', ''),
+            }
+        self._count(entry, 1, [crash['file']], [device_from_path(crash['file'])])
+        return sig['signature']
+    
+    @staticmethod
+    def _count(entry: Dict, count: int, files: List[str], devices: List[str]):
+        # files/devices are insertion-ordered dicts used as sets
+        entry['count'] += count
+        entry['files'].update(dict.fromkeys(files))
+        entry['devices'].update(dict.fromkeys(devices))
+    
+    def export(self) -> List[Dict]:
+        """JSON-ready entries in insertion order."""
+        return [
+            dict(entry, files=list(entry['files']), devices=list(entry['devices']))
+            for entry in self.entries.values()
+        ]
+    
+    def to_list(self) -> List[Dict]:
+        """JSON-ready entries, most frequent first."""
+        return sorted(self.export(), key=lambda e: (-e['count'], e['files'][0], e['signature']))
+    
+    def merge(self, entries: List[Dict]):
+        """Fold in exported entries from another index (a worker or the parse cache)."""
+        for other in entries:
+            entry = self.entries.get(other['signature'])
+            if entry is None:
+                entry = self.entries[other['signature']] = dict(other, count=0, files={}, devices={})
+            self._count(entry, other['count'], other['files'], other['devices'])
+
+
+class TestcaseTimings:
+    """Columnar store of per-testcase durations.
+    
+    Suite names are interned into a small table and referenced by index,
+    durations live in a packed array, so millions of testcases cost a few
+    machine words each instead of a dict apiece.
+    """
+    
+    __slots__ = ('suites', '_suite_index', 'suite_ids', 'names', 'times')
+    
+    def __init__(self):
+        self.suites: List[str] = []
+        self._suite_index: Dict[str, int] = {}
+        self.suite_ids = array('I')
+        self.names: List[str] = []
+        self.times = array('d')
+    
+    def __len__(self) -> int:
+        return len(self.times)
+    
+    def add(self, suite: str, name: str, duration: float):
+        suite_id = self._suite_index.get(suite)
+        if suite_id is None:
+            suite_id = self._suite_index[suite] = len(self.suites)
+            self.suites.append(suite)
+        self.suite_ids.append(suite_id)
+        self.names.append(name)
+        self.times.append(duration)
+    
+    def to_dict(self) -> Dict[str, list]:
+        """Plain-list form used to ship timings between processes and the cache."""
+        return {
+            'suites': list(self.suites),
+            'suite': self.suite_ids.tolist(),
+            'name': list(self.names),
+            'time': self.times.tolist(),
+        }
+    
+    def extend(self, data: Dict[str, list]):
+        """Append timings produced by to_dict(), remapping suite ids."""
+        suites = data.get('suites', [])
+        for suite_id, name, duration in zip(data.get('suite', []), data.get('name', []), data.get('time', [])):
+            self.add(suites[suite_id], name, duration)
+    
+    def total_time(self) -> float:
+        return sum(self.times)
+    
+    def slowest(self, limit: int) -> List[Dict]:
+        """The `limit` slowest testcases, slowest first."""
+        top = heapq.nlargest(limit, range(len(self.times)), key=self.times.__getitem__)
+        return [
+            {
+                'suite': self.suites[self.suite_ids[i]],
+                'name': self.names[i],
+                'time_s': round(self.times[i], 3)
+            }
+            for i in top
+        ]
+    
+    def by_suite(self) -> List[Dict]:
+        """Per-suite testcase counts and total duration, longest suite first."""
+        counts = [0] * len(self.suites)
+        totals = [0.0] * len(self.suites)
+        for suite_id, duration in zip(self.suite_ids, self.times):
+            counts[suite_id] += 1
+            totals[suite_id] += duration
+        rollup = [
+            {'suite': suite, 'tests': counts[i], 'time_s': round(totals[i], 3)}
+            for i, suite in enumerate(self.suites)
+        ]
+        rollup.sort(key=lambda item: (-item['time_s'], item['suite']))
+        return rollup
+
+
+class TestcaseTimingRollup:
+    """Running testcase duration totals: per suite, overall and the slowest few.
+    
+    Reports the same as TestcaseTimings but keeps no per-testcase columns,
+    so timings folded in shard by shard cost a row per suite rather than
+    one per testcase.
+    """
+    
+    __slots__ = ('limit', 'count', 'total', 'suite_totals', '_slowest')
+    
+    def __init__(self, limit: int = SLOWEST_TESTS_LIMIT):
+        self.limit = limit
+        self.count = 0
+        self.total = 0.0
+        # suite -> [testcases, seconds], in first-seen order like TestcaseTimings.suites
+        self.suite_totals: Dict[str, list] = {}
+        # (seconds, -arrival order, suite, name); the order keeps ties on the earlier testcase
+        self._slowest: List[Tuple[float, int, str, str]] = []
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def extend(self, data: Dict[str, list]):
+        """Fold in timings produced by TestcaseTimings.to_dict()."""
+        suites = data.get('suites', [])
+        candidates = []
+        for suite_id, name, duration in zip(data.get('suite', []), data.get('name', []), data.get('time', [])):
+            suite = suites[suite_id]
+            totals = self.suite_totals.get(suite)
+            if totals is None:
+                totals = self.suite_totals[suite] = [0, 0.0]
+            totals[0] += 1
+            totals[1] += duration
+            self.total += duration
+            candidates.append((duration, -self.count, suite, name))
+            self.count += 1
+        self._slowest = heapq.nlargest(self.limit, self._slowest + heapq.nlargest(self.limit, candidates))
+    
+    def total_time(self) -> float:
+        return self.total
+    
+    def slowest(self, limit: int) -> List[Dict]:
+        """The `limit` (at most the rollup's own limit) slowest testcases, slowest first."""
+        return [
+            {'suite': suite, 'name': name, 'time_s': round(duration, 3)}
+            for duration, _, suite, name in self._slowest[:limit]
+        ]
+    
+    def by_suite(self) -> List[Dict]:
+        """Per-suite testcase counts and total duration, longest suite first."""
+        rollup = [
+            {'suite': suite, 'tests': tests, 'time_s': round(seconds, 3)}
+            for suite, (tests, seconds) in self.suite_totals.items()
+        ]
+        rollup.sort(key=lambda item: (-item['time_s'], item['suite']))
+        return rollup
+
+
+def _parse_duration(value: Optional[str]) -> float:
+    """Parse a JUnit time attribute, tolerating missing values and thousands separators."""
+    if not value:
+        return 0.0
+    try:
+        return float(value.replace(',', ''))
+    except ValueError:
+        return 0.0
+
+
+class TestOutcomeIndex:
+    """Pass/fail/skip counts per testcase and device model/API level.
+    
+    Storage grows with distinct (test, device) pairs, not with how many
+    result files or attempts report them, so shards can be folded in one
+    at a time.
+    """
+    
+    OUTCOMES = ('passed', 'failed', 'skipped')
+    
+    __slots__ = ('tests',)
+    
+    def __init__(self):
+        self.tests: Dict[Tuple[str, str], Dict[str, List[int]]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.tests)
+    
+    def add(self, suite: str, name: str, device: str, outcome: str, count: int = 1):
+        devices = self.tests.get((suite, name))
+        if devices is None:
+            devices = self.tests[(suite, name)] = {}
+        counts = devices.get(device)
+        if counts is None:
+            counts = devices[device] = [0, 0, 0]
+        counts[self.OUTCOMES.index(outcome)] += count
+    
+    def export(self) -> List[list]:
+        """Flat [suite, name, device, passed, failed, skipped] rows for workers and the cache."""
+        return [
+            [suite, name, device] + counts
+            for (suite, name), devices in self.tests.items()
+            for device, counts in devices.items()
+        ]
+    
+    def merge(self, rows: List[list]):
+        """Fold in rows produced by export()."""
+        for suite, name, device, *counts in rows:
+            for outcome, count in zip(self.OUTCOMES, counts):
+                if count:
+                    self.add(suite, name, device, outcome, count)
+    
+    def devices(self) -> List[str]:
+        return sorted({device for devices in self.tests.values() for device in devices})
+    
+    def by_device(self) -> Dict[str, Dict[str, int]]:
+        """Outcome totals per device model/API level."""
+        totals: Dict[str, Dict[str, int]] = {}
+        for devices in self.tests.values():
+            for device, counts in devices.items():
+                device_totals = totals.setdefault(device, dict.fromkeys(self.OUTCOMES, 0))
+                for outcome, count in zip(self.OUTCOMES, counts):
+                    device_totals[outcome] += count
+        return dict(sorted(totals.items()))
+    
+    def outcome_table(self) -> Dict[str, List[Dict]]:
+        """Cross-device rows for every test that failed anywhere.
+        
+        A test is flaky when it both passed and failed, whether on different
+        devices or on different attempts on the same device; it is failing
+        when it never passed.
+        """
+        table = {'flaky': [], 'failing': []}
+        for (suite, name), devices in sorted(self.tests.items()):
+            passed = sum(counts[0] for counts in devices.values())
+            failed = sum(counts[1] for counts in devices.values())
+            if not failed:
+                continue
+            table['flaky' if passed else 'failing'].append({
+                'suite': suite,
+                'name': name,
+                'passed': passed,
+                'failed': failed,
+                'devices': {
+                    device: dict(zip(self.OUTCOMES, counts))
+                    for device, counts in sorted(devices.items())
+                }
+            })
+        return table
+
+
+def _duration_seconds(value) -> Optional[float]:
+    """Seconds in a Tool Results Duration/Timestamp ({seconds, nanos}), a "1.5s" string or a number."""
+    if isinstance(value, dict):
+        try:
+            return int(value.get('seconds', 0)) + int(value.get('nanos', 0)) / 1e9
+        except (TypeError, ValueError):
+            return None
+    if isinstance(value, str) and value.endswith('s'):
+        value = value[:-1]
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class JsonResultSummary:
+    """Single-pass summary of a JSON result file, fed (path, value) events.
+    
+    Recognizes the Test Lab schemas we download (test matrix, Tool Results
+    execution, perf samples and perf metrics summary) and keeps only their
+    summarized fields; anything else is described by its first keys.
+    A top-level array is treated as a list of records of one schema.
+    """
+    
+    # Schema detection by top-level keys, in priority order
+    SCHEMA_KEYS = (
+        ('test_matrix', ('testMatrixId', 'testExecutions')),
+        ('execution', ('executionId',)),
+        ('perf_samples', ('perfSamples', 'perfSampleSeries')),
+        ('perf_summary', ('perfMetrics', 'appStartTime', 'graphicsStats')),
+    )
+    SCALAR_FIELDS = (
+        'testMatrixId', 'state', 'outcomeSummary', 'invalidMatrixDetails', 'timestamp', 'executionId'
+    )
+    
+    def __init__(self, top_level: str):
+        self.top_level = top_level
+        self.records = 0
+        self.keys: Dict[str, None] = {}
+        self.keys_truncated = False
+        self.fields: Dict[str, object] = {}
+        self.execution_states: Dict[str, int] = {}
+        self.devices: Dict[str, None] = {}
+        self.executions = 0
+        self.failure: Dict[str, None] = {}
+        self.times: Dict[str, Dict] = {}
+        self.perf_values = array('d')
+        self.series: Dict[str, None] = {}
+        self.perf_metrics: Dict[str, None] = {}
+        self.app_start: Dict[str, float] = {}
+        self.graphics: Dict[str, object] = {}
+    
+    def feed(self, path: Tuple, value):
+        if self.top_level == 'array':
+            if not path:
+                return
+            self.records = max(self.records, path[0] + 1)
+            path = path[1:]
+        if not path:
+            return
+        
+        key = path[0]
+        if key not in self.keys:
+            if len(self.keys) < JSON_KEYS_LIMIT:
+                self.keys[key] = None
+            else:
+                self.keys_truncated = True
+        
+        # Containers that arrive whole (records of a top-level array) are
+        # unrolled one level so every schema sees the same paths
+        if len(path) == 1 and isinstance(value, dict) and key not in self.SCALAR_FIELDS:
+            for sub_key, sub_value in value.items():
+                self._field(key, sub_key, sub_value)
+        elif len(path) == 1 and isinstance(value, list):
+            for index, item in enumerate(value):
+                self._field(key, index, item)
+        else:
+            self._field(key, path[1] if len(path) > 1 else None, value)
+    
+    def _field(self, key: str, sub_key, value):
+        if sub_key is None:
+            if key in self.SCALAR_FIELDS:
+                self.fields.setdefault(key, value)
+        elif key == 'testExecutions' and isinstance(value, dict):
+            self.executions += 1
+            state = value.get('state', 'UNKNOWN')
+            self.execution_states[state] = self.execution_states.get(state, 0) + 1
+            device = value.get('environment', {}).get('androidDevice', {})
+            if device:
+                label = '-'.join(
+                    str(device.get(field, '?'))
+                    for field in ('androidModelId', 'androidVersionId', 'locale', 'orientation')
+                )
+                self.devices[label] = None
+        elif key == 'outcome':
+            if sub_key == 'summary':
+                self.fields.setdefault('outcome', value)
+            elif sub_key == 'failureDetail' and isinstance(value, dict):
+                self.failure.update(dict.fromkeys(k for k, flag in value.items() if flag is True))
+        elif key in ('creationTime', 'completionTime'):
+            self.times.setdefault(key, {})[sub_key] = value
+        elif key == 'perfSamples' and isinstance(value, dict):
+            if isinstance(value.get('value'), (int, float)):
+                self.perf_values.append(value['value'])
+        elif key == 'perfSampleSeries' and isinstance(value, dict):
+            basic = value.get('basicPerfSampleSeries', {})
+            label = basic.get('sampleSeriesLabel') or basic.get('perfMetricType')
+            if label and len(self.series) < JSON_KEYS_LIMIT:
+                self.series[label] = None
+        elif key == 'perfMetrics' and isinstance(value, str):
+            self.perf_metrics[value] = None
+        elif key == 'appStartTime':
+            seconds = _duration_seconds(value)
+            if seconds is not None:
+                self.app_start[f"{sub_key}_ms"] = round(seconds * 1000, 1)
+        elif key == 'graphicsStats' and isinstance(value, (int, float, str)):
+            self.graphics[sub_key] = value
+    
+    def schema(self) -> str:
+        for name, keys in self.SCHEMA_KEYS:
+            if any(key in self.keys for key in keys):
+                return name
+        return 'unknown'
+    
+    def summary(self) -> Dict:
+        schema = self.schema()
+        summary = {key: value for key, value in self.fields.items() if key in self.SCALAR_FIELDS}
+        if self.records:
+            summary['records'] = self.records
+        
+        if schema == 'test_matrix':
+            summary['executions'] = self.executions
+            summary['execution_states'] = dict(sorted(self.execution_states.items()))
+            summary['devices'] = sorted(self.devices)
+        elif schema == 'execution':
+            if 'outcome' in self.fields:
+                summary['outcome'] = self.fields['outcome']
+            if self.failure:
+                summary['failure'] = sorted(self.failure)
+            start = _duration_seconds(self.times.get('creationTime'))
+            end = _duration_seconds(self.times.get('completionTime'))
+            if start is not None and end is not None:
+                summary['duration_s'] = round(end - start, 3)
+        elif schema == 'perf_samples':
+            values = sorted(self.perf_values)
+            summary['samples'] = len(values)
+            if values:
+                summary.update(
+                    min=values[0],
+                    max=values[-1],
+                    mean=round(sum(values) / len(values), 3),
+                    **{f'p{pct}': percentile(values, pct) for pct in PERF_PERCENTILES}
+                )
+            if self.series:
+                summary['series'] = list(self.series)
+        elif schema == 'perf_summary':
+            summary['perf_metrics'] = list(self.perf_metrics)
+            if self.app_start:
+                summary['app_start'] = self.app_start
+            if self.graphics:
+                summary['graphics'] = self.graphics
+        else:
+            summary['top_level'] = self.top_level
+            summary['keys'] = list(self.keys)
+            if self.keys_truncated:
+                summary['keys_truncated'] = True
+        return summary
+
+
+# Per-file records. Parsers keep these compact tuples (shared, interned
+# strings for paths, types, tags and signatures) instead of one dict per
+# record; they travel to the main process pickled as plain tuples, are
+# cached as JSON rows, and become report dicts only in _generate_report.
+
+def _interned_row(cls, row) -> NamedTuple:
+    """Rebuild a record from a cached JSON row, interning its repeated strings."""
+    return cls(*(
+        sys.intern(value) if name in cls.INTERNED and isinstance(value, str) else value
+        for name, value in zip(cls._fields, row)
+    ))
+
+
+class CrashRecord(NamedTuple):
+    """One crash occurrence; its trace is kept once per signature by CrashSignatureIndex."""
+    file: str
+    type: str
+    timestamp: Optional[str]
+    line: int
+    pid: Optional[int]
+    tid: Optional[int]
+    tag: Optional[str]
+    signature: str
+    
+    INTERNED = ('file', 'type', 'tag', 'signature')
+    
+    def to_dict(self) -> Dict:
+        crash = {'file': self.file, 'type': self.type, 'timestamp': self.timestamp, 'line': self.line}
+        if self.pid is not None:
+            crash['pid'] = self.pid
+        if self.tid is not None:
+            crash['tid'] = self.tid
+        if self.tag is not None:
+            crash['tag'] = self.tag
+        crash['signature'] = self.signature
+        return crash
+
+
+class XmlResultRecord(NamedTuple):
+    """Counts for one JUnit XML file; failures are (test name, message) pairs."""
+    file: str
+    type: str
+    total_tests: int
+    failures: int
+    errors: int
+    skipped: int
+    duration_s: float
+    failure_details: Tuple[Tuple[str, str], ...]
+    
+    INTERNED = ('file', 'type')
+    TYPE = 'XML Test Results'
+    
+    def to_dict(self) -> Dict:
+        result = {
+            'file': self.file,
+            'type': self.type,
+            'total_tests': self.total_tests,
+            'failures': self.failures,
+            'errors': self.errors,
+            'skipped': self.skipped,
+            'duration_s': self.duration_s
+        }
+        if self.failure_details:
+            result['failure_details'] = [
+                {'test_name': name, 'message': message, 'file': self.file}
+                for name, message in self.failure_details
+            ]
+        return result
+
+
+class JsonResultRecord(NamedTuple):
+    """Schema-aware summary of one JSON result file."""
+    file: str
+    type: str
+    schema: str
+    summary: Dict
+    preview: Optional[str]
+    
+    INTERNED = ('file', 'type', 'schema')
+    TYPE = 'JSON Test Results'
+    
+    def to_dict(self) -> Dict:
+        result = {'file': self.file, 'type': self.type, 'schema': self.schema, 'summary': self.summary}
+        if self.preview is not None:
+            result['preview'] = self.preview
+        return result
+
+
+class MediaRecord(NamedTuple):
+    """A screenshot or video: size in bytes and, with --dedup-screenshots, its perceptual hash."""
+    path: str
+    size: int
+    type: str
+    dhash: Optional[str]
+    
+    INTERNED = ('path', 'type')
+    
+    def to_dict(self) -> Dict:
+        media = {'path': self.path, 'size_mb': round(self.size / (1024 * 1024), 2), 'type': self.type}
+        if self.dhash is not None:
+            media['dhash'] = self.dhash
+        return media
+
+
+class PerfSample(NamedTuple):
+    """One latency measurement from a logcat."""
+    metric: str
+    device: str
+    ms: float
+    
+    INTERNED = ('metric', 'device')
+    
+    def to_dict(self) -> Dict:
+        return {'metric': self.metric, 'device': self.device, 'ms': self.ms}
+
+
+def record_dict(item) -> Dict:
+    """Report form of a stored record; performance files are stored as bare paths."""
+    return item.to_dict() if isinstance(item, tuple) else {'file': item}
+
+
+def records_from_rows(records: Dict[str, list]) -> Dict[str, list]:
+    """Turn cached JSON rows back into record tuples, in place."""
+    for field, cls in (('crashes', CrashRecord), ('perf_samples', PerfSample),
+                       ('screenshots', MediaRecord), ('videos', MediaRecord)):
+        records[field] = [_interned_row(cls, row) for row in records.get(field, ())]
+    records['test_results'] = [
+        _interned_row(XmlResultRecord if row[1] == XmlResultRecord.TYPE else JsonResultRecord, row)
+        for row in records.get('test_results', ())
+    ]
+    return records
+
+
+class ParseProfile:
+    """Where parsing time goes, for --profile.
+    
+    Phases are wall time spent in the process building the report (walk,
+    parse, report). Stages are per-file work summed across workers: time,
+    files, bytes read, matches (crashes, latency samples, testcases and
+    result summaries found) and a bounded min-heap of the slowest files.
+    Only created when profiling, so an unprofiled run pays a None check
+    per file.
+    """
+    
+    __slots__ = ('phases', 'stages')
+    
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self.stages: Dict[str, Dict] = {}
+    
+    def add_phase(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+    
+    def _stage(self, name: str) -> Dict:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = {'time_s': 0.0, 'files': 0, 'bytes': 0, 'matches': 0, 'slowest': []}
+        return stage
+    
+    def add(self, stage_name: str, seconds: float, files: int = 0, size: int = 0, matches: int = 0) -> Dict:
+        stage = self._stage(stage_name)
+        stage['time_s'] += seconds
+        stage['files'] += files
+        stage['bytes'] += size
+        stage['matches'] += matches
+        return stage
+    
+    def add_file(self, stage_name: str, path: str, seconds: float, size: int = 0, matches: int = 0):
+        stage = self.add(stage_name, seconds, files=1, size=size, matches=matches)
+        self._keep_slowest(stage['slowest'], (seconds, path, size, matches))
+    
+    def timed(self, stage_name: str, items: Iterator) -> Iterator:
+        """Yield from items, adding the time spent producing them to a stage (e.g. reads vs scanning)."""
+        items = iter(items)
+        clock = time.perf_counter
+        while True:
+            started = clock()
+            try:
+                item = next(items)
+            except StopIteration:
+                self.add(stage_name, clock() - started)
+                return
+            self.add(stage_name, clock() - started)
+            yield item
+    
+    @staticmethod
+    def _keep_slowest(heap: List[Tuple], entry: Tuple):
+        if len(heap) < PROFILE_SLOWEST_FILES:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+    
+    def export(self) -> Dict:
+        """Plain form shipped back from workers; phases stay with the process that timed them."""
+        return {name: dict(stage, slowest=[list(e) for e in stage['slowest']]) for name, stage in self.stages.items()}
+    
+    def merge(self, stages: Dict):
+        for name, other in stages.items():
+            stage = self._stage(name)
+            for key in ('time_s', 'files', 'bytes', 'matches'):
+                stage[key] += other[key]
+            for entry in other['slowest']:
+                self._keep_slowest(stage['slowest'], tuple(entry))
+    
+    def to_report(self) -> Dict:
+        """The report's `profiling` section."""
+        stages = {}
+        for name, stage in sorted(self.stages.items(), key=lambda item: -item[1]['time_s']):
+            stages[name] = {
+                'time_s': round(stage['time_s'], 4),
+                'files': stage['files'],
+                'bytes': stage['bytes'],
+                'matches': stage['matches'],
+                'mb_per_s': (
+                    round(stage['bytes'] / (1024 * 1024) / stage['time_s'], 1)
+                    if stage['bytes'] and stage['time_s'] else None
+                ),
+                'slowest': [
+                    {'file': path, 'time_s': round(seconds, 4), 'bytes': size, 'matches': matches}
+                    for seconds, path, size, matches in sorted(stage['slowest'], reverse=True)
+                ],
+            }
+        return {
+            'phases': {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            'stages': stages,
+        }
+
+
+class ParseCache:
+    """SQLite sidecar that maps result files to their previously parsed records.
+    
+    Entries are keyed by path relative to the results directory and are
+    valid while size and mtime match, or, with use_hash, while size and
+    SHA-256 of the content match. The whole cache is dropped when
+    PARSER_VERSION or the report path prefix (shard label) changes, and
+    entries for files that have disappeared are pruned on close.
+    """
+    
+    def __init__(self, db_path: Path, root: Path, use_hash: bool = False, path_prefix: str = ''):
+        self.db_path = Path(db_path)
+        self.root = Path(root)
+        self.use_hash = use_hash
+        self.hits = 0
+        self.misses = 0
+        self._seen = set()
+        self._conn = sqlite3.connect(str(self.db_path))
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT, records TEXT)"
+        )
+        # Cached records embed report paths, so they are only valid for the same prefix
+        expected = {'parser_version': PARSER_VERSION, 'path_prefix': path_prefix}
+        stored = dict(self._conn.execute("SELECT key, value FROM meta"))
+        if any(stored.get(key) != value for key, value in expected.items()):
+            self._conn.execute("DELETE FROM files")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", expected.items()
+            )
+    
+    def _key(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return str(path)
+    
+    def lookup(self, path: Path) -> Optional[Dict[str, list]]:
+        """Return cached records for an unchanged file, or None on a miss."""
+        key = self._key(path)
+        self._seen.add(key)
+        row = self._conn.execute(
+            "SELECT size, mtime_ns, sha256, records FROM files WHERE path = ?", (key,)
+        ).fetchone()
+        
+        if row is not None:
+            size, mtime_ns, sha256, records = row
+            stat = path.stat()
+            if stat.st_size == size:
+                if self.use_hash:
+                    fresh = sha256 is not None and _file_sha256(path) == sha256
+                else:
+                    fresh = stat.st_mtime_ns == mtime_ns
+                if fresh:
+                    self.hits += 1
+                    return records_from_rows(json.loads(records))
+        
+        self.misses += 1
+        return None
+    
+    def store(self, path: Path, records: Dict[str, list]):
+        """Record freshly parsed records for a file."""
+        stat = path.stat()
+        sha256 = _file_sha256(path) if self.use_hash else None
+        self._conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, records) VALUES (?, ?, ?, ?, ?)",
+            (self._key(path), stat.st_size, stat.st_mtime_ns, sha256, json.dumps(records))
+        )
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters for the report summary."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'content_hash': self.use_hash,
+        }
+    
+    def close(self):
+        """Prune entries for files no longer present, then commit."""
+        stale = [
+            (path,) for (path,) in self._conn.execute("SELECT path FROM files")
+            if path not in self._seen
+        ]
+        self._conn.executemany("DELETE FROM files WHERE path = ?", stale)
+        self._conn.commit()
+        self._conn.close()
+
+
+def _file_sha256(path: Path) -> str:
+    """SHA-256 of a file, read in 1 MiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_gcs_url(source: str) -> bool:
+    """True for a gs://bucket/prefix results location."""
+    return str(source).startswith('gs://')
+
+
+class FetchError(Exception):
+    """An object could not be listed or downloaded after all retries."""
+
+
+class _RetryableStatus(Exception):
+    """The server answered with a status worth retrying; the connection is still usable."""
+
+
+class GcsObjectFetcher:
+    """Lists and downloads objects under a gs://bucket/prefix URL via the GCS JSON API.
+    
+    Requests run on a bounded pool of keep-alive connections, each used by
+    one worker thread at a time, while an asyncio loop schedules them.
+    Connection errors and retryable statuses are retried with exponential
+    backoff and jitter; a body cut short resumes with a Range request from
+    the bytes already received. Downloaded bodies are spooled (in memory up
+    to FETCH_SPOOL_BYTES, then to a temp file) and handed to the caller
+    after the connection is released, so handling overlaps other downloads.
+    Set STORAGE_EMULATOR_HOST to use a local server.
+    """
+    
+    def __init__(
+        self,
+        url: str,
+        concurrency: int = FETCH_CONCURRENCY,
+        endpoint: Optional[str] = None,
+        token: Optional[str] = None,
+        retries: int = FETCH_RETRIES
+    ):
+        bucket, _, prefix = url[len('gs://'):].partition('/')
+        self.bucket = bucket
+        self.prefix = prefix.rstrip('/') + '/' if prefix.strip('/') else ''
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        
+        endpoint = endpoint or os.environ.get(GCS_EMULATOR_ENV) or GCS_ENDPOINT
+        if '://' not in endpoint:
+            endpoint = 'http://' + endpoint
+        parts = urlsplit(endpoint)
+        self._scheme = parts.scheme
+        self._host = parts.netloc
+        self._base_path = parts.path.rstrip('/')
+        
+        token = token or os.environ.get(GCS_TOKEN_ENV)
+        self._headers = {'Authorization': f'Bearer {token}'} if token else {}
+        self._pool: Optional[asyncio.Queue] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+    
+    async def __aenter__(self) -> 'GcsObjectFetcher':
+        self._pool = asyncio.Queue()
+        for _ in range(self.concurrency):
+            self._pool.put_nowait(self._connect())
+        # Extra threads for handlers, so parsing never occupies a download slot
+        self._threads = ThreadPoolExecutor(max_workers=self.concurrency * 2)
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
+        self._threads.shutdown(wait=False)
+    
+    def _connect(self) -> http.client.HTTPConnection:
+        conn_cls = http.client.HTTPSConnection if self._scheme == 'https' else http.client.HTTPConnection
+        return conn_cls(self._host, timeout=FETCH_TIMEOUT_S)
+    
+    def relative_name(self, name: str) -> str:
+        """Object name as a path relative to the listed prefix."""
+        return name[len(self.prefix):]
+    
+    async def list_objects(self) -> AsyncIterator[Dict]:
+        """Yield object metadata (name, size) under the prefix, one page at a time."""
+        path = f"{self._base_path}/storage/v1/b/{quote(self.bucket, safe='')}/o"
+        params = {'prefix': self.prefix, 'fields': 'items(name,size),nextPageToken'}
+        while True:
+            page = await self.get(f"{path}?{urlencode(params)}", json.load)
+            for item in page.get('items', ()):
+                yield item
+            token = page.get('nextPageToken')
+            if not token:
+                return
+            params['pageToken'] = token
+    
+    async def fetch(self, name: str, handle: Callable[[IO[bytes]], object]):
+        """Download one object, then pass its body to `handle` in a worker thread."""
+        path = (
+            f"{self._base_path}/storage/v1/b/{quote(self.bucket, safe='')}"
+            f"/o/{quote(name, safe='')}?alt=media"
+        )
+        with tempfile.SpooledTemporaryFile(max_size=FETCH_SPOOL_BYTES) as body:
+            await self.get(path, lambda response: _spool_body(response, body), resume_from=body.tell)
+            body.seek(0)
+            return await asyncio.get_running_loop().run_in_executor(self._threads, handle, body)
+    
+    async def get(
+        self,
+        path: str,
+        handle: Callable[[IO[bytes]], object],
+        resume_from: Optional[Callable[[], int]] = None
+    ):
+        """GET `path` on a pooled connection with retries; returns handle(body).
+        
+        `resume_from` returns the bytes already received, which retries
+        request as a Range instead of fetching the whole body again.
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            conn = await self._pool.get()
+            offset = resume_from() if resume_from is not None else 0
+            try:
+                return await loop.run_in_executor(self._threads, self._request, conn, path, handle, offset)
+            except FetchError:
+                raise
+            except (OSError, http.client.HTTPException, _RetryableStatus) as e:
+                if not isinstance(e, _RetryableStatus):
+                    # Drop the socket; the connection object reconnects on next use
+                    conn.close()
+                if attempt == self.retries:
+                    raise FetchError(f"GET {path} failed after {attempt + 1} attempts: {e}") from e
+            finally:
+                self._pool.put_nowait(conn)
+            await asyncio.sleep(FETCH_BACKOFF_S * 2 ** attempt + random.uniform(0, FETCH_BACKOFF_S))
+    
+    def _request(
+        self, conn: http.client.HTTPConnection, path: str, handle: Callable[[IO[bytes]], object], offset: int = 0
+    ):
+        headers = dict(self._headers, Range=f'bytes={offset}-') if offset else self._headers
+        conn.request('GET', path, headers=headers)
+        response = conn.getresponse()
+        if response.status not in (200, 206):
+            # Read the (small) error body in full so the connection stays reusable
+            body = response.read()
+            message = f"HTTP {response.status} for {path}: {body[:200].decode('utf-8', 'replace')}"
+            if response.status in FETCH_RETRY_STATUSES:
+                raise _RetryableStatus(message)
+            raise FetchError(message)
+        
+        try:
+            return handle(response)
+        except BaseException:
+            conn.close()
+            raise
+
+
+def _spool_body(response: http.client.HTTPResponse, body: IO[bytes]):
+    """Append a response body to `body`; a full (200) response replaces what was there."""
+    if response.status == 206:
+        start = response.getheader('Content-Range', '').partition(' ')[2].partition('-')[0]
+        if start != str(body.tell()):
+            raise FetchError(f"Range response starts at {start or '?'}, expected {body.tell()}")
+    else:
+        body.seek(0)
+        body.truncate()
+    shutil.copyfileobj(response, body)
+    # Chunked reads end quietly at a dropped connection; a short body must not pass as complete
+    if response.length:
+        raise http.client.IncompleteRead(b'', response.length)
+
 
 class FirebaseResultParser:
-    def __init__(self, results_dir: str):
+    # Per-file record lists; a worker returns these and the main process merges them
+    RECORD_FIELDS = (
+        'crashes', 'test_results', 'performance_metrics', 'perf_samples', 'screenshots', 'videos'
+    )
+    
+    # Record type written for each list entry in streaming (NDJSON) reports
+    RECORD_KINDS = {
+        'crashes': 'crash',
+        'test_results': 'test_result',
+        'performance_metrics': 'performance_file',
+        'perf_samples': 'perf_sample',
+        'screenshots': 'screenshot',
+        'videos': 'video',
+    }
+    
+    # Buckets worth shipping to a worker; perf/media only need a stat
+    PARALLEL_BUCKETS = (BUCKET_CRASH_LOG, BUCKET_TEST_RESULT)
+    
+    def __init__(
+        self,
+        results_dir: str,
+        jobs: int = 1,
+        executor: str = "process",
+        use_cache: bool = False,
+        cache_hash: bool = False,
+        cache_path: Optional[str] = None,
+        label: str = '',
+        fetch_concurrency: int = FETCH_CONCURRENCY,
+        sink=None,
+        profile: bool = False,
+        hash_screenshots: bool = False
+    ):
+        self.source = str(results_dir)
         self.results_dir = Path(results_dir)
+        self.label = label
+        self.fetch_concurrency = fetch_concurrency
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+        self.executor = executor
+        self.use_cache = use_cache or cache_hash
+        self.cache_hash = cache_hash
+        self.cache_path = Path(cache_path) if cache_path else self.results_dir / CACHE_FILENAME
+        self.cache: Optional[ParseCache] = None
         self.crashes = []
         self.test_results = []
         self.performance_metrics = []
+        self.perf_samples = []
         self.screenshots = []
         self.videos = []
+        self.testcase_timings = TestcaseTimings()
+        self.test_outcomes = TestOutcomeIndex()
+        self.crash_index = CrashSignatureIndex()
+        # gs:// objects that still failed after retries; their records are missing
+        self.fetch_failures: List[str] = []
+        # Optional streaming writer: gets each record as soon as its file is merged
+        self.sink = sink
+        self._emitted = dict.fromkeys(self.RECORD_FIELDS, 0)
+        self.profiler = ParseProfile() if profile else None
+        # Perceptual hashing reads screenshot contents, so media then goes to workers too
+        self.hash_screenshots = hash_screenshots
+        self.parallel_buckets = self.PARALLEL_BUCKETS + ((BUCKET_MEDIA,) if hash_screenshots else ())
         
     def parse_all(self) -> Dict:
         """Parse all result files and generate comprehensive report."""
+        error = self.parse_records()
+        if error:
+            return {"error": error}
+        return self._generate_report()
+    
+    def parse_records(self) -> Optional[str]:
+        """Parse every result file into this parser's records; returns an error message on failure."""
+        if is_gcs_url(self.source):
+            return self._parse_bucket()
         if not self.results_dir.exists():
-            return {"error": f"Results directory {self.results_dir} does not exist"}
+            return f"Results directory {self.results_dir} does not exist"
+        if self.results_dir.is_file():
+            if archive_suffix(self.results_dir) is None:
+                return f"{self.results_dir} is neither a directory nor a supported archive"
+            return self._parse_archive()
         
-        self._find_crash_logs()
-        self._find_test_results()
-        self._find_performance_files()
-        self._find_media_files()
+        # Path-sorted so the merged report is identical for any --jobs value
+        started = time.perf_counter()
+        files = sorted(self._walk_results(), key=lambda item: item[0])
+        if self.profiler is not None:
+            self.profiler.add_phase('walk', time.perf_counter() - started)
+        profile = self.profiler is not None
+        tasks = [
+            (str(self.results_dir), str(path), bucket, self.label, profile, self.hash_screenshots)
+            for path, bucket in files
+            if bucket in self.parallel_buckets
+        ]
         
-        return self._generate_report()
+        if self.use_cache:
+            self.cache = ParseCache(
+                self.cache_path, self.results_dir, use_hash=self.cache_hash, path_prefix=self.label
+            )
+        started = time.perf_counter()
+        parsed = self._parse_tasks(tasks)
+        try:
+            for path, bucket in files:
+                if bucket in self.parallel_buckets:
+                    self._merge(next(parsed))
+                else:
+                    self._dispatch(path, bucket)
+                self._emit_new()
+        finally:
+            parsed.close()
+            if self.cache is not None:
+                self.cache.close()
+        
+        if self.profiler is not None:
+            self.profiler.add_phase('parse', time.perf_counter() - started)
+        return None
     
-    def _find_crash_logs(self):
-        """Find and parse crash logs."""
-        log_patterns = ["*.log", "logcat*", "*test*log*"]
+    def _parse_archive(self) -> Optional[str]:
+        """Parse a zip/tar results archive member by member, without extracting it.
+        
+        Members are streamed serially (tar only allows forward reads) and
+        merged in path order, so the report matches that of the extracted tree.
+        """
+        started = time.perf_counter()
+        parsed = []
+        try:
+            for rel_path, bucket, size, opener in iter_archive_members(self.results_dir):
+                member_parser = self._member_parser()
+                member_parser._parse_member(self._labelled(rel_path), bucket, size, opener)
+                parsed.append((Path(rel_path), member_parser._collect()))
+        except (OSError, zipfile.BadZipFile, tarfile.TarError) as e:
+            return f"Could not read archive {self.results_dir}: {e}"
+        
+        parsed.sort(key=lambda item: item[0])
+        for _, records in parsed:
+            self._merge(records)
+            self._emit_new()
         
-        for pattern in log_patterns:
-            for log_file in self.results_dir.rglob(pattern):
-                if log_file.is_file():
-                    try:
-                        self._parse_crash_log(log_file)
-                    except Exception as e:
-                        print(f"Warning: Could not parse {log_file}: {e}")
+        if self.profiler is not None:
+            self.profiler.add_phase('parse', time.perf_counter() - started)
+        return None
     
-    def _parse_crash_log(self, log_file: Path):
-        """Parse individual crash log for FATAL exceptions."""
+    def _parse_bucket(self) -> Optional[str]:
+        """Fetch results from a gs:// prefix, parsing each object as soon as it has downloaded.
+        
+        Merged in path order, so the report matches that of a local copy.
+        """
+        started = time.perf_counter()
         try:
-            with open(log_file, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                
-            # Search for FATAL exceptions
-            fatal_matches = re.finditer(
-                r'FATAL EXCEPTION:.*?(?=\n\n|\Z)',
-                content,
-                re.MULTILINE | re.DOTALL
+            parsed = asyncio.run(self._fetch_bucket())
+        except FetchError as e:
+            return f"Could not list {self.source}: {e}"
+        
+        parsed.sort(key=lambda item: item[0])
+        for _, records in parsed:
+            self._merge(records)
+            self._emit_new()
+        
+        if self.profiler is not None:
+            self.profiler.add_phase('parse', time.perf_counter() - started)
+        return None
+    
+    async def _fetch_bucket(self) -> List[Tuple[Path, Dict[str, list]]]:
+        parsed = []
+        downloads = []
+        listed = 0
+        async with GcsObjectFetcher(self.source, concurrency=self.fetch_concurrency) as fetcher:
+            async for item in fetcher.list_objects():
+                listed += 1
+                classified = classify_member(fetcher.relative_name(item['name']))
+                if classified is None:
+                    continue
+                rel_path, bucket = classified
+                size = int(item.get('size', 0))
+                if bucket in self.parallel_buckets:
+                    # Start downloading while the listing continues
+                    downloads.append(asyncio.ensure_future(
+                        self._fetch_member(fetcher, item['name'], rel_path, bucket, size)
+                    ))
+                else:
+                    # Perf and media files only need their name and listed size
+                    member_parser = self._member_parser()
+                    member_parser._parse_member(self._labelled(rel_path), bucket, size, None)
+                    parsed.append((Path(rel_path), member_parser._collect()))
+            
+            parsed.extend(await asyncio.gather(*downloads))
+        if not listed:
+            # A typo'd bucket prefix lists nothing; that must not pass as a clean run
+            raise FetchError("no objects under this prefix")
+        return parsed
+    
+    async def _fetch_member(
+        self, fetcher: GcsObjectFetcher, name: str, rel_path: str, bucket: str, size: int
+    ) -> Tuple[Path, Dict[str, list]]:
+        """Download one object and parse it with a fresh parser in a fetcher thread."""
+        member_parser = self._member_parser()
+        report_path = self._labelled(rel_path)
+        try:
+            await fetcher.fetch(
+                name,
+                lambda body: member_parser._parse_member(report_path, bucket, size, lambda: body)
+            )
+        except FetchError as e:
+            print(f"Warning: Could not fetch {self._source_path(report_path)}: {e}")
+            member_parser.fetch_failures.append(self._source_path(report_path))
+        return Path(rel_path), member_parser._collect()
+    
+    def _member_parser(self) -> 'FirebaseResultParser':
+        """A fresh parser with this one's options, for a single archive member or object."""
+        return FirebaseResultParser(
+            self.source, label=self.label,
+            profile=self.profiler is not None, hash_screenshots=self.hash_screenshots
+        )
+    
+    def _parse_tasks(self, tasks: List[Tuple[str, str, str, str, bool, bool]]) -> Iterator[Dict[str, list]]:
+        """Parse files (from cache, serially or on a worker pool), yielding records in task order."""
+        started = time.perf_counter()
+        cached = [
+            self.cache.lookup(Path(task[1])) if self.cache is not None else None
+            for task in tasks
+        ]
+        if self.profiler is not None and self.cache is not None:
+            # For the cache stage, files are lookups and matches are hits
+            self.profiler.add(
+                'cache', time.perf_counter() - started,
+                files=len(tasks), matches=sum(records is not None for records in cached)
             )
+        pending_tasks = [task for task, records in zip(tasks, cached) if records is None]
+        
+        pool = None
+        if self.jobs > 1 and len(pending_tasks) > 1:
+            pool_cls = ThreadPoolExecutor if self.executor == "thread" else ProcessPoolExecutor
+            chunksize = max(1, len(pending_tasks) // (self.jobs * 4))
+            pool = pool_cls(max_workers=self.jobs)
+            # map() yields in submission order, which keeps the merge deterministic
+            parsed = pool.map(_parse_file_task, pending_tasks, chunksize=chunksize)
+        else:
+            parsed = map(_parse_file_task, pending_tasks)
+        
+        try:
+            for task, records in zip(tasks, cached):
+                if records is None:
+                    records = next(parsed)
+                    if self.cache is not None:
+                        # Timings describe this run only; a cache hit must not replay them
+                        self.cache.store(
+                            Path(task[1]), {key: value for key, value in records.items() if key != 'profile'}
+                        )
+                yield records
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+    
+    def _collect(self) -> Dict[str, list]:
+        """Return this parser's per-file records for merging elsewhere."""
+        records = {field: getattr(self, field) for field in self.RECORD_FIELDS}
+        records['testcase_timings'] = self.testcase_timings.to_dict()
+        records['test_outcomes'] = self.test_outcomes.export()
+        records['crash_signatures'] = self.crash_index.export()
+        if self.fetch_failures:
+            records['fetch_failures'] = self.fetch_failures
+        if self.profiler is not None:
+            records['profile'] = self.profiler.export()
+        return records
+    
+    def _merge(self, records: Dict[str, list]):
+        """Append records produced by another parser instance."""
+        for field in self.RECORD_FIELDS:
+            getattr(self, field).extend(records.get(field, ()))
+        if 'testcase_timings' in records:
+            self.testcase_timings.extend(records['testcase_timings'])
+        if 'test_outcomes' in records:
+            self.test_outcomes.merge(records['test_outcomes'])
+        if 'crash_signatures' in records:
+            self.crash_index.merge(records['crash_signatures'])
+        self.fetch_failures.extend(records.get('fetch_failures', ()))
+        if 'profile' in records and self.profiler is not None:
+            self.profiler.merge(records['profile'])
+    
+    def _emit_new(self):
+        """Hand records merged since the last call to the streaming sink, if any."""
+        if self.sink is None:
+            return
+        for field in self.RECORD_FIELDS:
+            items = getattr(self, field)
+            for index in range(self._emitted[field], len(items)):
+                item = items[index]
+                self.sink.record(self.RECORD_KINDS[field], record_dict(item))
+            self._emitted[field] = len(items)
+        self.sink.flush()
+    
+    def _walk_results(self) -> Iterator[Tuple[Path, str]]:
+        """Walk the results tree once, yielding each classified file.
+        
+        Directories are visited with os.scandir in sorted order so the
+        report is stable across runs; every file is classified at most once.
+        """
+        stack = [str(self.results_dir)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError as e:
+                print(f"Warning: Could not scan {current}: {e}")
+                continue
             
-            for match in fatal_matches:
-                crash_info = {
-                    'file': str(log_file.relative_to(self.results_dir)),
-                    'type': 'FATAL EXCEPTION',
-                    'details': match.group().strip(),
-                    'timestamp': self._extract_timestamp(content, match.start())
-                }
-                self.crashes.append(crash_info)
+            subdirs = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                
+                if entry.name == REPORT_FILENAME:
+                    continue
+                bucket = classify_result_file(entry.name)
+                if bucket is not None:
+                    yield Path(entry.path), bucket
             
-            # Search for AndroidRuntime errors
-            android_runtime_matches = re.finditer(
-                r'AndroidRuntime.*?FATAL.*?(?=\n\n|\Z)',
-                content,
-                re.MULTILINE | re.DOTALL
+            # Reversed so the stack pops subdirectories in sorted order
+            stack.extend(reversed(subdirs))
+    
+    def _dispatch(self, path: Path, bucket: str):
+        """Hand a classified file to the parser for its bucket."""
+        rel_path = self._labelled(str(path.relative_to(self.results_dir)))
+        try:
+            size = path.stat().st_size if bucket == BUCKET_MEDIA or self.profiler is not None else 0
+        except OSError as e:
+            print(f"Warning: Could not parse {path}: {e}")
+            return
+        self._parse_member(rel_path, bucket, size, lambda: open(path, 'rb'))
+    
+    def _labelled(self, rel_path: str) -> str:
+        """Prefix a report path with this parser's shard label, if any."""
+        return f"{self.label}/{rel_path}" if self.label else rel_path
+    
+    def _source_path(self, rel_path: str) -> str:
+        """The file, archive member or object behind a report path, for messages."""
+        if self.label:
+            rel_path = rel_path[len(self.label) + 1:]
+        if is_gcs_url(self.source):
+            return f"{self.source.rstrip('/')}/{rel_path}"
+        return str(self.results_dir / rel_path)
+    
+    def _parse_member(
+        self, rel_path: str, bucket: str, size: int, opener: Optional[Callable[[], IO[bytes]]]
+    ):
+        """Parse one file from disk, an archive or a bucket, given a binary opener for its contents.
+        
+        Perf and media files are recorded from name and size alone and need no opener.
+        """
+        # Every record from this file shares one path string
+        rel_path = sys.intern(rel_path)
+        if self.profiler is not None:
+            started = time.perf_counter()
+            found = self._match_count()
+        try:
+            if bucket == BUCKET_CRASH_LOG:
+                with opener() as raw:
+                    self._parse_crash_log(raw, rel_path)
+            elif bucket == BUCKET_TEST_RESULT:
+                with opener() as raw:
+                    if rel_path.endswith('.xml'):
+                        self._parse_xml_result(raw, rel_path)
+                    else:
+                        self._parse_json_result(raw, rel_path)
+            elif bucket == BUCKET_PERF:
+                self.performance_metrics.append(rel_path)
+            elif bucket == BUCKET_MEDIA:
+                self._record_media_file(rel_path, size, opener if self.hash_screenshots else None)
+        except Exception as e:
+            print(f"Warning: Could not parse {self._source_path(rel_path)}: {e}")
+        
+        if self.profiler is not None:
+            if bucket == BUCKET_TEST_RESULT:
+                stage = 'xml_result' if rel_path.endswith('.xml') else 'json_result'
+            else:
+                stage = bucket
+            self.profiler.add_file(
+                stage, rel_path, time.perf_counter() - started,
+                size=size if bucket in self.parallel_buckets else 0,
+                matches=self._match_count() - found
             )
-            
-            for match in android_runtime_matches:
-                crash_info = {
-                    'file': str(log_file.relative_to(self.results_dir)),
-                    'type': 'AndroidRuntime',
-                    'details': match.group().strip(),
-                    'timestamp': self._extract_timestamp(content, match.start())
-                }
-                self.crashes.append(crash_info)
+    
+    def _match_count(self) -> int:
+        """Records found so far: crashes, latency samples, testcases and result summaries."""
+        return len(self.crashes) + len(self.perf_samples) + len(self.testcase_timings) + len(self.test_results)
+    
+    def _parse_crash_log(self, raw: IO[bytes], rel_path: str):
+        """Stream a log file line by line through the crash scanner and perf event pairer."""
+        device = sys.intern(device_from_path(rel_path))
+        scanner = CrashScanner()
+        pairer = PerfEventPairer()
+        try:
+            f = io.TextIOWrapper(raw, encoding='utf-8', errors='ignore')
+            prefilter = log_prefilter()
+            chunks = iter_text_chunks(f)
+            if self.profiler is not None:
+                # Reading and decoding, so the rest of crash_log is scanning
+                chunks = self.profiler.timed('crash_log:read', chunks)
+            for chunk, mid_line in chunks:
+                # Most chunks hold nothing of interest: skip them without per-line work
+                if scanner.idle and not prefilter.search(chunk):
+                    scanner.skip_lines(chunk_line_count(chunk) - mid_line)
+                    continue
+                lines = chunk_lines(chunk)
+                if mid_line:
+                    # Rest of a runaway line whose first piece was already scanned
+                    del lines[0]
+                for line in lines:
+                    for crash in scanner.feed(line):
+                        self._add_crash(rel_path, crash)
+                    for metric, millis in pairer.feed(line):
+                        self.perf_samples.append(PerfSample(metric, device, millis))
+            for crash in scanner.finish():
+                self._add_crash(rel_path, crash)
                 
         except Exception as e:
-            print(f"Error parsing {log_file}: {e}")
-    
-    def _find_test_results(self):
-        """Find and parse test result files."""
-        result_patterns = ["*.xml", "*.json", "*test*result*"]
-        
-        for pattern in result_patterns:
-            for result_file in self.results_dir.rglob(pattern):
-                if result_file.is_file():
-                    try:
-                        if result_file.suffix == '.xml':
-                            self._parse_xml_result(result_file)
-                        elif result_file.suffix == '.json':
-                            self._parse_json_result(result_file)
-                    except Exception as e:
-                        print(f"Warning: Could not parse {result_file}: {e}")
-    
-    def _parse_xml_result(self, xml_file: Path):
-        """Parse XML test result files."""
+            print(f"Error parsing {self._source_path(rel_path)}: {e}")
+    
+    def _add_crash(self, rel_path: str, crash: Dict):
+        """Index a scanned crash by signature and keep a compact occurrence record.
+        
+        The full trace is stored once per signature in crash_index, so
+        report size tracks distinct bugs rather than occurrences.
+        """
+        crash_info = {'file': rel_path}
+        crash_info.update(crash)
+        tag = crash.get('tag')
+        self.crashes.append(CrashRecord(
+            rel_path, crash['type'], crash['timestamp'], crash['line'],
+            crash.get('pid'), crash.get('tid'), sys.intern(tag) if tag is not None else None,
+            sys.intern(self.crash_index.add(crash_info))
+        ))
+    
+    def _parse_xml_result(self, raw: IO[bytes], rel_path: str):
+        """Stream a JUnit XML file, counting outcomes and timing each testcase in one pass."""
         try:
-            tree = ET.parse(xml_file)
-            root = tree.getroot()
+            counts = {'testcase': 0, 'failure': 0, 'error': 0, 'skipped': 0}
+            failure_details = []
+            timings = TestcaseTimings()
+            outcomes = TestOutcomeIndex()
+            device = device_model_api(device_from_path(rel_path))
+            total_time = 0.0
             
-            test_info = {
-                'file': str(xml_file.relative_to(self.results_dir)),
-                'type': 'XML Test Results',
-                'total_tests': len(root.findall('.//testcase')),
-                'failures': len(root.findall('.//failure')),
-                'errors': len(root.findall('.//error'))
-            }
+            # Open elements; testcases are detached from their parent once
+            # finished so the tree never grows beyond the current path
+            stack = []
+            suite_names = []
+            current_case = None
+            case_outcome = 'passed'
             
-            # Extract failure details
-            for failure in root.findall('.//failure'):
-                failure_info = {
-                    'test_name': failure.get('name', 'Unknown'),
-                    'message': failure.text.strip()[:200] if failure.text else 'No message',
-                    'file': str(xml_file.relative_to(self.results_dir))
-                }
-                test_info.setdefault('failure_details', []).append(failure_info)
+            for event, elem in ET.iterparse(raw, events=('start', 'end')):
+                tag = elem.tag.rsplit('}', 1)[-1]
+                if event == 'start':
+                    stack.append(elem)
+                    if tag == 'testsuite':
+                        suite_names.append(elem.get('name', ''))
+                    elif tag == 'testcase':
+                        current_case = elem
+                        case_outcome = 'passed'
+                    continue
+                
+                stack.pop()
+                if tag in counts:
+                    counts[tag] += 1
+                if current_case is not None and tag in ('failure', 'error'):
+                    case_outcome = 'failed'
+                elif current_case is not None and tag == 'skipped' and case_outcome == 'passed':
+                    case_outcome = 'skipped'
+                
+                if tag == 'failure':
+                    case_name = current_case.get('name') if current_case is not None else None
+                    failure_details.append((
+                        elem.get('name') or case_name or 'Unknown',
+                        elem.text.strip()[:200] if elem.text else 'No message'
+                    ))
+                elif tag == 'testcase':
+                    duration = _parse_duration(elem.get('time'))
+                    total_time += duration
+                    suite = elem.get('classname') or (suite_names[-1] if suite_names else '')
+                    timings.add(suite, elem.get('name', 'Unknown'), duration)
+                    outcomes.add(suite, elem.get('name', 'Unknown'), device, case_outcome)
+                    current_case = None
+                    elem.clear()
+                    if stack:
+                        stack[-1].remove(elem)
+                elif tag == 'testsuite':
+                    suite_names.pop()
             
-            self.test_results.append(test_info)
+            self.test_results.append(XmlResultRecord(
+                rel_path, XmlResultRecord.TYPE, counts['testcase'], counts['failure'], counts['error'],
+                counts['skipped'], round(total_time, 3), tuple(failure_details)
+            ))
+            self.testcase_timings.extend(timings.to_dict())
+            self.test_outcomes.merge(outcomes.export())
             
         except Exception as e:
-            print(f"Error parsing XML {xml_file}: {e}")
+            print(f"Error parsing XML {self._source_path(rel_path)}: {e}")
     
-    def _parse_json_result(self, json_file: Path):
-        """Parse JSON test result files."""
+    def _parse_json_result(self, raw: IO[bytes], rel_path: str):
+        """Decode a JSON result file incrementally, keeping only a schema-aware summary."""
         try:
-            with open(json_file, 'r') as f:
-                data = json.load(f)
+            stream = JsonEventStream(io.TextIOWrapper(raw, encoding='utf-8-sig', errors='replace'))
+            top_level = {'{': 'object', '[': 'array'}.get(stream.peek(), 'scalar')
+            summary = JsonResultSummary(top_level)
+            for path, value in stream.events():
+                summary.feed(path, value)
+            if stream.peek():
+                raise ValueError("Extra data after the top-level JSON value")
             
-            test_info = {
-                'file': str(json_file.relative_to(self.results_dir)),
-                'type': 'JSON Test Results',
-                'data': data
-            }
-            self.test_results.append(test_info)
+            schema = summary.schema()
+            self.test_results.append(JsonResultRecord(
+                rel_path, JsonResultRecord.TYPE, schema, summary.summary(),
+                stream.head if schema == 'unknown' else None
+            ))
             
         except Exception as e:
-            print(f"Error parsing JSON {json_file}: {e}")
-    
-    def _find_performance_files(self):
-        """Find performance metric files."""
-        perf_patterns = ["*perf*", "*performance*", "metrics*"]
-        
-        for pattern in perf_patterns:
-            for perf_file in self.results_dir.rglob(pattern):
-                if perf_file.is_file():
-                    self.performance_metrics.append(str(perf_file.relative_to(self.results_dir)))
-    
-    def _find_media_files(self):
-        """Find screenshots and video files."""
-        image_patterns = ["*.png", "*.jpg", "*.jpeg"]
-        video_patterns = ["*.mp4", "*.avi", "*.mov"]
-        
-        for pattern in image_patterns + video_patterns:
-            for media_file in self.results_dir.rglob(pattern):
-                if media_file.is_file():
-                    file_info = {
-                        'path': str(media_file.relative_to(self.results_dir)),
-                        'size_mb': round(media_file.stat().st_size / (1024 * 1024), 2),
-                        'type': 'image' if media_file.suffix.lower() in ['.png', '.jpg', '.jpeg'] else 'video'
-                    }
-                    
-                    if file_info['type'] == 'image':
-                        self.screenshots.append(file_info)
-                    else:
-                        self.videos.append(file_info)
+            print(f"Error parsing JSON {self._source_path(rel_path)}: {e}")
     
-    def _extract_timestamp(self, content: str, position: int) -> Optional[str]:
-        """Extract timestamp near the given position in content."""
-        try:
-            # Look for timestamp patterns in surrounding text
-            start = max(0, position - 200)
-            end = min(len(content), position + 200)
-            surrounding = content[start:end]
-            
-            # Common timestamp patterns
-            timestamp_patterns = [
-                r'\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}',
-                r'\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2}',
-                r'\w{3}\s+\d{1,2}\s+\d{2}:\d{2}:\d{2}'
-            ]
-            
-            for pattern in timestamp_patterns:
-                match = re.search(pattern, surrounding)
-                if match:
-                    return match.group()
-            
-            return None
-        except Exception:
-            return None
+    def _record_media_file(
+        self, rel_path: str, size: int, opener: Optional[Callable[[], IO[bytes]]] = None
+    ):
+        """Record a screenshot or video file from its size alone.
+        
+        Given an opener, a screenshot is also decoded for its perceptual
+        hash; videos are never read.
+        """
+        is_image = os.path.splitext(rel_path)[1].lower() in IMAGE_SUFFIXES
+        dhash = None
+        if is_image and opener is not None:
+            try:
+                with opener() as raw:
+                    dhash = screenshot_dhash(raw)
+            except Exception as e:
+                print(f"Warning: Could not hash screenshot {self._source_path(rel_path)}: {e}")
+        
+        if is_image:
+            self.screenshots.append(MediaRecord(rel_path, size, 'image', dhash))
+        else:
+            self.videos.append(MediaRecord(rel_path, size, 'video', None))
     
     def _generate_report(self) -> Dict:
-        """Generate comprehensive test report."""
+        """Generate comprehensive test report.
+        
+        With a streaming sink the per-record sections were already written,
+        so the report holds only the summary, counts and aggregate sections.
+        Perf samples are kept either way: the percentile summary and
+        --baseline comparison are computed from them.
+        """
+        started = time.perf_counter()
+        streamed = self.sink is not None
+        # Records become dicts only here, when the report is about to be written
+        perf_samples = [sample.to_dict() for sample in self.perf_samples]
+        screenshots = [shot.to_dict() for shot in self.screenshots] if self.hash_screenshots or not streamed else []
+        xml_results = [result for result in self.test_results if isinstance(result, XmlResultRecord)]
         report = {
             'summary': {
                 'total_crashes': len(self.crashes),
+                'distinct_crashes': len(self.crash_index),
                 'total_test_files': len(self.test_results),
+                'total_failures': sum(result.failures for result in xml_results),
+                'total_errors': sum(result.errors for result in xml_results),
                 'total_screenshots': len(self.screenshots),
                 'total_videos': len(self.videos),
                 'performance_files': len(self.performance_metrics),
+                'performance': summarize_perf_samples(perf_samples),
                 'scan_time': datetime.now().isoformat()
-            },
-            'crashes': self.crashes,
-            'test_results': self.test_results,
-            'media_files': {
-                'screenshots': self.screenshots,
-                'videos': self.videos
-            },
-            'performance_files': self.performance_metrics
+            }
         }
+        if not streamed:
+            report['crashes'] = [crash.to_dict() for crash in self.crashes]
+        report['crash_signatures'] = self.crash_index.to_list()
+        if not streamed:
+            report['test_results'] = [result.to_dict() for result in self.test_results]
+            report['media_files'] = {
+                'screenshots': screenshots,
+                'videos': [video.to_dict() for video in self.videos]
+            }
+            report['performance_files'] = self.performance_metrics
+        report['performance_samples'] = perf_samples
+        report.update({
+            'test_timings': {
+                'total_testcases': len(self.testcase_timings),
+                'total_time_s': round(self.testcase_timings.total_time(), 3),
+                'slowest_tests': self.testcase_timings.slowest(SLOWEST_TESTS_LIMIT),
+                'suites': self.testcase_timings.by_suite()
+            },
+            'test_outcomes': dict(
+                {'distinct_tests': len(self.test_outcomes), 'devices': self.test_outcomes.devices()},
+                **self.test_outcomes.outcome_table()
+            ),
+            'devices': self._device_rollup()
+        })
+        
+        if self.cache is not None:
+            report['summary']['parse_cache'] = self.cache.stats()
+        
+        if self.fetch_failures:
+            report['summary']['fetch_failures'] = self.fetch_failures
         
+        if self.hash_screenshots:
+            report['screenshot_dedup'] = dedup_screenshots(screenshots)
+        
+        if self.profiler is not None:
+            self.profiler.add_phase('report', time.perf_counter() - started)
+            report['profiling'] = self.profiler.to_report()
         return report
 
-def print_crash_summary(crashes: List[Dict]):
-    """Print crash summary to stdout."""
+    def _device_rollup(self) -> Dict[str, Dict[str, int]]:
+        """Test outcomes and crash counts per device model/API level."""
+        rollup = {
+            device: dict(totals, crashes=0)
+            for device, totals in self.test_outcomes.by_device().items()
+        }
+        empty = dict.fromkeys(TestOutcomeIndex.OUTCOMES, 0)
+        for crash in self.crashes:
+            device = device_model_api(device_from_path(crash.file))
+            rollup.setdefault(device, dict(empty, crashes=0))['crashes'] += 1
+        return dict(sorted(rollup.items()))
+
+class NdjsonReportWriter:
+    """Streams the report as newline-delimited JSON while results are parsed.
+    
+    Every crash, test file, media item, perf file and perf sample is one
+    line tagged with a "record" type, written as soon as its file has been
+    merged; the final line is the "summary" record holding the aggregate
+    sections. Dashboards can tail the file and filter by record type.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._f = open(path, 'w', encoding='utf-8')
+    
+    def record(self, kind: str, item: Dict):
+        # Splice the type tag into the encoded object instead of copying the dict
+        encoded = _compact_json(item)
+        tag = '{"record":' + _compact_json(kind)
+        self._f.write(tag + (',' + encoded[1:] if encoded != '{}' else '}') + '\n')
+    
+    def flush(self):
+        self._f.flush()
+    
+    def summary(self, report: Dict):
+        """Write the trailing summary record: summary fields plus every non-streamed section."""
+        summary = dict(report['summary'])
+        summary.update(
+            (key, value) for key, value in report.items()
+            if key != 'summary' and key not in STREAMED_SECTIONS
+        )
+        self.record('summary', summary)
+    
+    def close(self):
+        self._f.close()
+
+
+# One shared encoder: json.dumps() with custom separators builds a new one per call
+_compact_json = json.JSONEncoder(separators=COMPACT_SEPARATORS).encode
+
+
+def write_compact_report(report: Dict, f):
+    """Write the report as single-line JSON, encoding list entries in batches.
+    
+    The output equals json.dump with compact separators, but entries go
+    through the C encoder and no whole-report string is ever built.
+    """
+    f.write('{')
+    for index, (key, value) in enumerate(report.items()):
+        f.write((',' if index else '') + json.dumps(key) + ':')
+        if isinstance(value, list):
+            f.write('[')
+            for start in range(0, len(value), COMPACT_BATCH):
+                # Encode a slice as one list and drop its brackets: one encoder call per batch
+                batch = _compact_json(value[start:start + COMPACT_BATCH])[1:-1]
+                f.write((',' if start else '') + batch)
+            f.write(']')
+        else:
+            f.write(_compact_json(value))
+    f.write('}')
+
+
+def report_path_for(source: str) -> Path:
+    """Where the JSON report goes: inside a results directory, beside a results archive,
+    or in the current directory for a gs:// prefix."""
+    if is_gcs_url(source):
+        return Path(REPORT_FILENAME)
+    results_path = Path(source)
+    suffix = archive_suffix(results_path) if results_path.is_file() else None
+    if suffix is None:
+        return results_path / REPORT_FILENAME
+    return results_path.with_name(f"{results_path.name[:-len(suffix)]}_{REPORT_FILENAME}")
+
+def _parse_file_task(task: Tuple[str, str, str, str, bool, bool]) -> Dict[str, list]:
+    """Parse a single file in a pool worker and return its records."""
+    results_dir, path, bucket, label, profile, hash_screenshots = task
+    parser = FirebaseResultParser(results_dir, label=label, profile=profile, hash_screenshots=hash_screenshots)
+    parser._dispatch(Path(path), bucket)
+    return parser._collect()
+
+def shard_labels(paths: List[str]) -> List[str]:
+    """Unique report-path prefixes for shards: the directory name, the archive name
+    sans suffix, or the last segment of a gs:// prefix."""
+    labels = []
+    seen = set()
+    for source in paths:
+        path = Path(source)
+        suffix = archive_suffix(path) if path.is_file() else None
+        if is_gcs_url(source):
+            label = source.rstrip('/').rsplit('/', 1)[-1]
+        elif suffix:
+            label = path.name[:-len(suffix)]
+        else:
+            label = path.resolve().name
+        unique = label or 'shard'
+        n = 2
+        while unique in seen:
+            unique = f"{label}-{n}"
+            n += 1
+        seen.add(unique)
+        labels.append(unique)
+    return labels
+
+def _parse_shard_task(task: Tuple[str, str, bool, bool, int, bool, bool]) -> Dict:
+    """Parse one whole shard in a pool worker and return its records."""
+    path, label, use_cache, cache_hash, fetch_concurrency, profile, hash_screenshots = task
+    parser = FirebaseResultParser(
+        path, use_cache=use_cache, cache_hash=cache_hash, label=label,
+        fetch_concurrency=fetch_concurrency, profile=profile, hash_screenshots=hash_screenshots
+    )
+    error = parser.parse_records()
+    return {
+        'error': error,
+        'records': parser._collect(),
+        'parse_cache': parser.cache.stats() if parser.cache is not None else None
+    }
+
+def _bounded_map(pool, fn, items: List, window: int) -> Iterator:
+    """Like pool.map(), but with at most `window` calls in flight; results come in input order."""
+    pending = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+def parse_shards(
+    paths: List[str],
+    jobs: int = 1,
+    executor: str = "process",
+    use_cache: bool = False,
+    cache_hash: bool = False,
+    fetch_concurrency: int = FETCH_CONCURRENCY,
+    sink=None,
+    profile: bool = False,
+    hash_screenshots: bool = False
+) -> Dict:
+    """Parse several result directories, archives or gs:// prefixes (shards) into one merged report.
+    
+    Shards are parsed concurrently, one per worker, with report paths
+    prefixed by the shard label. Each shard's records are merged into the
+    aggregate in input order as they arrive. Testcase outcomes and timings
+    are folded into per-test and per-suite totals, so they grow with
+    distinct tests rather than with shards; crash, test file, media and
+    perf sample records are kept, because the report lists every one.
+    """
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    tasks = [
+        (str(path), label, use_cache, cache_hash, fetch_concurrency, profile, hash_screenshots)
+        for path, label in zip(paths, shard_labels(paths))
+    ]
+    aggregate = FirebaseResultParser(os.curdir, sink=sink, profile=profile, hash_screenshots=hash_screenshots)
+    aggregate.testcase_timings = TestcaseTimingRollup()
+    shards = []
+    cache_totals = {'hits': 0, 'misses': 0}
+    
+    workers = min(jobs, len(tasks))
+    pool_cls = ThreadPoolExecutor if executor == "thread" else ProcessPoolExecutor
+    pool = pool_cls(max_workers=workers) if workers > 1 else None
+    started = time.perf_counter()
+    try:
+        if pool is not None:
+            results = _bounded_map(pool, _parse_shard_task, tasks, window=workers * 2)
+        else:
+            results = map(_parse_shard_task, tasks)
+        for (path, label, *_), result in zip(tasks, results):
+            if result['error']:
+                return {"error": f"Shard {label}: {result['error']}"}
+            records = result['records']
+            aggregate._merge(records)
+            aggregate._emit_new()
+            shards.append({
+                'label': label,
+                'path': path,
+                'crashes': len(records['crashes']),
+                'test_files': len(records['test_results']),
+                'testcases': len(records['testcase_timings']['name'])
+            })
+            if result['parse_cache']:
+                cache_totals['hits'] += result['parse_cache']['hits']
+                cache_totals['misses'] += result['parse_cache']['misses']
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    
+    if aggregate.profiler is not None:
+        aggregate.profiler.add_phase('parse', time.perf_counter() - started)
+    report = aggregate._generate_report()
+    report['summary']['shards'] = shards
+    if use_cache or cache_hash:
+        lookups = cache_totals['hits'] + cache_totals['misses']
+        report['summary']['parse_cache'] = dict(
+            cache_totals,
+            hit_rate=round(cache_totals['hits'] / lookups, 3) if lookups else 0.0,
+            content_hash=cache_hash
+        )
+    return report
+
+class LogcatFollower:
+    """Live crash detection on `adb logcat -v threadtime` from stdin or a growing file.
+    
+    Input is read in chunks and split into lines, holding back a trailing
+    partial line (capped at LOG_CHUNK_CHARS) until its newline arrives.
+    Every line goes through the same CrashScanner as _parse_crash_log, so
+    memory stays constant. Because a live trace has no end-of-input, an
+    open crash block is reported once it has not grown for `settle_s`
+    (`join_settle_s` for types whose trace arrives late, see
+    FOLLOW_LATE_JOIN_TYPES).
+    A followed file is reopened when it is replaced (new inode) and read
+    from the start when it is truncated, as logcat -r/-n rotation and
+    copytruncate do.
+    """
+    
+    def __init__(
+        self,
+        source: str,
+        on_crash: Callable[[Dict], None],
+        settle_s: float = FOLLOW_SETTLE_S,
+        join_settle_s: float = FOLLOW_JOIN_SETTLE_S,
+        poll_s: float = FOLLOW_POLL_S
+    ):
+        self.source = source
+        self.on_crash = on_crash
+        self.settle_s = settle_s
+        self.join_settle_s = max(join_settle_s, settle_s)
+        self.poll_s = poll_s
+        self.name = '<stdin>' if source == '-' else source
+        self.scanner = CrashScanner()
+        self._pending = b''
+        self._mid_line = False
+        self._file = None
+        self._inode = None
+        self._stdin_chunks = None
+        self._last_growth = time.monotonic()
+    
+    def run(self):
+        """Follow until stdin reaches end of input; a file is followed until interrupted."""
+        if self.source == '-':
+            self._start_stdin_reader()
+        try:
+            while True:
+                wait = self.poll_s if (self.source != '-' or not self.scanner.idle) else None
+                chunk = self._read_stdin(wait) if self.source == '-' else self._read_file(wait)
+                if chunk is None:
+                    break
+                if chunk:
+                    self._feed(chunk)
+                if not self.scanner.idle and self._settled():
+                    self._report(self.scanner.finish())
+        finally:
+            self._flush_pending()
+            self._report(self.scanner.finish())
+            if self._file is not None:
+                self._file.close()
+    
+    def _settled(self) -> bool:
+        late = self.scanner.open_type in FOLLOW_LATE_JOIN_TYPES
+        settle = self.join_settle_s if late else self.settle_s
+        return time.monotonic() - self._last_growth >= settle
+    
+    def _start_stdin_reader(self):
+        """Read stdin on a daemon thread with blocking reads.
+
+        select() does not work on Windows pipes, so the thread blocks in read1() and
+        hands chunks over through a bounded queue; None marks end of input.
+        """
+        self._stdin_chunks = queue.Queue(maxsize=FOLLOW_QUEUE_CHUNKS)
+        
+        def reader():
+            stream = sys.stdin.buffer
+            try:
+                while True:
+                    data = stream.read1(FOLLOW_READ_BYTES)
+                    if not data:
+                        break
+                    self._stdin_chunks.put(data)
+            finally:
+                self._stdin_chunks.put(None)
+        
+        threading.Thread(target=reader, name='logcat-stdin', daemon=True).start()
+    
+    def _read_stdin(self, timeout: Optional[float]) -> Optional[bytes]:
+        """Next chunk of stdin, b'' when nothing arrived within `timeout`, None at end of input."""
+        while True:
+            try:
+                # Wait in short slices even when idle, so Ctrl-C is handled on Windows too
+                return self._stdin_chunks.get(timeout=self.poll_s if timeout is None else timeout)
+            except queue.Empty:
+                if timeout is not None:
+                    return b''
+    
+    def _read_file(self, timeout: float) -> bytes:
+        """Next chunk of the followed file, reopening it after rotation; b'' when idle."""
+        if self._file is None and not self._open_file():
+            time.sleep(timeout)
+            return b''
+        data = self._file.read(FOLLOW_READ_BYTES)
+        if data:
+            return data
+        
+        try:
+            stat = os.stat(self.source)
+        except OSError:
+            stat = None
+        if stat is None or stat.st_ino != self._inode:
+            # Replaced or removed: what was buffered ended with the old file
+            self._end_of_file()
+            self._file.close()
+            self._file = None
+        elif stat.st_size < self._file.tell():
+            self._end_of_file()
+            self._file.seek(0)
+        else:
+            time.sleep(timeout)
+        return b''
+    
+    def _open_file(self) -> bool:
+        try:
+            self._file = open(self.source, 'rb')
+        except OSError:
+            return False
+        self._inode = os.fstat(self._file.fileno()).st_ino
+        return True
+    
+    def _end_of_file(self):
+        self._flush_pending()
+        self._report(self.scanner.finish())
+    
+    def _flush_pending(self):
+        if self._pending and not self._mid_line:
+            self._feed_line(self._pending)
+        self._pending = b''
+        self._mid_line = False
+    
+    def _feed(self, chunk: bytes):
+        lines = (self._pending + chunk).split(b'\n')
+        self._pending = lines.pop()
+        if lines and self._mid_line:
+            # Rest of a runaway line whose first piece was already fed
+            del lines[0]
+            self._mid_line = False
+        if len(self._pending) > LOG_CHUNK_CHARS:
+            # Feed a runaway line once, capped, and drop the rest up to its newline
+            if not self._mid_line:
+                lines.append(self._pending)
+            self._pending = b''
+            self._mid_line = True
+        for line in lines:
+            self._feed_line(line)
+    
+    def _feed_line(self, raw: bytes):
+        before = self.scanner.open_lines
+        crashes = self.scanner.feed(raw.decode('utf-8', errors='replace'))
+        if crashes or self.scanner.open_lines != before:
+            self._last_growth = time.monotonic()
+        self._report(crashes)
+    
+    def _report(self, crashes: List[Dict]):
+        for crash in crashes:
+            self.on_crash(crash)
+
+def follow_logcat(source: str, settle_ms: float, writer: Optional['NdjsonReportWriter'] = None) -> int:
+    """Run --follow mode: print (and optionally stream) each crash as it completes.
+    
+    Returns the number of crashes seen.
+    """
+    follower = None
+    index = CrashSignatureIndex()
+    seen = 0
+    
+    def on_crash(crash: Dict):
+        nonlocal seen
+        crash_info = {'file': follower.name}
+        crash_info.update(crash)
+        signature = index.add(crash_info)
+        entry = index.entries[signature]
+        crash_info['signature'] = signature
+        del crash_info['details']
+        seen += 1
+        repeat = f" (seen {entry['count']}x)" if entry['count'] > 1 else ""
+        print(
+            f"🚨 {crash_info.get('timestamp') or 'line ' + str(crash_info['line'])} "
+            f"{crash_info['type']}: {entry['exception']} [{signature}]{repeat}",
+            flush=True
+        )
+        if writer is not None:
+            writer.record('crash', crash_info)
+            writer.flush()
+    
+    follower = LogcatFollower(source, on_crash, settle_s=settle_ms / 1000)
+    print(f"👀 Following {follower.name} for crashes (Ctrl-C to stop)", flush=True)
+    try:
+        follower.run()
+    except KeyboardInterrupt:
+        pass
+    
+    if writer is not None:
+        writer.summary({
+            'summary': {'total_crashes': seen, 'distinct_crashes': len(index)},
+            'crash_signatures': index.to_list()
+        })
+    print(f"\n🧾 Followed {follower.name}: {seen} crashes, {len(index)} distinct")
+    return seen
+
+def print_crash_summary(total: int, signatures: List[Dict]):
+    """Print crash summary to stdout, one entry per distinct crash signature."""
     print("\n" + "="*60)
     print("🚨 FIREBASE TEST LAB - CRASH ANALYSIS")
     print("="*60)
     
-    if not crashes:
+    if not total:
         print("✅ NO CRASHES DETECTED")
-        print("All Firebase Test Lab runs completed without FATAL exceptions.")
+        print("All Firebase Test Lab runs completed without crashes, ANRs or low-memory kills.")
         return
     
-    print(f"⚠️  CRASHES DETECTED: {len(crashes)} total")
+    print(f"⚠️  CRASHES DETECTED: {total} total, {len(signatures)} distinct")
     print()
     
-    # Group crashes by type
-    crash_types = {}
-    for crash in crashes:
-        crash_type = crash.get('type', 'Unknown')
-        if crash_type not in crash_types:
-            crash_types[crash_type] = []
-        crash_types[crash_type].append(crash)
-    
-    for crash_type, type_crashes in crash_types.items():
-        print(f"📋 {crash_type}: {len(type_crashes)} incidents")
+    for i, entry in enumerate(signatures[:10], 1):  # Signatures arrive most frequent first
+        print(f"📋 {i}. {entry['exception']} [{entry['signature']}]")
         print("-" * 40)
-        
-        for i, crash in enumerate(type_crashes[:3], 1):  # Show first 3 of each type
-            print(f"{i}. File: {crash.get('file', 'Unknown')}")
-            if crash.get('timestamp'):
-                print(f"   Time: {crash['timestamp']}")
-            
-            details = crash.get('details', '')
-            if details:
-                # Extract first line for summary
-                first_line = details.split('\n')[0]
-                print(f"   Summary: {first_line[:100]}...")
-            print()
-
-def print_test_summary(test_results: List[Dict]):
-    """Print test result summary to stdout."""
+        print(f"   Type: {entry.get('type', 'Unknown')}")
+        print(f"   Occurrences: {entry['count']} on {len(entry['devices'])} device(s)")
+        print(f"   First file: {entry['files'][0]}")
+        if entry.get('first_timestamp'):
+            print(f"   Time: {entry['first_timestamp']}")
+        if entry['frames']:
+            print(f"   Top frame: {entry['frames'][0][:100]}")
+        print()
+    
+    if len(signatures) > 10:
+        print(f"   ... and {len(signatures) - 10} more signatures (see report)")
+
+def print_test_summary(summary: Dict, test_results: List[Dict], test_timings: Optional[Dict] = None):
+    """Print test result summary to stdout; `test_results` is empty when records were streamed."""
     print("\n" + "="*60)
     print("📊 TEST RESULTS SUMMARY")
     print("="*60)
     
-    if not test_results:
+    if not summary['total_test_files']:
         print("ℹ️  No test result files found.")
         return
     
-    total_files = len(test_results)
-    total_failures = sum(result.get('failures', 0) for result in test_results)
-    total_errors = sum(result.get('errors', 0) for result in test_results)
-    
-    print(f"📁 Test Result Files: {total_files}")
-    print(f"❌ Total Failures: {total_failures}")
-    print(f"🚨 Total Errors: {total_errors}")
+    print(f"📁 Test Result Files: {summary['total_test_files']}")
+    print(f"❌ Total Failures: {summary['total_failures']}")
+    print(f"🚨 Total Errors: {summary['total_errors']}")
     
     # Show first few test files
     for result in test_results[:5]:
@@ -282,56 +3176,407 @@ def print_test_summary(test_results: List[Dict]):
         print(f"  - {file_name}")
         if 'total_tests' in result:
             print(f"    Tests: {result['total_tests']}, Failures: {result['failures']}, Errors: {result['errors']}")
+        elif result.get('schema') == 'test_matrix':
+            summary = result['summary']
+            print(
+                f"    Matrix {summary.get('testMatrixId', '?')}: {summary.get('state', '?')}, "
+                f"outcome {summary.get('outcomeSummary', '?')}, {summary['executions']} executions"
+            )
+    
+    if test_timings and test_timings.get('slowest_tests'):
+        print(f"\n⏱️  Slowest tests ({test_timings['total_testcases']} timed, {test_timings['total_time_s']}s total):")
+        for test in test_timings['slowest_tests'][:5]:
+            print(f"  - {test['suite']}.{test['name']}: {test['time_s']}s")
+
+def print_test_outcome_summary(test_outcomes: Dict, devices: Dict[str, Dict[str, int]]):
+    """Print per-device totals and tests whose outcome differs across devices or attempts."""
+    print("\n" + "="*60)
+    print("🔁 CROSS-DEVICE TEST OUTCOMES")
+    print("="*60)
+    
+    if not devices:
+        print("ℹ️  No per-testcase outcomes or crashes to compare.")
+        return
+    
+    print(f"📱 Devices: {len(devices)}")
+    for device, totals in devices.items():
+        print(
+            f"  - {device}: {totals['passed']} passed, {totals['failed']} failed, "
+            f"{totals['skipped']} skipped, {totals['crashes']} crashes"
+        )
+    
+    flaky = test_outcomes.get('flaky', [])
+    failing = test_outcomes.get('failing', [])
+    print(f"\n🎲 Flaky tests (passed and failed): {len(flaky)}")
+    for test in flaky[:10]:
+        failed_on = [device for device, counts in test['devices'].items() if counts['failed']]
+        print(
+            f"  - {test['suite']}.{test['name']}: {test['passed']} passed / {test['failed']} failed "
+            f"(failed on {', '.join(failed_on)})"
+        )
+    print(f"❌ Never passed: {len(failing)}")
+    for test in failing[:10]:
+        print(f"  - {test['suite']}.{test['name']}: failed on {', '.join(test['devices'])}")
 
-def print_media_summary(screenshots: List[Dict], videos: List[Dict]):
-    """Print media files summary to stdout."""
+def print_media_summary(summary: Dict, screenshots: List[Dict], videos: List[Dict]):
+    """Print media files summary to stdout; the lists are empty when records were streamed."""
     print("\n" + "="*60)
     print("📸 MEDIA FILES SUMMARY")
     print("="*60)
     
-    print(f"🖼️  Screenshots: {len(screenshots)} files")
+    print(f"🖼️  Screenshots: {summary['total_screenshots']} files")
     for screenshot in screenshots[:3]:  # Show first 3
         print(f"  - {screenshot['path']} ({screenshot['size_mb']} MB)")
     
-    print(f"\n🎬 Videos: {len(videos)} files")
+    print(f"\n🎬 Videos: {summary['total_videos']} files")
     for video in videos[:3]:  # Show first 3
         print(f"  - {video['path']} ({video['size_mb']} MB)")
 
+def print_screenshot_dedup(dedup: Dict):
+    """Print screenshot clusters and cross-device visual differences to stdout."""
+    print(
+        f"\n🧬 Perceptual hashes: {dedup['hashed']} screenshots in {dedup['clusters']} clusters; "
+        f"{dedup['duplicates']} near-duplicates ({dedup['duplicate_mb']} MB) need not be archived"
+    )
+    for group in dedup['groups'][:3]:
+        print(f"  - {group['representative']} (+{len(group['members']) - 1} similar)")
+    
+    if dedup['visual_diffs']:
+        print(f"\n👁️  Visual differences from other devices: {len(dedup['visual_diffs'])}")
+        for diff in dedup['visual_diffs'][:10]:
+            print(
+                f"  - {diff['step']} on {diff['device']}: {diff['distance']} bits from "
+                f"{diff['consensus']} ({diff['devices']} devices)"
+            )
+
+def print_performance_summary(performance: Dict):
+    """Print latency percentiles per metric and device to stdout."""
+    print("\n" + "="*60)
+    print("⏱️  PERFORMANCE METRICS")
+    print("="*60)
+    
+    if not performance:
+        print("ℹ️  No startup, model-load or transcription events found in logcat.")
+        return
+    
+    for name, stats in performance.items():
+        status = "❌" if stats['over_budget'] else "✅"
+        print(
+            f"{status} {name}: p50 {stats['p50']} / p90 {stats['p90']} / p99 {stats['p99']} ms "
+            f"(budget {stats['budget_ms']} ms at p{BUDGET_PERCENTILE}, {stats['samples']} samples)"
+        )
+        for device, device_stats in stats['devices'].items():
+            marker = " ⚠️" if device in stats['over_budget'] else ""
+            print(
+                f"  - {device}: p50 {device_stats['p50']} / p90 {device_stats['p90']} / "
+                f"p99 {device_stats['p99']} ms ({device_stats['samples']}){marker}"
+            )
+
+def print_profile(profiling: Dict, write_s: Optional[float] = None):
+    """Print the --profile phase and stage table to stdout."""
+    print("\n" + "="*60)
+    print("🔬 PARSER PROFILE")
+    print("="*60)
+    
+    phases = dict(profiling['phases'])
+    if write_s is not None:
+        phases['write'] = write_s
+    print("  " + "  ".join(f"{name} {seconds:.3f}s" for name, seconds in phases.items()))
+    print(f"  {'stage':<16} {'time_s':>9} {'files':>7} {'MB':>9} {'MB/s':>8} {'matches':>9}")
+    for name, stage in profiling['stages'].items():
+        mb_per_s = f"{stage['mb_per_s']:.1f}" if stage['mb_per_s'] is not None else "-"
+        print(
+            f"  {name:<16} {stage['time_s']:>9.3f} {stage['files']:>7} "
+            f"{stage['bytes'] / (1024 * 1024):>9.1f} {mb_per_s:>8} {stage['matches']:>9}"
+        )
+    for name, stage in profiling['stages'].items():
+        if stage['slowest']:
+            slowest = stage['slowest'][0]
+            print(f"  🐢 slowest {name}: {slowest['file']} ({slowest['time_s']:.3f}s)")
+
+def print_regression_table(rows: List[Dict]):
+    """Print the per-metric baseline comparison table to stdout."""
+    print("\n" + "="*60)
+    print("📈 PERFORMANCE VS BASELINE")
+    print("="*60)
+    
+    if not rows:
+        print("ℹ️  No latency samples in this run or the baseline.")
+        return
+    
+    icons = {'regression': '❌', 'ok': '✅', 'insufficient data': '➖'}
+    print(f"   {'metric':<26} {'device':<28} {'base p50':>9} {'now p50':>9} {'delta':>8} {'p':>7}")
+    for row in rows:
+        delta = f"{row['delta_pct']:+.1f}%" if 'delta_pct' in row else '-'
+        p_value = f"{row['p_value']:.3f}" if 'p_value' in row else '-'
+        print(
+            f"{icons[row['status']]} {row['metric']:<26} {row['device'][:28]:<28} "
+            f"{row.get('baseline_p50', '-'):>9} {row.get('current_p50', '-'):>9} {delta:>8} {p_value:>7}"
+        )
+
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python parse_firebase_results.py <results_directory>")
-        sys.exit(1)
+    arg_parser = argparse.ArgumentParser(
+        description="Summarize crashes, test results and media from Firebase Test Lab results."
+    )
+    arg_parser.add_argument(
+        "results_directory", nargs="*",
+        help="Directory, .zip/.tar/.tar.gz archive or gs://bucket/prefix containing Test Lab results; "
+             "pass several shards to merge them into one report"
+    )
+    arg_parser.add_argument(
+        "--jobs", "-j", type=int, default=1,
+        help="Parse files with N parallel workers (0 = one per CPU, default: 1)"
+    )
+    arg_parser.add_argument(
+        "--executor", choices=("process", "thread"), default="process",
+        help="Worker pool type used when --jobs > 1 (default: process)"
+    )
+    arg_parser.add_argument(
+        "--cache", action="store_true",
+        help=f"Reuse parsed records for unchanged files via {CACHE_FILENAME} in the results directory"
+    )
+    arg_parser.add_argument(
+        "--cache-hash", action="store_true",
+        help="Validate cache entries by content SHA-256 instead of mtime (implies --cache)"
+    )
+    arg_parser.add_argument("--cache-path", help="Store the parse cache at this path instead")
+    arg_parser.add_argument(
+        "--fetch-concurrency", type=int, default=FETCH_CONCURRENCY,
+        help=f"Concurrent downloads (pooled connections) for gs:// results (default: {FETCH_CONCURRENCY}); "
+             f"authenticates with ${GCS_TOKEN_ENV}, ${GCS_EMULATOR_ENV} selects a local server"
+    )
+    arg_parser.add_argument(
+        "--allow-missing", action="store_true",
+        help="Do not fail the run when gs:// objects could not be fetched after retries; "
+             "they are still listed under fetch_failures in the report summary"
+    )
+    arg_parser.add_argument(
+        "--report", metavar="PATH",
+        help=f"Write the JSON report here (default: {REPORT_FILENAME} in the results directory, "
+             f"beside an archive, or in the current directory for gs:// results and merged shards)"
+    )
+    arg_parser.add_argument(
+        "--format", choices=REPORT_FORMATS, default="json",
+        help="Report format: indented json (default), single-line compact json, or ndjson records "
+             "streamed while parsing and ending with a summary record"
+    )
+    arg_parser.add_argument(
+        "--follow", metavar="SOURCE",
+        help="Watch live `adb logcat -v threadtime` output instead of results: '-' reads stdin, "
+             "a path is tailed across rotation; crashes are printed as they complete and "
+             "streamed as ndjson records to --report when given"
+    )
+    arg_parser.add_argument(
+        "--follow-settle-ms", type=float, default=FOLLOW_SETTLE_S * 1000,
+        help=f"Report a followed crash once its trace has not grown for this long "
+             f"(default: {FOLLOW_SETTLE_S * 1000:g})"
+    )
+    arg_parser.add_argument(
+        "--dedup-screenshots", action="store_true",
+        help="Perceptually hash screenshots (requires Pillow; NumPy speeds it up) to cluster "
+             "near-duplicates and flag screenshots that differ from the same step on other devices"
+    )
+    arg_parser.add_argument(
+        "--profile", action="store_true",
+        help="Time each parsing phase and stage (walk, crash logs, XML, JSON, media, report), "
+             "add a 'profiling' section to the report and print a summary table"
+    )
+    arg_parser.add_argument(
+        "--fail-on-budget", action="store_true",
+        help=f"Exit non-zero when a latency metric's p{BUDGET_PERCENTILE} exceeds its budget on any device"
+    )
+    arg_parser.add_argument(
+        "--baseline",
+        help="Compare latency samples against this baseline JSON and fail on significant regressions"
+    )
+    arg_parser.add_argument(
+        "--update-baseline", metavar="PATH",
+        help="Append this run's latency samples to a baseline/history JSON file"
+    )
+    arg_parser.add_argument(
+        "--regression-threshold", type=float, default=REGRESSION_THRESHOLD,
+        help=f"Relative p50 slowdown that counts as a regression (default: {REGRESSION_THRESHOLD})"
+    )
+    arg_parser.add_argument(
+        "--regression-alpha", type=float, default=REGRESSION_ALPHA,
+        help=f"Mann-Whitney significance level for regressions (default: {REGRESSION_ALPHA})"
+    )
+    args = arg_parser.parse_args()
     
-    results_dir = sys.argv[1]
+    results_dirs = args.results_directory
+    if args.follow:
+        if results_dirs:
+            arg_parser.error("--follow watches a live log; do not pass results directories with it")
+        writer = None
+        if args.report:
+            try:
+                writer = NdjsonReportWriter(Path(args.report))
+            except OSError as e:
+                print(f"⚠️  Could not save report file: {e}")
+        try:
+            crash_count = follow_logcat(args.follow, args.follow_settle_ms, writer)
+        finally:
+            if writer is not None:
+                writer.close()
+        sys.exit(1 if crash_count else 0)
+    if not results_dirs:
+        arg_parser.error("pass a results directory (or --follow SOURCE)")
+    if args.dedup_screenshots and Image is None:
+        arg_parser.error("--dedup-screenshots needs Pillow: pip install Pillow")
+    if len(results_dirs) > 1 and args.cache_path:
+        arg_parser.error("--cache-path applies to a single results directory; shards use their own caches")
+    baseline = None
+    if args.baseline:
+        # A regression gate must fail closed: an unreadable baseline is an error, not a warning
+        try:
+            baseline = load_perf_baseline(Path(args.baseline))
+        except (OSError, ValueError) as e:
+            arg_parser.error(f"cannot load baseline {args.baseline}: {e}")
     
-    print("🔍 Firebase Test Lab Results Parser")
-    print(f"📁 Scanning directory: {results_dir}")
+    if args.report:
+        report_file = Path(args.report)
+    elif len(results_dirs) == 1:
+        report_file = report_path_for(results_dirs[0])
+    else:
+        report_file = Path(REPORT_FILENAME)
+    if args.format == 'ndjson' and not args.report:
+        report_file = report_file.with_suffix('.ndjson')
+    
+    writer = None
+    if args.format == 'ndjson':
+        try:
+            writer = NdjsonReportWriter(report_file)
+        except OSError as e:
+            print(f"⚠️  Could not save report file: {e}")
     
-    parser = FirebaseResultParser(results_dir)
-    report = parser.parse_all()
+    print("🔍 Firebase Test Lab Results Parser")
+    if len(results_dirs) == 1:
+        results_dir = results_dirs[0]
+        print(f"📁 Scanning directory: {results_dir}")
+        parser = FirebaseResultParser(
+            results_dir,
+            jobs=args.jobs,
+            executor=args.executor,
+            use_cache=args.cache or bool(args.cache_path),
+            cache_hash=args.cache_hash,
+            cache_path=args.cache_path,
+            fetch_concurrency=args.fetch_concurrency,
+            sink=writer,
+            profile=args.profile,
+            hash_screenshots=args.dedup_screenshots
+        )
+        if is_gcs_url(results_dir):
+            print(f"🌐 Fetching with {args.fetch_concurrency} pooled connections")
+        elif parser.jobs > 1 and Path(results_dir).is_dir():
+            print(f"⚙️  Parsing with {parser.jobs} {args.executor} workers")
+        report = parser.parse_all()
+    else:
+        print(f"📁 Merging {len(results_dirs)} shards: {', '.join(results_dirs)}")
+        report = parse_shards(
+            results_dirs,
+            jobs=args.jobs,
+            executor=args.executor,
+            use_cache=args.cache,
+            cache_hash=args.cache_hash,
+            fetch_concurrency=args.fetch_concurrency,
+            sink=writer,
+            profile=args.profile,
+            hash_screenshots=args.dedup_screenshots
+        )
     
     if 'error' in report:
+        if writer is not None:
+            writer.close()
         print(f"❌ Error: {report['error']}")
         sys.exit(1)
     
+    for shard in report['summary'].get('shards', []):
+        print(f"  - {shard['label']}: {shard['testcases']} testcases, {shard['crashes']} crashes")
+    
+    cache_stats = report['summary'].get('parse_cache')
+    if cache_stats:
+        print(
+            f"🗄️  Parse cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.0%} hit rate)"
+        )
+    
+    fetch_failures = report['summary'].get('fetch_failures', [])
+    if fetch_failures:
+        print(f"⚠️  {len(fetch_failures)} objects could not be fetched; their results are missing:")
+        for path in fetch_failures:
+            print(f"  - {path}")
+    
     # Print summaries to stdout (GitHub Actions will capture this)
-    print_crash_summary(report['crashes'])
-    print_test_summary(report['test_results'])
-    print_media_summary(report['media_files']['screenshots'], report['media_files']['videos'])
+    media = report.get('media_files', {})
+    print_crash_summary(report['summary']['total_crashes'], report['crash_signatures'])
+    print_test_summary(report['summary'], report.get('test_results', []), report.get('test_timings'))
+    print_test_outcome_summary(report['test_outcomes'], report['devices'])
+    print_media_summary(report['summary'], media.get('screenshots', []), media.get('videos', []))
+    if 'screenshot_dedup' in report:
+        print_screenshot_dedup(report['screenshot_dedup'])
+    print_performance_summary(report['summary']['performance'])
     
-    # Save detailed JSON report
-    report_file = Path(results_dir) / "firebase_analysis_report.json"
+    regressions = []
+    if baseline is not None:
+        rows = compare_to_baseline(
+            group_perf_samples(report['performance_samples']),
+            baseline,
+            threshold=args.regression_threshold,
+            alpha=args.regression_alpha
+        )
+        report['baseline_comparison'] = rows
+        print_regression_table(rows)
+        regressions = [row for row in rows if row['status'] == 'regression']
+    
+    # Save detailed JSON report (ndjson records were streamed during parsing)
+    write_started = time.perf_counter()
     try:
-        with open(report_file, 'w') as f:
-            json.dump(report, f, indent=2)
-        print(f"\n📄 Detailed report saved to: {report_file}")
+        saved = True
+        if args.format == 'ndjson':
+            saved = writer is not None
+            if saved:
+                writer.summary(report)
+                writer.close()
+        elif args.format == 'compact':
+            with open(report_file, 'w') as f:
+                write_compact_report(report, f)
+        else:
+            with open(report_file, 'w') as f:
+                json.dump(report, f, indent=2)
+        if saved:
+            print(f"\n📄 Detailed report saved to: {report_file}")
     except Exception as e:
         print(f"⚠️  Could not save report file: {e}")
     
-    # Exit with error code if crashes found
-    if report['summary']['total_crashes'] > 0:
+    if 'profiling' in report:
+        print_profile(report['profiling'], write_s=time.perf_counter() - write_started)
+    
+    if args.update_baseline:
+        try:
+            update_perf_baseline(Path(args.update_baseline), report['performance_samples'])
+            print(f"📈 Baseline updated: {args.update_baseline}")
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not update baseline {args.update_baseline}: {e}")
+    
+    over_budget = [
+        name for name, stats in report['summary']['performance'].items() if stats['over_budget']
+    ]
+    
+    # Exit with error code if results are incomplete or crashes found
+    if fetch_failures and not args.allow_missing:
+        print(f"\n❌ Analysis incomplete: {len(fetch_failures)} objects could not be fetched "
+              f"(pass --allow-missing to accept)")
+        sys.exit(1)
+    elif report['summary']['total_crashes'] > 0:
         print(f"\n❌ Analysis complete: {report['summary']['total_crashes']} crashes detected")
         sys.exit(1)
+    elif regressions:
+        regressed = sorted({row['metric'] for row in regressions})
+        print(f"\n❌ Analysis complete: latency regression vs baseline in {', '.join(regressed)}")
+        sys.exit(1)
+    elif args.fail_on_budget and over_budget:
+        print(f"\n❌ Analysis complete: latency budget exceeded for {', '.join(over_budget)}")
+        sys.exit(1)
     else:
         print("\n✅ Analysis complete: No crashes detected")
 